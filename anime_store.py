@@ -0,0 +1,203 @@
+import csv
+
+import numpy as np
+
+from normalizer import normalize_source, iter_scored_items, profile_from_scores
+
+###########################################################
+# ANIME STORE — METADADOS DE ANIMES EM ARRAYS COMPACTOS   #
+###########################################################
+
+# Valores possíveis de normalize_source, na ordem do código numérico guardado por anime
+SOURCE_CATEGORIES = ["Manga", "Light Novel", "Original", "Manhwa", "Other"]
+_SOURCE_CODE = {s: i for i, s in enumerate(SOURCE_CATEGORIES)}
+
+
+class AnimeMetadataStore:
+    """
+    Versão compacta do cache de animes:
+
+    - `ids`: ids ordenados (int64); a busca id → linha é um searchsorted, sem dicionário;
+    - `source_code`: fonte já normalizada (índice em SOURCE_CATEGORIES, int8);
+    - gêneros internados em `genre_names` e guardados em CSR (`genre_indptr`/`genre_indices`).
+
+    Com isso o acúmulo dos perfis vira operações inteiras sobre arrays, sem normalize_source
+    nem comparação de strings por item.
+    """
+
+    def __init__(self, ids, source_code, genre_indptr, genre_indices, genre_names):
+        self.ids = ids
+        self.source_code = source_code
+        self.genre_indptr = genre_indptr
+        self.genre_indices = genre_indices
+        self.genre_names = genre_names
+        self._genre_index = {g: i for i, g in enumerate(genre_names)}
+
+    @classmethod
+    def from_records(cls, records):
+        """Constrói a partir de um iterável de (id, lista de gêneros, source bruta). O último id repetido vence."""
+        vocab = {}
+        ids, sources, lengths, indices = [], [], [], []
+
+        for anime_id, generos, source in records:
+            try:
+                ids.append(int(anime_id))
+            except (TypeError, ValueError):
+                continue
+            sources.append(_SOURCE_CODE[normalize_source(source)])
+            codes = [vocab.setdefault(g, len(vocab)) for g in generos]
+            lengths.append(len(codes))
+            indices.extend(codes)
+
+        ids = np.asarray(ids, dtype=np.int64)
+        sources = np.asarray(sources, dtype=np.int8)
+        lengths = np.asarray(lengths, dtype=np.int32)
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.asarray(indices, dtype=np.int16 if len(vocab) < 2 ** 15 else np.int32)
+
+        # Ordena por id mantendo a última ocorrência de cada um
+        rev = np.arange(len(ids))[::-1]
+        _, first_in_rev = np.unique(ids[rev], return_index=True)
+        keep = rev[first_in_rev]  # já em ordem crescente de id
+
+        new_lengths = lengths[keep]
+        new_indptr = np.zeros(len(keep) + 1, dtype=np.int64)
+        np.cumsum(new_lengths, out=new_indptr[1:])
+        gather = _csr_gather_positions(indptr[keep], new_lengths)
+
+        names = [None] * len(vocab)
+        for g, i in vocab.items():
+            names[i] = g
+
+        return cls(ids[keep], sources[keep], new_indptr, indices[gather], names)
+
+    @classmethod
+    def from_cache(cls, anime_cache, anime_ids=None):
+        """
+        A partir do dicionário devolvido por extract_anime.load_anime_cache (ou do AnimeCache do
+        cache_store). Com `anime_ids`, só esses animes entram, sem percorrer o cache inteiro.
+        """
+        if anime_ids is None:
+            entries = anime_cache.items()
+        elif hasattr(anime_cache, "get_many"):
+            entries = anime_cache.get_many(anime_ids).items()
+        else:
+            entries = ((a, anime_cache[a]) for a in anime_ids if a in anime_cache)
+        return cls.from_records(
+            (anime_id, data.get("generos", []), data.get("source"))
+            for anime_id, data in entries
+        )
+
+    @classmethod
+    def from_csv(cls, filename="animes_cache.csv"):
+        """Lê o animes_cache.csv direto para arrays, sem passar pelo dicionário."""
+        def records():
+            with open(filename, mode='r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader)
+                for row in reader:
+                    if len(row) >= 4:
+                        yield row[0], row[2].split(", "), row[3]
+        return cls.from_records(records())
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return (self.ids.nbytes + self.source_code.nbytes
+                + self.genre_indptr.nbytes + self.genre_indices.nbytes)
+
+    def lookup(self, anime_ids):
+        """Linha de cada id (array), -1 quando o id não está no store."""
+        anime_ids = np.asarray(anime_ids, dtype=np.int64)
+        pos = np.searchsorted(self.ids, anime_ids)
+        pos_clipped = np.minimum(pos, max(len(self.ids) - 1, 0))
+        found = (pos < len(self.ids)) & (self.ids[pos_clipped] == anime_ids) if len(self.ids) else \
+            np.zeros(len(anime_ids), dtype=bool)
+        return np.where(found, pos_clipped, -1)
+
+    def genre_map(self, generos_alvo):
+        """Array vocabulário → coluna em generos_alvo (-1 para gêneros fora do alvo)."""
+        mapping = np.full(len(self.genre_names) + 1, -1, dtype=np.int32)
+        for j, g in enumerate(generos_alvo):
+            i = self._genre_index.get(g)
+            if i is not None:
+                mapping[i] = j
+        return mapping
+
+    def source_map(self, sources_alvo):
+        """Array código de fonte → coluna em sources_alvo (-1 se a fonte não é alvo)."""
+        return np.array([sources_alvo.index(s) if s in sources_alvo else -1 for s in SOURCE_CATEGORIES],
+                        dtype=np.int32)
+
+    def row_genres(self, rows):
+        """(posição do anime em `rows`, índice do gênero) de todos os gêneros das linhas pedidas."""
+        starts = self.genre_indptr[rows]
+        lengths = (self.genre_indptr[rows + 1] - starts).astype(np.int64)
+        positions = _csr_gather_positions(starts, lengths)
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        return owner, self.genre_indices[positions]
+
+
+def _csr_gather_positions(starts, lengths):
+    """Posições concatenadas [s0, s0+1, ..., s0+l0-1, s1, ...] de vários trechos de um CSR."""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(np.asarray(starts, dtype=np.int64) - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total, dtype=np.int64)
+
+
+def accumulate_scores(store, anime_list, generos_alvo, sources_alvo, genre_map=None, source_map=None):
+    """
+    Acumuladores brutos de um usuário (mesma regra de normalizer.compute_profile), em inteiros:
+    retorna (genre_scores, source_scores, soma_total) como arrays alinhados aos alvos.
+    """
+    items = list(iter_scored_items(anime_list))
+    genre_scores = np.zeros(len(generos_alvo), dtype=np.int64)
+    source_scores = np.zeros(len(sources_alvo), dtype=np.int64)
+    if not items:
+        return genre_scores, source_scores, 0
+
+    ids = np.fromiter((int(a) for a, _ in items), dtype=np.int64, count=len(items))
+    scores = np.fromiter((s for _, s in items), dtype=np.int64, count=len(items))
+
+    rows = store.lookup(ids)
+    valid = rows >= 0
+    rows, scores = rows[valid], scores[valid]
+
+    if genre_map is None:
+        genre_map = store.genre_map(generos_alvo)
+    if source_map is None:
+        source_map = store.source_map(sources_alvo)
+
+    src_col = source_map[store.source_code[rows]]
+    hit = src_col >= 0
+    np.add.at(source_scores, src_col[hit], scores[hit])
+
+    owner, genre_idx = store.row_genres(rows)
+    gcol = genre_map[genre_idx]
+    hit = gcol >= 0
+    np.add.at(genre_scores, gcol[hit], scores[owner[hit]])
+
+    return genre_scores, source_scores, int(scores.sum())
+
+
+def compute_profile_compact(username, anime_list, store, sources_alvo, generos_alvo,
+                            genre_map=None, source_map=None):
+    """Equivalente a normalizer.compute_profile usando o AnimeMetadataStore."""
+    genre_scores, source_scores, soma_total_scores = accumulate_scores(
+        store, anime_list, generos_alvo, sources_alvo, genre_map, source_map
+    )
+
+    return profile_from_scores(
+        username,
+        {g: int(genre_scores[j]) for j, g in enumerate(generos_alvo)},
+        {s: int(source_scores[j]) for j, s in enumerate(sources_alvo)},
+        soma_total_scores,
+        sources_alvo,
+        generos_alvo
+    )
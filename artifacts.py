@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import time
+from collections import deque
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from generate_graph import prepare_features, build_user_graph, detect_communities
+
+#######################################################################
+# ARTIFACTS — CACHE DE FEATURES, ARESTAS E COMUNIDADES POR PARÂMETROS #
+#######################################################################
+
+ARTIFACTS_DIR = "artifacts"
+ARTIFACT_VERSION = 2
+
+FEATURES_FILE = "features.npy"        # features normalizadas (float64), na ordem de usernames.npy
+USERNAMES_FILE = "usernames.npy"
+GRAPH_FILE = "graph.npz"              # nós e arestas (índices em usernames.npy) na ordem de inserção
+COMMUNITIES_FILE = "communities.npz"  # comunidades em CSR: offsets + membros, maiores primeiro
+META_FILE = "meta.json"               # parâmetros, hash de entrada e colunas (gravado por último)
+
+HASH_CHUNK = 1 << 20
+
+
+def file_hash(path):
+    """SHA-256 do conteúdo do arquivo de entrada."""
+    h = hashlib.sha256()
+    with open(path, mode="rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def artifact_params(threshold, binary, graph_mode, knn_k, community_engine, tfidf, source_weight):
+    """Todos os parâmetros que mudam features, grafo ou comunidades."""
+    params = {
+        "threshold": threshold,
+        "binary": binary,
+        "graph_mode": graph_mode,
+        "community_engine": community_engine,
+        "tfidf": tfidf,
+        "source_weight": source_weight,
+    }
+    if graph_mode == "knn":
+        import knn_graph
+        params.update(knn_k=knn_k, knn_trees=knn_graph.DEFAULT_TREES,
+                      knn_leaf_size=knn_graph.DEFAULT_LEAF_SIZE, knn_iterations=knn_graph.DEFAULT_ITERATIONS)
+    return params
+
+
+def artifact_key(input_hash, params):
+    return hashlib.sha256(json.dumps([ARTIFACT_VERSION, input_hash, params], sort_keys=True).encode()).hexdigest()
+
+
+def artifact_dir(key, cache_dir=ARTIFACTS_DIR):
+    return os.path.join(cache_dir, key[:16])
+
+
+def _save_npy(path, array):
+    with open(path + ".tmp", mode="wb") as f:
+        np.save(f, array)
+    os.replace(path + ".tmp", path)
+
+
+def _save_npz(path, **arrays):
+    with open(path + ".tmp", mode="wb") as f:
+        np.savez(f, **arrays)
+    os.replace(path + ".tmp", path)
+
+
+def _insertion_order(G):
+    """
+    Arestas de G numa ordem de inserção que reproduz a ordem de vizinhos de cada nó (G.edges()
+    não garante isso). Uma aresta entra quando é a próxima pendente nas duas extremidades.
+    """
+    adj = {u: list(G.adj[u]) for u in G}
+    ptr = dict.fromkeys(G, 0)
+    position = {u: i for i, u in enumerate(G)}
+
+    ready = deque()
+    for u, nbrs in adj.items():
+        if nbrs:
+            w = nbrs[0]
+            if adj[w][0] == u and position[u] < position[w]:
+                ready.append((u, w))
+
+    order = []
+    while ready:
+        u, v = ready.popleft()
+        order.append((u, v, G.adj[u][v].get("weight", 1.0)))
+        for a in (u, v):
+            ptr[a] += 1
+            if ptr[a] < len(adj[a]):
+                w = adj[a][ptr[a]]
+                if adj[w][ptr[w]] == a:
+                    ready.append((a, w))
+    return order
+
+
+def graph_arrays(G, position):
+    """(nós, u, v, pesos) de G como arrays de posições, com as arestas na ordem de inserção."""
+    edges = _insertion_order(G)
+    return (np.fromiter((position[n] for n in G), dtype=np.int64, count=len(G)),
+            np.fromiter((position[e[0]] for e in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((position[e[1]] for e in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((e[2] for e in edges), dtype=np.float64, count=len(edges)))
+
+
+def community_arrays(comms, position):
+    """Comunidades em CSR: (offsets, membros como posições)."""
+    sizes = [len(c) for c in comms]
+    return (np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)]).astype(np.int64),
+            np.fromiter((position[u] for c in comms for u in c), dtype=np.int64, count=sum(sizes)))
+
+
+def graph_from_arrays(users, nodes, u, v, weight):
+    G = nx.Graph()
+    G.add_nodes_from(users[i] for i in nodes.tolist())
+    G.add_weighted_edges_from(
+        (users[i], users[j], w) for i, j, w in zip(u.tolist(), v.tolist(), weight.tolist())
+    )
+    return G
+
+
+def communities_from_arrays(users, offsets, members):
+    offsets, members = offsets.tolist(), members.tolist()
+    return [[users[i] for i in members[a:b]] for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def write_arrays(directory, key, params, df_norm, nodes, u, v, weight, offsets, members, extra=None):
+    """
+    Grava o artefato a partir dos arrays (posições nas linhas de df_norm); o meta.json por último
+    marca o artefato como completo. `extra` (serializável em JSON) é guardado no meta.json.
+    """
+    os.makedirs(directory, exist_ok=True)
+    meta_file = os.path.join(directory, META_FILE)
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+
+    _save_npy(os.path.join(directory, FEATURES_FILE), df_norm.to_numpy(dtype=np.float64))
+    _save_npy(os.path.join(directory, USERNAMES_FILE), np.asarray(df_norm.index.tolist(), dtype=str))
+    _save_npz(os.path.join(directory, GRAPH_FILE), nodes=nodes, u=u, v=v, weight=weight)
+    _save_npz(os.path.join(directory, COMMUNITIES_FILE), offsets=offsets, members=members)
+
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "key": key,
+        "params": params,
+        "index": df_norm.index.name,
+        "columns": df_norm.columns.tolist(),
+        "n_users": len(df_norm),
+        "n_edges": len(u),
+        "n_communities": len(offsets) - 1,
+        "extra": extra or {},
+    }
+    with open(meta_file + ".tmp", mode="w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(meta_file + ".tmp", meta_file)
+
+
+def save_artifact(directory, key, params, df_norm, G, comms, extra=None):
+    """Grava features, grafo e comunidades (ver write_arrays)."""
+    position = {user: i for i, user in enumerate(df_norm.index.tolist())}
+    write_arrays(directory, key, params, df_norm, *graph_arrays(G, position),
+                 *community_arrays(comms, position), extra=extra)
+
+
+def read_meta(directory):
+    """Conteúdo do meta.json do artefato, ou None se ele ainda não foi gravado."""
+    meta_file = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_file):
+        return None
+    with open(meta_file, mode="r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_arrays(directory, key):
+    """
+    Artefato como arrays, sem montar o grafo: dicionário com meta, df_norm, users, nodes, u, v,
+    weight, offsets e members. None se não existe, está incompleto ou é de outra chave.
+    """
+    meta = read_meta(directory)
+    if meta is None or meta.get("version") != ARTIFACT_VERSION or meta.get("key") != key:
+        return None
+
+    features = np.load(os.path.join(directory, FEATURES_FILE))
+    users = np.load(os.path.join(directory, USERNAMES_FILE)).tolist()
+    df_norm = pd.DataFrame(features, index=pd.Index(users, name=meta["index"]), columns=meta["columns"])
+    graph = np.load(os.path.join(directory, GRAPH_FILE))
+    stored = np.load(os.path.join(directory, COMMUNITIES_FILE))
+    return {"meta": meta, "df_norm": df_norm, "users": users,
+            "nodes": graph["nodes"], "u": graph["u"], "v": graph["v"], "weight": graph["weight"],
+            "offsets": stored["offsets"], "members": stored["members"]}
+
+
+def load_artifact(directory, key):
+    """(df_norm, G, comms) do artefato, ou None se ele não existe, está incompleto ou é de outra chave."""
+    arrays = read_arrays(directory, key)
+    if arrays is None:
+        return None
+    users = arrays["users"]
+    G = graph_from_arrays(users, arrays["nodes"], arrays["u"], arrays["v"], arrays["weight"])
+    return arrays["df_norm"], G, communities_from_arrays(users, arrays["offsets"], arrays["members"])
+
+
+def load_or_build(profiles_path, df, threshold, binary, graph_mode, knn_k, community_engine,
+                  tfidf, source_weight, cache_dir=ARTIFACTS_DIR, use_cache=True):
+    """
+    Features normalizadas, grafo e comunidades dos perfis `df` (lidos de `profiles_path`).
+    A chave do artefato é o hash do arquivo de entrada mais todos os parâmetros; um acerto pula
+    normalização, similaridade e detecção de comunidades.
+    """
+    params = artifact_params(threshold, binary, graph_mode, knn_k, community_engine, tfidf, source_weight)
+    key = artifact_key(file_hash(profiles_path), params)
+    directory = artifact_dir(key, cache_dir)
+
+    if use_cache:
+        start = time.perf_counter()
+        cached = load_artifact(directory, key)
+        if cached is not None:
+            df_norm, G, comms = cached
+            print(f"Artefatos reaproveitados de {directory} em {time.perf_counter() - start:.2f}s "
+                  f"({len(G.nodes)} nós, {len(G.edges)} arestas, {len(comms)} comunidades).")
+            return cached
+
+    df_norm = prepare_features(df, tfidf, source_weight)
+
+    # calcula a similaridade de cosseno e constrói o grafo (threshold em blocos ou kNN aproximado)
+    if graph_mode == "knn":
+        print(f"Construindo grafo kNN com k = {knn_k}...")
+    else:
+        print(f"Construindo grafo com threshold = {threshold}...")
+    G = build_user_graph(df_norm, threshold, graph_mode, knn_k)
+    print(f"Nó(s): {len(G.nodes)}  —  Arestas: {len(G.edges)}")
+
+    print("Detectando comunidades...")
+    comms = detect_communities(G, community_engine)
+
+    if use_cache:
+        save_artifact(directory, key, params, df_norm, G, comms)
+        print(f"Artefatos gravados em {directory}.")
+    return df_norm, G, comms
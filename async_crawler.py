@@ -0,0 +1,153 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from extract_anime import extract_anime_data
+from normalizer import (
+    MAL_BASE_URL,
+    fetch_user_list,
+    iter_scored_items,
+    cache_entry_from_data,
+    compute_profile,
+)
+from rate_limit import RateLimiter
+from crawl_journal import STATUS_DONE, STATUS_EMPTY, STATUS_FAILED
+
+#########################################################
+# CRAWLER ASSÍNCRONO — VÁRIAS REQUISIÇÕES EM ANDAMENTO  #
+#########################################################
+
+# Valores padrão do modo assíncrono (requisições por segundo somando listas e páginas de anime)
+DEFAULT_RPS = 2.0
+DEFAULT_CONCURRENCY = 8
+
+
+class AsyncProfileCrawler:
+    """
+    Gera perfis de vários usuários ao mesmo tempo sob um único orçamento de requisições/s.
+
+    As chamadas HTTP continuam sendo as funções síncronas de `normalizer` e `extract_anime`,
+    executadas em um pool de threads; o event loop apenas coordena a concorrência, o limite
+    de taxa e a deduplicação de animes que estão sendo baixados por mais de um usuário.
+    """
+
+    def __init__(self, anime_cache, sources_alvo, generos_alvo, writer_cache,
+                 rps=DEFAULT_RPS, concurrency=DEFAULT_CONCURRENCY, base_url=MAL_BASE_URL, list_store=None):
+        self.anime_cache = anime_cache
+        self.sources_alvo = sources_alvo
+        self.generos_alvo = generos_alvo
+        self.writer_cache = writer_cache
+        self.concurrency = concurrency
+        self.base_url = base_url
+        self.list_store = list_store
+        self.limiter = RateLimiter(rps)
+        self.n_requests = 0
+        self._pending_anime = {}
+
+    async def _fetch(self, func, *args):
+        """Executa uma requisição bloqueante respeitando o semáforo e o limite de taxa."""
+        async with self._semaphore:
+            await self.limiter.acquire_async()
+            self.n_requests += 1
+            return await self._loop.run_in_executor(self._executor, func, *args)
+
+    async def _download_anime(self, anime_id):
+        data = await self._fetch(extract_anime_data, anime_id, self.base_url)
+        if not data or not data.get("source"):
+            # Falhas não ficam memorizadas: o próximo usuário que precisar tenta de novo
+            self._pending_anime.pop(anime_id, None)
+            return
+
+        # Escrita feita no event loop: nenhuma thread toca no cache/arquivo ao mesmo tempo
+        self.anime_cache[anime_id] = cache_entry_from_data(data)
+        self.writer_cache.writerow([
+            data["id"],
+            data["nome"],
+            data["generos"],
+            data["source"]
+        ])
+
+    def _ensure_anime(self, anime_id):
+        """Devolve a tarefa de download do anime, reaproveitando uma já em andamento."""
+        task = self._pending_anime.get(anime_id)
+        if task is None:
+            print(f"[CACHE MISS] ID {anime_id}")
+            task = asyncio.ensure_future(self._download_anime(anime_id))
+            self._pending_anime[anime_id] = task
+        return task
+
+    async def _process_user(self, username):
+        print(f"\n[USER: {username}] Coletando lista...")
+        try:
+            anime_list = await self._fetch(fetch_user_list, username, self.base_url)
+        except Exception as e:
+            print(f"[ERRO] Falhou para {username}: {e}")
+            return None, STATUS_FAILED
+
+        if self.list_store is not None:
+            self.list_store.add(username, anime_list)
+
+        if not isinstance(anime_list, list) or len(anime_list) == 0:
+            print(f"[DEBUG] Lista vazia ou privada para {username}.")
+            return None, STATUS_EMPTY
+
+        missing = {anime_id for anime_id, _ in iter_scored_items(anime_list)
+                   if anime_id not in self.anime_cache}
+        if missing:
+            await asyncio.gather(*(self._ensure_anime(a) for a in missing))
+
+        profile = compute_profile(username, anime_list, self.anime_cache,
+                                  self.sources_alvo, self.generos_alvo)
+        return profile, (STATUS_DONE if profile else STATUS_EMPTY)
+
+    async def run(self, usernames, on_result):
+        """
+        Processa todos os usuários e chama `on_result(username, profile, status)` na mesma ordem
+        da entrada (profile é None em caso de falha), assim o profiles.csv sai idêntico ao serial.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        queue = asyncio.Queue()
+        for idx, username in enumerate(usernames):
+            queue.put_nowait((idx, username))
+
+        # Buffer de reordenação: resultados prontos aguardam os anteriores
+        done = {}
+        next_idx = 0
+
+        async def worker():
+            nonlocal next_idx
+            while True:
+                try:
+                    idx, username = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                done[idx] = (username, *await self._process_user(username))
+                while next_idx in done:
+                    on_result(*done.pop(next_idx))
+                    next_idx += 1
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def crawl_profiles(usernames, anime_cache, sources_alvo, generos_alvo, writer_cache, on_result,
+                   rps=DEFAULT_RPS, concurrency=DEFAULT_CONCURRENCY, base_url=MAL_BASE_URL, list_store=None):
+    """Ponto de entrada síncrono do crawler assíncrono. Retorna estatísticas de vazão."""
+    crawler = AsyncProfileCrawler(anime_cache, sources_alvo, generos_alvo, writer_cache,
+                                  rps=rps, concurrency=concurrency, base_url=base_url,
+                                  list_store=list_store)
+    start = time.perf_counter()
+    asyncio.run(crawler.run(usernames, on_result))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "usuarios": len(usernames),
+        "requisicoes": crawler.n_requests,
+        "segundos": elapsed,
+        "req_por_segundo": crawler.n_requests / elapsed if elapsed > 0 else 0.0,
+    }
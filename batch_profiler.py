@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from normalizer import SOURCE_WEIGHTS
+
+###############################################################
+# BATCH PROFILER — TODOS OS PERFIS EM MULTIPLICAÇÕES ESPARSAS #
+###############################################################
+
+MIN_SCORE = 7
+
+
+def feature_columns(generos_alvo, sources_alvo):
+    """Colunas do profiles.csv (sem o username), na mesma ordem do PROFILE_FIELDNAMES."""
+    return [f"Source_{s.replace(' ', '_')}" for s in sources_alvo] + \
+           [f"Genre_{g.replace(' ', '_')}" for g in generos_alvo]
+
+
+def build_feature_matrix(store, generos_alvo, sources_alvo):
+    """
+    Matriz esparsa anime × feature (fontes alvo seguidas dos gêneros alvo) com contagens 0/1.
+    Os pesos das fontes são aplicados depois, sobre as somas, para reproduzir a ordem das
+    operações de normalizer.compute_profile.
+    """
+    n_sources = len(sources_alvo)
+    n_rows = len(store)
+
+    source_col = store.source_map(sources_alvo)[store.source_code]
+    src_rows = np.flatnonzero(source_col >= 0)
+
+    all_rows = np.arange(n_rows)
+    owner, genre_idx = store.row_genres(all_rows)
+    genre_col = store.genre_map(generos_alvo)[genre_idx]
+    hit = genre_col >= 0
+
+    rows = np.concatenate([src_rows, owner[hit]])
+    cols = np.concatenate([source_col[src_rows], genre_col[hit] + n_sources])
+    data = np.ones(len(rows), dtype=np.float64)
+    # Gêneros repetidos no mesmo anime somam, como no laço original
+    return sp.csr_matrix((data, (rows, cols)), shape=(n_rows, n_sources + len(generos_alvo)))
+
+
+def profile_matrix(user_index, anime_ids, scores, n_users, store, generos_alvo, sources_alvo,
+                   source_weights=None, min_score=MIN_SCORE):
+    """
+    Núcleo vetorizado. Recebe as listas em formato colunar (um elemento por item de lista:
+    índice do usuário, id do anime e nota) e devolve (matriz n_users × features, soma das notas).
+
+    Itens com nota abaixo de `min_score` (ou zero) e animes fora do store são descartados;
+    usuários com soma zero ficam com linha zerada e devem ser ignorados pelo chamador.
+    """
+    if source_weights is None:
+        source_weights = SOURCE_WEIGHTS
+
+    user_index = np.asarray(user_index, dtype=np.int64)
+    anime_ids = np.asarray(anime_ids, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    keep = (scores >= min_score) & (scores != 0) & (anime_ids != 0)
+    rows = store.lookup(anime_ids[keep])
+    found = rows >= 0
+
+    # Matriz usuário × anime com as notas (itens repetidos na lista somam, como no laço original)
+    user_scores = sp.csr_matrix(
+        (scores[keep][found], (user_index[keep][found], rows[found])),
+        shape=(n_users, len(store))
+    )
+    totals = np.asarray(user_scores.sum(axis=1)).ravel()
+
+    raw = (user_scores @ build_feature_matrix(store, generos_alvo, sources_alvo)).toarray()
+
+    weights = np.ones(raw.shape[1])
+    weights[:len(sources_alvo)] = [source_weights.get(s, 1.0) for s in sources_alvo]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = (raw * weights) / totals[:, None]
+    return values, totals
+
+
+def flatten_user_lists(user_lists):
+    """Converte {username: lista do load.json} em (usernames, user_index, anime_ids, scores)."""
+    usernames, user_index, anime_ids, scores = [], [], [], []
+    for username, anime_list in user_lists.items():
+        if not isinstance(anime_list, list):
+            continue
+        u = len(usernames)
+        usernames.append(username)
+        for item in anime_list:
+            score = item.get("score")
+            anime_id = item.get("anime_id")
+            if score is None or not anime_id:
+                continue
+            user_index.append(u)
+            anime_ids.append(int(anime_id))
+            scores.append(score)
+    return usernames, user_index, anime_ids, scores
+
+
+def build_profiles(user_lists, store, generos_alvo, sources_alvo, source_weights=None, min_score=MIN_SCORE):
+    """
+    Calcula de uma vez os perfis de todos os usuários, no formato do profiles.csv.
+    Equivalente a chamar normalizer.compute_profile para cada usuário: quem não tem nenhum
+    anime válido fica de fora do DataFrame.
+    """
+    usernames, user_index, anime_ids, scores = flatten_user_lists(user_lists)
+    values, totals = profile_matrix(user_index, anime_ids, scores, len(usernames), store,
+                                    generos_alvo, sources_alvo, source_weights, min_score)
+    return profiles_frame(usernames, values, totals, generos_alvo, sources_alvo)
+
+
+def profiles_frame(usernames, values, totals, generos_alvo, sources_alvo):
+    """Monta o DataFrame final, descartando usuários sem nenhum anime válido."""
+    valid = totals > 0
+    df = pd.DataFrame(values[valid], columns=feature_columns(generos_alvo, sources_alvo))
+    df.insert(0, "username", np.asarray(usernames, dtype=object)[valid])
+    return df
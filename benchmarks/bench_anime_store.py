@@ -0,0 +1,94 @@
+"""
+Benchmark do cache de animes: dicionário (load_anime_cache) x AnimeMetadataStore.
+
+Gera um animes_cache.csv sintético, mede a memória ocupada por cada representação
+(tracemalloc) e o tempo para calcular os perfis de usuários sintéticos, conferindo
+que os dois caminhos produzem exatamente os mesmos vetores.
+
+Uso: python benchmarks/bench_anime_store.py [n_animes] [n_usuarios]
+"""
+import contextlib
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from anime_store import AnimeMetadataStore, compute_profile_compact
+from extract_anime import load_anime_cache
+from normalizer import compute_profile
+from profiler import SOURCES_ALVO, GENEROS_ALVO
+
+GENEROS = GENEROS_ALVO + [
+    "Mystery", "Horror", "Music", "Mecha", "Ecchi", "Avant Garde", "Award Winning",
+    "Boys Love", "Girls Love", "Gourmet", "Hentai", "Erotica",
+]
+SOURCES = ["Manga", "Light novel", "Original", "Web manga", "Novel", "Visual novel",
+           "Game", "4-koma manga", "Web novel", "Manhwa", "Other", "Unknown"]
+
+
+def write_synthetic_cache(path, n_animes, rng):
+    with open(path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "nome", "generos", "source"])
+        for anime_id in range(1, n_animes + 1):
+            generos = rng.sample(GENEROS, rng.randint(1, 5))
+            writer.writerow([anime_id, f"Anime {anime_id}", ", ".join(generos), rng.choice(SOURCES)])
+
+
+def synthetic_lists(n_users, n_animes, rng, items=300):
+    return [
+        [{"anime_id": rng.randint(1, n_animes + 50), "score": rng.randint(0, 10)} for _ in range(items)]
+        for _ in range(n_users)
+    ]
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, elapsed
+
+
+if __name__ == "__main__":
+    N_ANIMES = int(sys.argv[1]) if len(sys.argv) > 1 else 150000
+    N_USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    rng = random.Random(42)
+    tmp = tempfile.mkdtemp()
+    cache_path = os.path.join(tmp, "animes_cache.csv")
+    write_synthetic_cache(cache_path, N_ANIMES, rng)
+    lists = synthetic_lists(N_USERS, N_ANIMES, rng)
+
+    cache, mem_dict, t_load_dict = measure(lambda: load_anime_cache(cache_path))
+    store, mem_store, t_load_store = measure(lambda: AnimeMetadataStore.from_csv(cache_path))
+
+    genre_map = store.genre_map(GENEROS_ALVO)
+    source_map = store.source_map(SOURCES_ALVO)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        perfis_dict = [compute_profile(f"u{i}", l, cache, SOURCES_ALVO, GENEROS_ALVO)
+                       for i, l in enumerate(lists)]
+        t_dict = time.perf_counter() - start
+
+        start = time.perf_counter()
+        perfis_store = [compute_profile_compact(f"u{i}", l, store, SOURCES_ALVO, GENEROS_ALVO,
+                                                genre_map, source_map)
+                        for i, l in enumerate(lists)]
+        t_store = time.perf_counter() - start
+
+    print(f"Animes: {N_ANIMES}  usuários: {N_USERS}")
+    print(f"dict:  {mem_dict / 2**20:7.1f} MiB  carga {t_load_dict:.2f}s  perfis {t_dict:.2f}s")
+    print(f"store: {mem_store / 2**20:7.1f} MiB  carga {t_load_store:.2f}s  perfis {t_store:.2f}s "
+          f"(arrays: {store.nbytes / 2**20:.1f} MiB)")
+    print(f"Memória {mem_dict / mem_store:.1f}x menor, perfis {t_dict / t_store:.1f}x mais rápidos")
+    print(f"Perfis divergentes: {sum(1 for a, b in zip(perfis_dict, perfis_store) if a != b)}")
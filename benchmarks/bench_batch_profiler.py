@@ -0,0 +1,69 @@
+"""
+Benchmark do batch_profiler: perfis de todos os usuários em multiplicações esparsas.
+
+Gera um cache de animes e listas de usuários sintéticas, confere uma amostra contra
+normalizer.compute_profile (diferença máxima absoluta) e mede o tempo de reperfilar
+todos os usuários a partir das listas em formato colunar.
+
+Uso: python benchmarks/bench_batch_profiler.py [n_usuarios] [itens_por_usuario] [n_animes]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from anime_store import AnimeMetadataStore
+from batch_profiler import build_profiles, profile_matrix, profiles_frame
+from normalizer import compute_profile
+from profiler import SOURCES_ALVO, GENEROS_ALVO
+
+GENEROS = GENEROS_ALVO + ["Mystery", "Horror", "Music", "Mecha", "Ecchi", "Award Winning"]
+SOURCES = ["Manga", "Light novel", "Original", "Web manga", "Novel", "Game", "Manhwa", "Other", "Unknown"]
+
+if __name__ == "__main__":
+    N_USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ITEMS = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    N_ANIMES = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    AMOSTRA = 500
+
+    rng = random.Random(7)
+    cache = {
+        str(i): {"generos": rng.sample(GENEROS, rng.randint(1, 5)), "source": rng.choice(SOURCES)}
+        for i in range(1, N_ANIMES + 1)
+    }
+    store = AnimeMetadataStore.from_cache(cache)
+
+    # Conferência contra o cálculo por usuário, em uma amostra com listas no formato do load.json
+    amostra = {
+        f"u{u}": [{"anime_id": rng.randint(1, N_ANIMES + 100), "score": rng.randint(0, 10)}
+                  for _ in range(rng.randint(0, ITEMS))]
+        for u in range(AMOSTRA)
+    }
+    batch = build_profiles(amostra, store, GENEROS_ALVO, SOURCES_ALVO).set_index("username")
+    with contextlib.redirect_stdout(io.StringIO()):
+        esperado = {u: compute_profile(u, l, cache, SOURCES_ALVO, GENEROS_ALVO) for u, l in amostra.items()}
+    esperado = {u: p for u, p in esperado.items() if p}
+    assert set(esperado) == set(batch.index), "conjuntos de usuários diferentes"
+    max_diff = max(abs(batch.at[u, c] - v) for u, p in esperado.items() for c, v in p.items() if c != "username")
+
+    # Reperfilamento completo a partir das listas colunares
+    np_rng = np.random.default_rng(7)
+    lengths = np_rng.integers(0, 2 * ITEMS, N_USERS)
+    user_index = np.repeat(np.arange(N_USERS), lengths)
+    anime_ids = np_rng.integers(1, N_ANIMES + 100, len(user_index))
+    scores = np_rng.integers(0, 11, len(user_index)).astype(np.int8)
+    usernames = [f"user{u}" for u in range(N_USERS)]
+
+    start = time.perf_counter()
+    values, totals = profile_matrix(user_index, anime_ids, scores, N_USERS, store, GENEROS_ALVO, SOURCES_ALVO)
+    df = profiles_frame(usernames, values, totals, GENEROS_ALVO, SOURCES_ALVO)
+    elapsed = time.perf_counter() - start
+
+    print(f"Amostra: {len(esperado)} perfis conferidos, diferença máxima {max_diff:.3g}")
+    print(f"{N_USERS} usuários / {len(user_index)} itens: {elapsed:.2f}s ({len(df)} perfis)")
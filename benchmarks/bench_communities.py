@@ -0,0 +1,63 @@
+"""
+Benchmark dos motores de detecção de comunidades (communities.py).
+
+Monta o grafo de usuários sintéticos (mesmo gerador de bench_graph.py) no modo threshold e
+no modo kNN e compara, para cada motor, a modularidade obtida e o tempo de parede, com um
+processo e com o pool (louvain e label_propagation; o greedy roda no grafo inteiro). A linha "nx greedy" é o greedy_modularity_communities original sobre
+o grafo inteiro, para conferência.
+
+Uso: python benchmarks/bench_communities.py [n_usuarios] [threshold] [k]
+"""
+import os
+import sys
+import time
+
+import networkx as nx
+from networkx.algorithms.community import greedy_modularity_communities
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import communities
+from bench_graph import synthetic_profiles
+from generate_graph import build_graph_blockwise
+from knn_graph import build_knn_graph
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    N_USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    THRESHOLD = float(sys.argv[2]) if len(sys.argv) > 2 else 0.98
+    K = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    WORKERS = os.cpu_count() or 1
+
+    df_norm = synthetic_profiles(N_USERS)
+    graphs = {
+        f"threshold {THRESHOLD}": build_graph_blockwise(df_norm, THRESHOLD),
+        f"kNN k={K}": build_knn_graph(df_norm, k=K, recall_sample=0),
+    }
+
+    # Força o caminho paralelo mesmo em grafos pequenos, para medir o pool
+    communities.PARALLEL_MIN_EDGES = 0
+
+    for name, G in graphs.items():
+        print(f"\nGrafo {name}: {G.number_of_nodes()} nós, {G.number_of_edges()} arestas, "
+              f"{nx.number_connected_components(G)} componentes")
+
+        reference, t_ref = timed(lambda: [list(c) for c in greedy_modularity_communities(G)])
+        print(f"  {'nx greedy':<18} {'':>9} {t_ref:8.2f}s  Q={communities.score(G, reference):.4f}  "
+              f"{len(reference)} comunidades")
+
+        for engine in communities.ENGINES:
+            for workers in [1] if engine == "greedy" else sorted({1, WORKERS}):
+                comms, elapsed = timed(lambda: communities.detect(G, engine, workers=workers))
+                line = (f"  {engine:<18} {workers:>2} proc. {elapsed:8.2f}s  Q={communities.score(G, comms):.4f}  "
+                        f"{len(comms)} comunidades")
+                if engine == "greedy":
+                    line += f"  igual ao nx: {[set(c) for c in comms] == [set(c) for c in reference]}"
+                print(line)
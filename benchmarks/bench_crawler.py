@@ -0,0 +1,138 @@
+"""
+Benchmark do crawler de perfis contra um servidor HTTP local (stub do MAL).
+
+Compara o modo serial (sem os sleeps de cortesia) com os modos assíncrono e em duas fases
+e confere que todos geram os mesmos perfis e o mesmo conjunto de animes no cache.
+
+Uso: python benchmarks/bench_crawler.py [n_usuarios] [latencia_ms] [rps]
+"""
+import csv
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client
+from async_crawler import crawl_profiles
+from normalizer import create_user_profile
+from prefetch import run_two_phase
+from anime_store import AnimeMetadataStore
+from batch_profiler import build_profiles
+from profiler import SOURCES_ALVO, GENEROS_ALVO
+
+GENEROS_STUB = ["Action", "Adventure", "Comedy", "Drama", "Fantasy", "Romance", "Sports", "Mystery"]
+SOURCES_STUB = ["Manga", "Light novel", "Original", "Web manga", "Visual novel"]
+N_ANIMES = 400
+
+
+def make_stub_handler(latency):
+    listas = {}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body, content_type):
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            time.sleep(latency)
+            m = re.match(r"/animelist/([^/]+)/load\.json", self.path)
+            if m:
+                user = m.group(1)
+                if user not in listas:
+                    r = random.Random(user)
+                    listas[user] = [
+                        {"anime_id": r.randrange(1, N_ANIMES), "score": r.randint(0, 10), "status": 2}
+                        for _ in range(r.randint(5, 40))
+                    ]
+                return self._send(json.dumps(listas[user]), "application/json")
+
+            m = re.match(r"/anime/(\d+)", self.path)
+            if m:
+                r = random.Random(int(m.group(1)))
+                generos = r.sample(GENEROS_STUB, r.randint(1, 3))
+                links = "".join(f'<a href="/anime/genre/{i}">{g}</a>' for i, g in enumerate(generos))
+                html = (
+                    f"<html><head><title>Anime {m.group(1)} - MyAnimeList.net</title></head><body>"
+                    f'<div class="spaceit_pad"><span class="dark_text">Source:</span> {r.choice(SOURCES_STUB)}</div>'
+                    f'<div class="spaceit_pad"><span class="dark_text">Genres:</span>{links}</div>'
+                    "</body></html>"
+                )
+                return self._send(html, "text/html")
+
+            self.send_error(404)
+
+    return StubHandler
+
+
+def run_serial(users, base_url):
+    cache, buf, profiles = {}, io.StringIO(), []
+    writer = csv.writer(buf)
+    start = time.perf_counter()
+    for u in users:
+        p = create_user_profile(u, cache, SOURCES_ALVO, GENEROS_ALVO, writer, base_url=base_url, delay=0)
+        if p:
+            profiles.append(p)
+    return time.perf_counter() - start, profiles, cache
+
+
+def run_async(users, base_url, rps):
+    cache, buf, profiles = {}, io.StringIO(), []
+    writer = csv.writer(buf)
+    stats = crawl_profiles(users, cache, SOURCES_ALVO, GENEROS_ALVO, writer,
+                           lambda u, p, status: p and profiles.append(p),
+                           rps=rps, concurrency=16, base_url=base_url)
+    return stats, profiles, cache
+
+
+def run_prefetch(users, base_url, rps):
+    cache, buf = {}, io.StringIO()
+    writer = csv.writer(buf)
+    start = time.perf_counter()
+    lists = run_two_phase(users, cache, writer, rps=rps, workers=16, base_url=base_url)
+    perfis = build_profiles({u: l for u, l in lists.items() if isinstance(l, list) and l},
+                            AnimeMetadataStore.from_cache(cache), GENEROS_ALVO, SOURCES_ALVO)
+    perfis = {row["username"]: row for row in perfis.to_dict("records")}
+    profiles = [perfis[u] for u in users if u in perfis]
+    return time.perf_counter() - start, profiles, cache
+
+
+if __name__ == "__main__":
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    rps = float(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    # Sem revalidação em disco: cada modo deve baixar tudo do stub
+    http_client.configure(store=None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_stub_handler(latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    users = [f"user{i}" for i in range(n_users)]
+
+    import contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_serial, prof_serial, cache_serial = run_serial(users, base_url)
+        stats, prof_async, cache_async = run_async(users, base_url, rps)
+        t_two, prof_two, cache_two = run_prefetch(users, base_url, rps)
+    server.shutdown()
+
+    print(f"Usuários: {n_users} | latência simulada: {latency * 1000:.0f} ms | limite async: {rps} req/s")
+    print(f"Serial: {t_serial:.2f}s")
+    print(f"Async:  {stats['segundos']:.2f}s  ({stats['requisicoes']} requisições, "
+          f"{stats['req_por_segundo']:.1f} req/s)  speedup {t_serial / stats['segundos']:.1f}x")
+    print(f"Duas fases: {t_two:.2f}s  speedup {t_serial / t_two:.1f}x")
+    print(f"Perfis idênticos: {prof_serial == prof_async == prof_two} | "
+          f"Cache idêntico: {cache_serial == cache_async == cache_two}")
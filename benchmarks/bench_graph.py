@@ -0,0 +1,95 @@
+"""
+Benchmark da construção do grafo de similaridade: matriz densa + laço duplo x blocos.
+
+Gera perfis sintéticos (16 features, como o profiles.csv) para cada tamanho e mede tempo e
+memória de pico (tracemalloc) de build_graph_blockwise. Até LIMITE_DENSO usuários também roda
+o caminho antigo (compute_similarity + laço duplo com sim_df.loc) e confere que os grafos
+têm as mesmas arestas na mesma ordem. Acima de LIMITE_GRAFO as arestas só são contadas
+(o grafo do networkx passaria a dominar a memória). Para comparação, mede também o grafo kNN
+aproximado (knn_graph.py) e seu recall contra a busca exata numa amostra.
+
+Uso: python benchmarks/bench_graph.py [tamanhos separados por vírgula] [threshold] [block_size]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_graph import (
+    normalize_percent, compute_similarity, build_graph_blockwise, iter_similar_pairs
+)
+from knn_graph import approximate_knn, knn_recall
+
+LIMITE_DENSO = 1000
+LIMITE_GRAFO = 20000
+
+
+def synthetic_profiles(n_users, n_features=16, n_grupos=40, seed=0):
+    """Perfis em torno de alguns centros, para que existam pares acima do threshold."""
+    rng = np.random.default_rng(seed)
+    centros = rng.dirichlet(np.full(n_features, 0.6), n_grupos)
+    grupo = rng.integers(0, n_grupos, n_users)
+    X = centros[grupo] * rng.lognormal(0, 0.35, (n_users, n_features))
+    df = pd.DataFrame(X, index=[f"user{i}" for i in range(n_users)],
+                      columns=[f"F{j}" for j in range(n_features)])
+    return normalize_percent(df)
+
+
+def old_build(df_norm, threshold):
+    sim_df = compute_similarity(df_norm)
+    G = nx.Graph()
+    users = sim_df.index.tolist()
+    for i, u in enumerate(users):
+        for j in range(i + 1, len(users)):
+            v = users[j]
+            score = sim_df.loc[u, v]
+            if score >= threshold:
+                G.add_edge(u, v, weight=score)
+    return G
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    SIZES = [int(s) for s in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1000, 10000, 100000]
+    THRESHOLD = float(sys.argv[2]) if len(sys.argv) > 2 else 0.98
+    BLOCK = int(sys.argv[3]) if len(sys.argv) > 3 else 2048
+
+    for n in SIZES:
+        df_norm = synthetic_profiles(n)
+
+        if n <= LIMITE_GRAFO:
+            G, t_new, peak_new = measure(lambda: build_graph_blockwise(df_norm, THRESHOLD, BLOCK))
+            n_edges = G.number_of_edges()
+        else:
+            n_edges, t_new, peak_new = measure(
+                lambda: sum(len(r) for r, _, _ in iter_similar_pairs(df_norm.to_numpy(), THRESHOLD, BLOCK))
+            )
+
+        line = (f"{n:>7} usuários | {n_edges:>9} arestas | blocos: {t_new:7.2f}s "
+                f"pico {peak_new / 2**20:8.1f} MiB | matriz densa seria {n * n * 8 / 2**30:6.2f} GiB")
+
+        if n <= LIMITE_DENSO:
+            G_old, t_old, peak_old = measure(lambda: old_build(df_norm, THRESHOLD))
+            same = list(G_old.edges) == list(G.edges)
+            line += f" | antigo: {t_old:7.2f}s pico {peak_old / 2**20:7.1f} MiB | idêntico: {same}"
+
+        print(line)
+
+        (nbr_idx, _), t_knn, peak_knn = measure(lambda: approximate_knn(df_norm.to_numpy()))
+        print(f"{'':>7}          kNN (k={nbr_idx.shape[1]}): {t_knn:7.2f}s pico {peak_knn / 2**20:8.1f} MiB | "
+              f"recall {knn_recall(df_norm.to_numpy(), nbr_idx, 300):.3f}")
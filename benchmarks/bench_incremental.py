@@ -0,0 +1,50 @@
+"""
+Benchmark do modo incremental (incremental_graph.py): constrói o estado com n_usuarios perfis
+sintéticos (mesmo gerador de bench_graph.py) e depois adiciona n_novos, comparando o tempo da
+atualização incremental com o de uma reconstrução completa sobre todos os perfis.
+
+Uso: python benchmarks/bench_incremental.py [n_usuarios] [n_novos] [threshold] [motor]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import communities
+from bench_graph import synthetic_profiles
+from incremental_graph import update_graph
+
+
+if __name__ == "__main__":
+    N_USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    N_NEW = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    THRESHOLD = float(sys.argv[3]) if len(sys.argv) > 3 else 0.98
+    MOTOR = sys.argv[4] if len(sys.argv) > 4 else "louvain"
+
+    df = synthetic_profiles(N_USERS + N_NEW)
+    base = df.iloc[:N_USERS]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        update_graph(base, THRESHOLD, MOTOR, tfidf=False, source_weight=1, cache_dir=os.path.join(tmp, "a"))
+        base_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, G, comms = update_graph(df, THRESHOLD, MOTOR, tfidf=False, source_weight=1, cache_dir=os.path.join(tmp, "a"))
+        inc_time = time.perf_counter() - start
+        q_inc = communities.score(G, comms)
+
+        start = time.perf_counter()
+        _, H, full_comms = update_graph(df, THRESHOLD, MOTOR, tfidf=False, source_weight=1, cache_dir=os.path.join(tmp, "b"))
+        full_time = time.perf_counter() - start
+        q_full = communities.score(H, full_comms)
+
+    print(f"\n{N_USERS} usuários + {N_NEW} novos, threshold {THRESHOLD}, motor {MOTOR}")
+    print(f"{'':<28}{'tempo (s)':>12}{'modularidade':>14}")
+    print(f"{'estado inicial':<28}{base_time:>12.2f}")
+    print(f"{'atualização incremental':<28}{inc_time:>12.2f}{q_inc:>14.4f}")
+    print(f"{'reconstrução completa':<28}{full_time:>12.2f}{q_full:>14.4f}")
+    print(f"arestas: incremental {G.number_of_edges()}, completa {H.number_of_edges()}")
@@ -0,0 +1,56 @@
+"""
+Benchmark da vetorização de mangás do recommender.py: create_manga_vectors sobre um catálogo
+sintético de n_mangas títulos e a leitura dos mesmos vetores do cache (load_or_create_manga_vectors).
+
+Uso: python benchmarks/bench_manga_vectors.py [n_mangas]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommender import ALL_FEATURES, load_manga_data, load_or_create_manga_vectors
+
+TIPOS = ["Manga", "Manhwa", "Manhua", "Light Novel", "Novel", "One-shot", "Doujinshi"]
+GENEROS = ["Action", "Adventure", "Comedy", "Drama", "Fantasy", "Sci-Fi", "Slice of Life", "Romance",
+           "Supernatural", "Suspense", "Sports", "Award Winning", "Horror", "Mystery", "Ecchi"]
+
+
+def synthetic_catalog(n, path, seed=0):
+    """Grava em `path` um CSV no formato do mangas_cache.csv com n mangás de 1 a 5 gêneros."""
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 6, size=n)
+    generos = [", ".join(rng.choice(GENEROS, size=k, replace=False)) for k in sizes]
+    pd.DataFrame({
+        "id": np.arange(n),
+        "nome": [f"Manga {i}" for i in range(n)],
+        "score": np.round(rng.uniform(5, 9.5, size=n), 2),
+        "generos": generos,
+        "tipo": rng.choice(TIPOS, size=n),
+    }).to_csv(path, index=False)
+
+
+if __name__ == "__main__":
+    N_MANGAS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mangas.csv")
+        synthetic_catalog(N_MANGAS, path)
+        manga_df = load_manga_data(path)
+
+        start = time.perf_counter()
+        load_or_create_manga_vectors(path, manga_df, ALL_FEATURES, cache_dir=tmp)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_or_create_manga_vectors(path, manga_df, ALL_FEATURES, cache_dir=tmp)
+        warm = time.perf_counter() - start
+
+    print(f"\n{N_MANGAS} mangás")
+    print(f"vetorização (sem cache): {cold:.3f}s")
+    print(f"leitura do cache:        {warm:.3f}s")
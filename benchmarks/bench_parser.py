@@ -0,0 +1,82 @@
+"""
+Benchmark dos motores de parsing (BeautifulSoup x lxml/XPath) sobre páginas salvas.
+
+O corpus vem do PageStore (raw_pages/, padrão) ou de um diretório com arquivos
+anime_<id>.html / manga_<id>.html. Confere que os dois motores devolvem dicionários
+idênticos e mostra páginas/segundo de cada um.
+
+Uso: python benchmarks/bench_parser.py [raw_pages | diretorio_html] [max_paginas]
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fast_parser
+from extract_anime import parse_anime_page
+from extract_manga import parse_work_page
+
+PAGE_RE = re.compile(r"(anime|manga)[/_](\d+)(?:\.html)?$")
+
+
+def load_corpus(source, limit):
+    """Devolve uma lista de (tipo, id, html)."""
+    corpus = []
+    if os.path.exists(os.path.join(source, "index.db")):
+        from page_store import PageStore
+        store = PageStore(source)
+        for url in store.urls():
+            match = PAGE_RE.search(url)
+            if match:
+                entry = store.get(url)
+                corpus.append((match.group(1), match.group(2),
+                               entry["body"].decode(entry.get("encoding") or "utf-8", errors="replace")))
+            if len(corpus) >= limit:
+                break
+    else:
+        for name in sorted(os.listdir(source)):
+            match = PAGE_RE.search(name)
+            if match:
+                with open(os.path.join(source, name), encoding="utf-8") as f:
+                    corpus.append((match.group(1), match.group(2), f.read()))
+            if len(corpus) >= limit:
+                break
+    return corpus
+
+
+def run_engine(corpus, anime_fn, work_fn):
+    results = []
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for kind, page_id, html in corpus:
+            try:
+                if kind == "anime":
+                    results.append(anime_fn(html, page_id))
+                else:
+                    results.append(work_fn(html, page_id, "manga"))
+            except fast_parser.PageParseError as e:
+                results.append(f"PageParseError: {e}")
+    return time.perf_counter() - start, results
+
+
+if __name__ == "__main__":
+    SOURCE = sys.argv[1] if len(sys.argv) > 1 else "raw_pages"
+    LIMIT = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    corpus = load_corpus(SOURCE, LIMIT)
+    if not corpus:
+        print(f"Nenhuma página de anime/mangá encontrada em {SOURCE}.")
+        sys.exit(1)
+
+    t_bs4, res_bs4 = run_engine(corpus, parse_anime_page, parse_work_page)
+    t_lxml, res_lxml = run_engine(corpus, fast_parser.parse_anime_page, fast_parser.parse_work_page)
+
+    diffs = sum(1 for a, b in zip(res_bs4, res_lxml) if a != b)
+    print(f"Páginas: {len(corpus)}")
+    print(f"bs4:  {t_bs4:.2f}s  ({len(corpus) / t_bs4:.0f} páginas/s)")
+    print(f"lxml: {t_lxml:.2f}s  ({len(corpus) / t_lxml:.0f} páginas/s)  speedup {t_bs4 / t_lxml:.1f}x")
+    print(f"Resultados divergentes: {diffs}")
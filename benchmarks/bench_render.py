@@ -0,0 +1,57 @@
+"""
+Benchmark do desenho do grafo: draw_graph original (spring layout + draw_networkx_edges, 300 dpi)
+contra o renderizador de graph_render.py, a frio (layout calculado) e a quente (posições
+reaproveitadas do .pos.npz).
+
+Usa o grafo kNN de usuários sintéticos (mesmo gerador de bench_graph.py) com comunidades louvain.
+O desenho original só roda até LIMITE_SPRING usuários.
+
+Uso: python benchmarks/bench_render.py [n_usuarios] [k]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import communities
+from bench_graph import synthetic_profiles
+from generate_graph import draw_graph
+from graph_render import render_graph
+from knn_graph import build_knn_graph
+
+LIMITE_SPRING = 5000
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    N_USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    K = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    df_norm = synthetic_profiles(N_USERS)
+    G = build_knn_graph(df_norm, k=K, recall_sample=0)
+    comms = communities.detect(G, engine="louvain")
+    names = [f"Comunidade {i + 1}" for i in range(len(comms))]
+    print(f"{len(G)} nós, {G.number_of_edges()} arestas, {len(comms)} comunidades\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+        if N_USERS <= LIMITE_SPRING:
+            out = os.path.join(tmp, "spring.png")
+            results.append(("spring (original)", timed(lambda: draw_graph(G, comms, df_norm, names, out, mode="spring")),
+                            os.path.getsize(out)))
+
+        out = os.path.join(tmp, "fast.png")
+        results.append(("fast, a frio", timed(lambda: render_graph(G, comms, df_norm, names, out)), os.path.getsize(out)))
+        results.append(("fast, a quente", timed(lambda: render_graph(G, comms, df_norm, names, out)), os.path.getsize(out)))
+
+    print(f"\n{'modo':<20}{'tempo (s)':>12}{'PNG (MiB)':>12}")
+    for label, elapsed, size in results:
+        print(f"{label:<20}{elapsed:>12.2f}{size / 2**20:>12.2f}")
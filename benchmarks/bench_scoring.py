@@ -0,0 +1,52 @@
+"""
+Benchmark da pontuação comunidades × mangás do recommender.py: o laço original (cosine_similarity
+e sort_values completo por comunidade, recommend_manga_for_community) contra top_k_mangas
+(multiplicação em blocos + argpartition). Catálogo sintético de bench_manga_vectors.py e vetores
+de comunidade aleatórios.
+
+Uso: python benchmarks/bench_scoring.py [n_comunidades] [n_mangas] [k]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_manga_vectors import synthetic_catalog
+from recommender import (ALL_FEATURES, load_manga_data, create_manga_vectors, recommend_manga_for_community,
+                         top_k_mangas)
+
+
+if __name__ == "__main__":
+    N_COMMUNITIES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    N_MANGAS = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    K = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mangas.csv")
+        synthetic_catalog(N_MANGAS, path)
+        manga_vectors = create_manga_vectors(load_manga_data(path), ALL_FEATURES)
+
+    rng = np.random.default_rng(0)
+    community_vectors = pd.DataFrame(rng.dirichlet(np.ones(len(ALL_FEATURES)), size=N_COMMUNITIES),
+                                     columns=ALL_FEATURES)
+
+    start = time.perf_counter()
+    loop_scores = [recommend_manga_for_community(row, manga_vectors).head(K).to_numpy()
+                   for _, row in community_vectors.iterrows()]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, top_scores = top_k_mangas(community_vectors, manga_vectors, K)
+    batch_time = time.perf_counter() - start
+
+    diff = np.abs(np.array(loop_scores) - top_scores).max()
+    print(f"\n{N_COMMUNITIES} comunidades × {N_MANGAS} mangás, top {K}")
+    print(f"laço por comunidade: {loop_time:.3f}s")
+    print(f"top_k_mangas:        {batch_time:.3f}s")
+    print(f"maior diferença nas similaridades do top {K}: {diff:.2e}")
@@ -0,0 +1,227 @@
+import csv
+import os
+import sqlite3
+import threading
+
+############################################################
+# CACHE STORE — ARMAZENAMENTO INDEXADO DE ANIMES E MANGÁS  #
+############################################################
+
+# Banco único com uma tabela por catálogo
+CACHE_DB_FILE = "cache.db"
+
+ANIME_TABLE = "animes"
+ANIME_FIELDNAMES = ["id", "nome", "generos", "source"]
+
+MANGA_TABLE = "mangas"
+MANGA_FIELDNAMES = ["id", "nome", "score", "generos", "tipo"]
+
+
+class SqliteCacheStore:
+    """
+    Uma tabela SQLite (modo WAL) indexada por id, com upserts em lote.
+
+    Vários processos podem escrever no mesmo arquivo: o SQLite serializa os commits e o
+    busy timeout faz cada escritor esperar sua vez em vez de falhar. `writerow` aceita lista
+    ou dicionário, então o objeto substitui diretamente o csv.writer/DictWriter das extrações.
+    """
+
+    def __init__(self, path=CACHE_DB_FILE, table=ANIME_TABLE, fieldnames=ANIME_FIELDNAMES, batch_size=200):
+        self.path = path
+        self.table = table
+        self.fieldnames = list(fieldnames)
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{c} TEXT" for c in self.fieldnames[1:])
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, {columns})")
+        self._db.commit()
+
+        placeholders = ", ".join("?" for _ in self.fieldnames)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in self.fieldnames[1:])
+        self._upsert_sql = (
+            f"INSERT INTO {table} ({', '.join(self.fieldnames)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+
+    def _as_tuple(self, row):
+        if isinstance(row, dict):
+            row = [row.get(c) for c in self.fieldnames]
+        return tuple(None if v is None else str(v) for v in row[:len(self.fieldnames)])
+
+    def get_row(self, row_id):
+        """Linha como dicionário (incluindo escritas ainda no buffer), ou None."""
+        with self._lock:
+            for row in reversed(self._pending):
+                if row[0] == str(row_id):
+                    return dict(zip(self.fieldnames, row))
+            found = self._db.execute(
+                f"SELECT * FROM {self.table} WHERE id = ?", (str(row_id),)
+            ).fetchone()
+        return dict(zip(self.fieldnames, found)) if found else None
+
+    def get_rows(self, row_ids, chunk_size=500):
+        """{id: linha} dos ids presentes, em consultas `WHERE id IN (...)` de até chunk_size ids."""
+        self.flush()
+        row_ids = [str(r) for r in row_ids]
+        found = {}
+        with self._lock:
+            for i in range(0, len(row_ids), chunk_size):
+                chunk = row_ids[i:i + chunk_size]
+                placeholders = ", ".join("?" for _ in chunk)
+                for row in self._db.execute(f"SELECT * FROM {self.table} WHERE id IN ({placeholders})", chunk):
+                    found[row[0]] = dict(zip(self.fieldnames, row))
+        return found
+
+    def upsert_many(self, rows):
+        """Grava várias linhas numa única transação."""
+        data = [self._as_tuple(r) for r in rows]
+        with self._lock:
+            with self._db:
+                self._db.executemany(self._upsert_sql, data)
+
+    def writerow(self, row):
+        with self._lock:
+            self._pending.append(self._as_tuple(row))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                with self._db:
+                    self._db.executemany(self._upsert_sql, pending)
+
+    def __len__(self):
+        self.flush()
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def iter_rows(self):
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(f"SELECT * FROM {self.table} ORDER BY rowid").fetchall()
+        for row in rows:
+            yield dict(zip(self.fieldnames, row))
+
+    def import_csv(self, csv_path):
+        """Importa um CSV no formato antigo (linhas duplicadas: a última vence). Retorna o total lido."""
+        with open(csv_path, mode="r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            rows = [r for r in reader if len(r) >= len(self.fieldnames)]
+        self.upsert_many(rows)
+        return len(rows)
+
+    def export_csv(self, csv_path):
+        """Exporta a tabela para CSV (já compactado, um registro por id)."""
+        with open(csv_path, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.fieldnames)
+            for row in self.iter_rows():
+                writer.writerow([row[c] if row[c] is not None else "" for c in self.fieldnames])
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AnimeCache:
+    """
+    Visão de dicionário sobre a tabela de animes, no mesmo formato de extract_anime.load_anime_cache
+    ({id: {"generos": [...], "source": ...}}). Nada é carregado na abertura: cada id é consultado
+    pelo índice na primeira vez que é pedido e então memorizado.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._memo = {}
+
+    @staticmethod
+    def _entry(row):
+        return {"generos": (row["generos"] or "").split(", "), "source": row["source"]}
+
+    def get(self, anime_id, default=None):
+        anime_id = str(anime_id)
+        entry = self._memo.get(anime_id)
+        if entry is None:
+            row = self.store.get_row(anime_id)
+            if row is None:
+                return default
+            entry = self._memo[anime_id] = self._entry(row)
+        return entry
+
+    def get_many(self, anime_ids):
+        """{id: entrada} dos ids presentes no cache, buscando os ainda não memorizados numa consulta em lote."""
+        anime_ids = {str(a) for a in anime_ids}
+        unknown = [a for a in anime_ids if a not in self._memo]
+        for anime_id, row in self.store.get_rows(unknown).items():
+            self._memo[anime_id] = self._entry(row)
+        return {a: self._memo[a] for a in anime_ids if a in self._memo}
+
+    def __contains__(self, anime_id):
+        return self.get(anime_id) is not None
+
+    def __getitem__(self, anime_id):
+        entry = self.get(anime_id)
+        if entry is None:
+            raise KeyError(anime_id)
+        return entry
+
+    def __setitem__(self, anime_id, entry):
+        # A persistência acontece pelo writerow do store, como no fluxo com CSV
+        self._memo[str(anime_id)] = entry
+
+    def __len__(self):
+        return len(self.store)
+
+    def keys(self):
+        return [row["id"] for row in self.store.iter_rows()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        for row in self.store.iter_rows():
+            yield row["id"], self._memo.get(row["id"]) or self._entry(row)
+
+
+def open_anime_cache(path=CACHE_DB_FILE, import_from=None):
+    """
+    Abre (ou cria) o cache de animes em SQLite. Se estiver vazio e `import_from` apontar para
+    o animes_cache.csv, importa o CSV uma única vez. Retorna (cache, store).
+    """
+    store = SqliteCacheStore(path, ANIME_TABLE, ANIME_FIELDNAMES)
+    if import_from and os.path.exists(import_from) and len(store) == 0:
+        n = store.import_csv(import_from)
+        print(f"Cache de animes importado de {import_from}: {n} linhas.")
+    return AnimeCache(store), store
+
+
+def open_manga_store(path=CACHE_DB_FILE, import_from=None):
+    """Abre (ou cria) a tabela de mangás, importando o mangas_cache.csv se estiver vazia."""
+    store = SqliteCacheStore(path, MANGA_TABLE, MANGA_FIELDNAMES)
+    if import_from and os.path.exists(import_from) and len(store) == 0:
+        n = store.import_csv(import_from)
+        print(f"Cache de mangás importado de {import_from}: {n} linhas.")
+    return store
+
+
+def read_table_rows(path, table):
+    """Lê todas as linhas de uma tabela (para montar DataFrames no recommender)."""
+    fieldnames = MANGA_FIELDNAMES if table == MANGA_TABLE else ANIME_FIELDNAMES
+    with SqliteCacheStore(path, table, fieldnames) as store:
+        return list(store.iter_rows())
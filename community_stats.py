@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+#####################################################################
+# COMMUNITY STATS — ESTATÍSTICAS DE TODAS AS COMUNIDADES DE UMA VEZ #
+#####################################################################
+
+
+def community_labels(index, comms):
+    """Comunidade de cada linha de `index` (-1 para usuários fora de qualquer comunidade)."""
+    labels = np.full(len(index), -1, dtype=np.int64)
+    for i, members in enumerate(comms):
+        rows = index.get_indexer(members)
+        if (rows < 0).any():
+            missing = [u for u, r in zip(members, rows) if r < 0]
+            raise KeyError(f"Usuários da comunidade {i} ausentes dos perfis: {missing[:5]}")
+        labels[rows] = i
+    return labels
+
+
+class CommunityStats:
+    """
+    Somas, médias, médias do "resto" (todos os outros usuários) e lift de cada feature por
+    comunidade, calculadas numa única agregação por segmentos sobre o vetor de rótulos: o custo é
+    O(n·features) independentemente do número de comunidades.
+
+    Tabelas (DataFrames comunidades × features, na ordem de `comms`): sums, means, rest_means, lift.
+    overall_mean é a média de todos os perfis (inclusive os que não estão em nenhuma comunidade).
+    """
+
+    def __init__(self, df: pd.DataFrame, comms):
+        self.columns = df.columns
+        self.labels = community_labels(df.index, comms)
+        n_comms = len(comms)
+
+        X = df.to_numpy(dtype=np.float64)
+        inside = self.labels >= 0
+        indicator = sparse.csr_matrix(
+            (np.ones(int(inside.sum())), (self.labels[inside], np.flatnonzero(inside))),
+            shape=(n_comms, len(X)),
+        )
+        sums = indicator @ X
+        total = X.sum(axis=0)
+
+        self.sizes = np.bincount(self.labels[inside], minlength=n_comms)
+        self.n_rows = len(X)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / self.sizes[:, None]
+            rest_means = (total - sums) / (self.n_rows - self.sizes)[:, None]
+            overall = total / self.n_rows
+            lift = means / overall
+
+        self.sums = pd.DataFrame(sums, columns=self.columns)
+        self.means = pd.DataFrame(means, columns=self.columns)
+        self.rest_means = pd.DataFrame(rest_means, columns=self.columns)
+        self.overall_mean = pd.Series(overall, index=self.columns)
+        self.lift = pd.DataFrame(lift, columns=self.columns)
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def mean(self, community) -> pd.Series:
+        return self.means.iloc[community]
+
+    def rest_mean(self, community) -> pd.Series:
+        return self.rest_means.iloc[community]
@@ -0,0 +1,125 @@
+import csv
+import json
+import os
+import time
+
+###################################################
+# CRAWL JOURNAL — CONTROLE DE RETOMADA DOS PERFIS #
+###################################################
+
+JOURNAL_FILE = "profiles_journal.jsonl"
+
+# Situação de cada usuário no journal
+STATUS_DONE = "done"      # perfil escrito no profiles.csv
+STATUS_EMPTY = "empty"    # lista vazia/privada ou sem animes válidos (não adianta tentar de novo)
+STATUS_FAILED = "failed"  # erro de rede; tentado novamente até o limite de tentativas
+
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class CrawlJournal:
+    """
+    Journal append-only (uma linha JSON por evento) com a situação de cada usuário processado.
+
+    Na retomada, usuários concluídos são pulados e os que falharam voltam para a fila enquanto
+    não atingirem `max_attempts`. Cada registro é gravado com fsync, depois da linha do perfil,
+    então um "done" no journal sempre corresponde a uma linha já persistida no profiles.csv.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.state = {}
+        self._file = None
+
+    def load(self):
+        """Reconstrói o estado a partir do arquivo (linhas truncadas por um crash são ignoradas)."""
+        self.state = {}
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, mode="r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.state[event["username"]] = {
+                    "status": event["status"],
+                    "attempts": event.get("attempts", 1),
+                }
+        return self
+
+    def reset(self):
+        """Descarta o journal anterior (execução do zero)."""
+        self.state = {}
+        with open(self.path, mode="w", encoding="utf-8"):
+            pass
+        return self
+
+    def reconcile(self, profiles_path):
+        """
+        Marca como concluídos os usuários que já estão no profiles.csv mas não no journal
+        (crash entre a escrita do perfil e a do journal, ou arquivo gerado por uma versão antiga).
+        """
+        for username in read_profile_usernames(profiles_path):
+            if self.state.get(username, {}).get("status") != STATUS_DONE:
+                self.record(username, STATUS_DONE)
+
+    def pending(self, usernames):
+        """Usuários ainda a processar, na ordem original."""
+        result = []
+        for username in usernames:
+            entry = self.state.get(username)
+            if entry is None:
+                result.append(username)
+            elif entry["status"] == STATUS_FAILED and entry["attempts"] < self.max_attempts:
+                result.append(username)
+        return result
+
+    def record(self, username, status, error=None):
+        attempts = self.state.get(username, {}).get("attempts", 0) + 1
+        self.state[username] = {"status": status, "attempts": attempts}
+
+        event = {"username": username, "status": status, "attempts": attempts, "ts": time.time()}
+        if error:
+            event["error"] = str(error)
+
+        if self._file is None:
+            self._file = open(self.path, mode="a", encoding="utf-8")
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        _fsync(self._file)
+
+    def summary(self):
+        counts = {STATUS_DONE: 0, STATUS_EMPTY: 0, STATUS_FAILED: 0}
+        for entry in self.state.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def repair_csv_tail(path):
+    """Remove uma última linha incompleta (sem quebra de linha) deixada por um crash."""
+    if not os.path.exists(path) or os.stat(path).st_size == 0:
+        return
+    with open(path, mode="rb+") as f:
+        data = f.read()
+        if data.endswith(b"\n"):
+            return
+        f.truncate(data.rfind(b"\n") + 1)
+
+
+def read_profile_usernames(path):
+    """Usernames já presentes no profiles.csv."""
+    if not os.path.exists(path) or os.stat(path).st_size == 0:
+        return []
+    with open(path, mode="r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [row[0] for row in reader if row]
@@ -1,4 +1,6 @@
-import requests
+import http_client
+import fast_parser
+from http_client import MAL_BASE_URL
 from bs4 import BeautifulSoup
 import re
 import time
@@ -8,36 +10,57 @@ import os
 ANIME_CACHE_FILE = "animes_cache.csv"
 ANIME_CACHE_FIELDNAMES = ["id", "nome", "generos", "source"]
 
-def extract_anime_data(anime_id):
-    """ Extrai informações essenciais (nome, score, gêneros e source(tipo)) de um anime."""
-    url = f"https://myanimelist.net/anime/{anime_id}"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+def parse_anime_page(html, anime_id):
+    """
+    Extrai nome, gêneros e source do HTML de uma página de anime (BeautifulSoup).
+    Levanta fast_parser.PageParseError se faltar o título ou o campo de gêneros.
+    """
+    soup = BeautifulSoup(html, "lxml") 
+    
+    # Extrai e trata os títulos e gêneros dos animes
+    title_tag = soup.find("title")
+    if title_tag is None:
+        raise fast_parser.PageParseError("página sem <title>")
+    nome = title_tag.get_text(strip=True).replace(" - MyAnimeList.net", "").split('|')[0].strip()
+
+    genero_tag = soup.find("span", string=lambda t: t and ('Genre:' in t or 'Genres:' in t))
+    if genero_tag is None:
+        raise fast_parser.PageParseError("página sem o campo Genres:")
+    parent = genero_tag.find_parent("div")
+    if parent is None:
+        raise fast_parser.PageParseError("campo Genres: fora de uma <div>")
+    generos = [a.get_text(strip=True) for a in parent.find_all("a")]
+    
+    # Extrai a fonte original da Obra
+    source = None
+    source_tag = soup.find("span", string=lambda t: t and 'Source:' in t)
+    if source_tag:
+        parent = source_tag.find_parent("div")
+        if parent is None:
+            raise fast_parser.PageParseError("campo Source: fora de uma <div>")
+        full_text = parent.get_text(strip=True)
+        source = full_text.replace("Source:", "").strip()
+
+    return {
+        "id": anime_id,
+        "nome": nome,
+        "generos": ", ".join(generos) if generos else "None",
+        "source": source if source else "None" 
     }
+
+def extract_anime_data(anime_id, base_url=MAL_BASE_URL, engine=None):
+    """ Extrai informações essenciais (nome, score, gêneros e source(tipo)) de um anime."""
+    url = f"{base_url}/anime/{anime_id}"
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status() 
-        soup = BeautifulSoup(response.text, "lxml") 
-        
-        # Extrai e trata os títulos e gêneros dos animes
-        nome = soup.find("title").get_text(strip=True).replace(" - MyAnimeList.net", "").split('|')[0].strip()
-        generos = [a.get_text(strip=True) for a in soup.find("span", string=lambda t: t and ('Genre:' in t or 'Genres:' in t)).find_parent("div").find_all("a")]
-        
-        # Extrai a fonte original da Obra
-        source = None
-        source_tag = soup.find("span", string=lambda t: t and 'Source:' in t)
-        if source_tag:
-            full_text = source_tag.find_parent("div").get_text(strip=True)
-            source = full_text.replace("Source:", "").strip()
-
-        return {
-            "id": anime_id,
-            "nome": nome,
-            "generos": ", ".join(generos) if generos else "None",
-            "source": source if source else "None" 
-        }
+        response = http_client.get(url, timeout=10)
+        if (engine or fast_parser.DEFAULT_ENGINE) == "lxml":
+            return fast_parser.parse_anime_page(response.text, anime_id)
+        return parse_anime_page(response.text, anime_id)
 
+    except fast_parser.PageParseError as e:
+        print(f"Página do anime {anime_id} fora do formato esperado: {e}")
+        return None
     except Exception as e:
         print(f"Erro ao extrair anime {anime_id}: {e}")
         return None
@@ -1,107 +1,125 @@
 import requests
+import http_client
+import fast_parser
+from http_client import MAL_BASE_URL
 from bs4 import BeautifulSoup
 import re
 import time
 import csv
+import queue
+import threading
 
-def extract_work(work_id, work_type="manga"):
+def parse_work_page(html, work_id, work_type="manga"):
+    """
+    Extrai nome, score, gêneros e tipo do HTML de uma página de mangá/manhwa/LN (BeautifulSoup).
+    Retorna None se a obra já foi adaptada para anime.
+    """
+    soup = BeautifulSoup(html, "lxml") 
+    
+    # Extrai e trata os títulos e gêneros dos mangás removendo outros textos irrelevantes da barra de títulos
+    nome_tag = soup.find("title")
+    nome = None
+    if nome_tag:
+        nome_completo = nome_tag.get_text(strip=True).replace(" - MyAnimeList.net", "")
+        nome = nome_completo.split('|')[0].strip()
+
+    # Checa se o mangá já foi adaptado para mídia animada.
+    if work_type == "manga":
+        relation_tags = soup.find_all("div", class_="relation")
+        if relation_tags:
+            for tag in relation_tags:
+                tag_text = tag.get_text(strip=True)
+                if "Adaptation" in tag_text and (
+                    "(TV)" in tag_text or 
+                    "(Movie)" in tag_text or 
+                    "(OVA)" in tag_text or 
+                    "(Special)" in tag_text or 
+                    "(ONA)" in tag_text
+                ):
+                    print(f"IGNORADO: {nome} (Já possui adaptação).")
+                    return None 
+    
+    # Obtêm a Nota média do mangá
+    score = None
+    score_tag = soup.find("span", {"itemprop": "ratingValue"})
+    if score_tag:
+        score = score_tag.get_text(strip=True)
+
+    # Obtêm os gêneros do mangá
+    generos = []
+    genero_tag = soup.find("span", string=lambda t: t and ('Genre:' in t or 'Genres:' in t)) 
+    if genero_tag:
+        parent = genero_tag.find_parent("div")
+        if parent:
+            generos = [
+                a.get_text(strip=True) 
+                for a in parent.find_all("a") 
+                if a.get('href') and ('/genre/' in a.get('href') or '/themes/' in a.get('href'))
+            ]
+
+    # Obtêm o tipo da obra (manhua e manhwa são considerados o mesmo tipo)
+    tipo = None
+    tipo_tag = soup.find("span", string=lambda t: t and 'Type:' in t)
+    if tipo_tag:
+        parent = tipo_tag.find_parent("div")
+        if parent:
+            a_tag = parent.find("a")
+            if a_tag:
+                tipo = a_tag.get_text(strip=True)
+    if tipo:
+        s = tipo.strip().lower()
+        if s == "Manhua":
+            tipo = "Manhwa"
+    # Estrutura do dicionário final para criação do csv
+    work_data = {
+        "id": work_id,
+        "nome": nome,
+        "score": score,
+        "generos": ", ".join(generos) if generos else "None",
+        "tipo": tipo if tipo else "None" 
+    }
+    
+    return work_data
+
+def extract_work(work_id, work_type="manga", base_url=MAL_BASE_URL, engine=None):
     """
     Extrai informações essenciais (nome, score, gêneros e tipo) de um mangá/manhwa/LN
     e filtra aqueles que já foram adaptados para anime.
     """
-    url = f"https://myanimelist.net/{work_type}/{work_id}"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    url = f"{base_url}/{work_type}/{work_id}"
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status() 
-        soup = BeautifulSoup(response.text, "lxml") 
-        
-        # Extrai e trata os títulos e gêneros dos mangás removendo outros textos irrelevantes da barra de títulos
-        nome_tag = soup.find("title")
-        nome = None
-        if nome_tag:
-            nome_completo = nome_tag.get_text(strip=True).replace(" - MyAnimeList.net", "")
-            nome = nome_completo.split('|')[0].strip()
-
-        # Checa se o mangá já foi adaptado para mídia animada.
-        if work_type == "manga":
-            relation_tags = soup.find_all("div", class_="relation")
-            if relation_tags:
-                for tag in relation_tags:
-                    tag_text = tag.get_text(strip=True)
-                    if "Adaptation" in tag_text and (
-                        "(TV)" in tag_text or 
-                        "(Movie)" in tag_text or 
-                        "(OVA)" in tag_text or 
-                        "(Special)" in tag_text or 
-                        "(ONA)" in tag_text
-                    ):
-                        print(f"IGNORADO: {nome} (Já possui adaptação).")
-                        return None 
-        
-        # Obtêm a Nota média do mangá
-        score = None
-        score_tag = soup.find("span", {"itemprop": "ratingValue"})
-        if score_tag:
-            score = score_tag.get_text(strip=True)
-
-        # Obtêm os gêneros do mangá
-        generos = []
-        genero_tag = soup.find("span", string=lambda t: t and ('Genre:' in t or 'Genres:' in t)) 
-        if genero_tag:
-            parent = genero_tag.find_parent("div")
-            if parent:
-                generos = [
-                    a.get_text(strip=True) 
-                    for a in parent.find_all("a") 
-                    if a.get('href') and ('/genre/' in a.get('href') or '/themes/' in a.get('href'))
-                ]
-
-        # Obtêm o tipo da obra (manhua e manhwa são considerados o mesmo tipo)
-        tipo = None
-        tipo_tag = soup.find("span", string=lambda t: t and 'Type:' in t)
-        if tipo_tag:
-            parent = tipo_tag.find_parent("div")
-            if parent:
-                a_tag = parent.find("a")
-                if a_tag:
-                    tipo = a_tag.get_text(strip=True)
-        if tipo:
-            s = tipo.strip().lower()
-            if s == "Manhua":
-                tipo = "Manhwa"
-        # Estrutura do dicionário final para criação do csv
-        work_data = {
-            "id": work_id,
-            "nome": nome,
-            "score": score,
-            "generos": ", ".join(generos) if generos else "None",
-            "tipo": tipo if tipo else "None" 
-        }
-        
-        return work_data
+        response = http_client.get(url, timeout=10)
+        if (engine or fast_parser.DEFAULT_ENGINE) == "lxml":
+            return fast_parser.parse_work_page(response.text, work_id, work_type)
+        return parse_work_page(response.text, work_id, work_type)
 
     except requests.exceptions.RequestException as e:
         print(f"    ⚠️ Erro de Rede/HTTP ao acessar {url}: {e}")
         return None
+    except fast_parser.PageParseError as e:
+        print(f"    ⚠️ Página fora do formato esperado em {url}: {e}")
+        return None
     except Exception as e:
         print(f"    ⚠️ Erro inesperado durante o parsing de {url}: {e}")
         return None
 
 # Extração dos IDs de uma página de Browse do MAL
 
-def extrair_ids_ranking(url_base, limite_total, step=50):
-    """Extrai IDs de anime/manga a partir de páginas de ranking do MAL."""
-    
-    lista_ids = []
+def iter_ids_ranking(url_base, limite_total, step=50, limiter=None, stop_event=None):
+    """
+    Gera, página a página, os IDs novos de anime/manga de um ranking do MAL (sem repetições).
+    Com `limiter` (rate_limit.RateLimiter) o ritmo é controlado por ele; sem, mantém o sleep de 2s.
+    """
+    vistos = set()
     for limit in range(0, limite_total + 1, step):
+        if stop_event is not None and stop_event.is_set():
+            return
         url = f"{url_base}{limit}"
+        if limiter is not None:
+            limiter.acquire()
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
+            response = http_client.get(url, timeout=10)
             soup = BeautifulSoup(response.text, "lxml")
             
             links_titulo = soup.select('a.hoverinfo_trigger.fs14.fw-b')
@@ -120,15 +138,91 @@ def extrair_ids_ranking(url_base, limite_total, step=50):
                     match = re.search(r"/(anime|manga)/(\d+)/", href)
                     if match:
                         anime_id = match.group(2)
-                        if anime_id not in lista_ids:
-                            lista_ids.append(anime_id)
+                        if anime_id not in vistos:
+                            vistos.add(anime_id)
+                            yield anime_id
                             
         except requests.exceptions.RequestException as e:
             print(f"Erro ao acessar {url}: {e}")
             
-        time.sleep(2) 
-        
-    return lista_ids
+        if limiter is None:
+            time.sleep(2) 
+
+def extrair_ids_ranking(url_base, limite_total, step=50):
+    """Extrai IDs de anime/manga a partir de páginas de ranking do MAL."""
+    return list(iter_ids_ranking(url_base, limite_total, step))
+
+_FIM = object()
+
+def stream_mangas(url_base, limite_total, writer, workers=4, rps=0.5, step=50, on_row=None, ranking_rps=None):
+    """
+    Pipeline produtor/consumidor: uma thread percorre o ranking e enfileira cada ID novo assim
+    que sua página é lida; `workers` threads consomem a fila chamando extract_work; a thread
+    principal grava cada linha no `writer` assim que fica pronta.
+
+    `rps` é o ritmo total no site. Por padrão ranking e páginas de detalhe dividem esse mesmo
+    orçamento; com `ranking_rps` o ranking recebe uma fatia fixa dele e os detalhes o restante
+    (rps - ranking_rps), sem aumentar o total.
+    """
+    from rate_limit import RateLimiter
+
+    if ranking_rps is None:
+        limiter = ranking_limiter = RateLimiter(rps)
+    elif 0 < ranking_rps < rps:
+        limiter = RateLimiter(rps - ranking_rps)
+        ranking_limiter = RateLimiter(ranking_rps)
+    else:
+        raise ValueError(f"ranking_rps deve ficar entre 0 e rps ({rps}), recebido {ranking_rps}")
+    ids_queue = queue.Queue(maxsize=workers * 50)
+    results = queue.Queue()
+    stop_event = threading.Event()
+    stats = {"ids": 0, "salvos": 0, "falhas": 0}
+
+    def producer():
+        try:
+            for manga_id in iter_ids_ranking(url_base, limite_total, step, ranking_limiter, stop_event):
+                stats["ids"] += 1
+                ids_queue.put(manga_id)
+        finally:
+            for _ in range(workers):
+                ids_queue.put(_FIM)
+
+    def worker():
+        try:
+            while True:
+                manga_id = ids_queue.get()
+                if manga_id is _FIM or stop_event.is_set():
+                    return
+                limiter.acquire()
+                results.put((manga_id, extract_work(manga_id, work_type="manga")))
+        finally:
+            results.put(_FIM)
+
+    threads = [threading.Thread(target=producer, daemon=True)]
+    threads += [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+
+    finished = 0
+    try:
+        while finished < workers:
+            item = results.get()
+            if item is _FIM:
+                finished += 1
+                continue
+            manga_id, dados_manga = item
+            if dados_manga and dados_manga['nome']:
+                writer.writerow(dados_manga)
+                stats["salvos"] += 1
+            else:
+                stats["falhas"] += 1
+            if on_row is not None:
+                on_row(manga_id, dados_manga, stats)
+    finally:
+        # Em caso de interrupção, produtor e workers param na próxima iteração
+        stop_event.set()
+
+    return stats
 
 # Função main
 
@@ -137,30 +231,64 @@ if __name__ == "__main__":
     # Define o URL exato usado para extração (browse mangás by score)
     URL_MANGA_BASE = "https://myanimelist.net/topmanga.php?limit="
     LIMITE = 9400 # 9400 é aproximadamente o número de mangás de nota > 7, verificado manualmente
-    
-    # extrair ids com base nos parâmetros passados
-    manga_ids = extrair_ids_ranking(URL_MANGA_BASE, limite_total=LIMITE)
-    print(f"\n--- Total de IDs de mangá a processar: {len(manga_ids)} ---")
 
-    # Extrair os dados com base em cada ID extraído
+    # Pipeline em streaming: detalhes começam a ser baixados logo após a primeira página do ranking
+    STREAMING = True
+    WORKERS = 4   # threads consumindo a fila de IDs
+    RPS = 0.5     # requisições por segundo no site (ranking + detalhes), ~1 req a cada 2s
+    RANKING_RPS = None  # None: orçamento compartilhado; um valor < RPS reserva essa fatia para o ranking
+
     csv_filename = "mangas_dados_essenciais.csv"
     fieldnames = ["id", "nome", "score", "generos", "tipo"]
 
-    with open(csv_filename, mode="w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    # Destino das linhas no modo streaming: "csv" ou "sqlite" (tabela de mangás do cache.db)
+    BACKEND = "csv"
+
+    if STREAMING:
+        if BACKEND == "sqlite":
+            from cache_store import open_manga_store, CACHE_DB_FILE
+            csv_filename = CACHE_DB_FILE
+            csvfile = writer = open_manga_store(CACHE_DB_FILE)
+        else:
+            csvfile = open(csv_filename, mode="w", newline="", encoding="utf-8")
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+
+        with csvfile:
+
+            def on_row(manga_id, dados_manga, stats):
+                csvfile.flush()
+                i = stats["salvos"] + stats["falhas"]
+                if dados_manga and dados_manga['nome']:
+                    print(f"[{i}/{stats['ids']}] Sucesso: {dados_manga['nome']}")
+                else:
+                    print(f"[{i}/{stats['ids']}] Falha ao obter dados para o ID: {manga_id}")
+
+            stats = stream_mangas(URL_MANGA_BASE, LIMITE, writer, workers=WORKERS, rps=RPS, on_row=on_row,
+                                  ranking_rps=RANKING_RPS)
+        print(f"\nExtração completa! {stats['salvos']} mangás salvos em {csv_filename}")
+
+    else:
+        # extrair ids com base nos parâmetros passados
+        manga_ids = extrair_ids_ranking(URL_MANGA_BASE, limite_total=LIMITE)
+        print(f"\n--- Total de IDs de mangá a processar: {len(manga_ids)} ---")
+
+        # Extrair os dados com base em cada ID extraído
+        with open(csv_filename, mode="w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
         
-        for i, manga_id in enumerate(manga_ids):
-            # Passando o ID para a função refatorada
-            dados_manga = extract_work(manga_id, work_type="manga") 
+            for i, manga_id in enumerate(manga_ids):
+                # Passando o ID para a função refatorada
+                dados_manga = extract_work(manga_id, work_type="manga") 
             
-            if dados_manga and dados_manga['nome']:
-                writer.writerow(dados_manga)
-                print(f"[{i+1}/{len(manga_ids)}] Sucesso: {dados_manga['nome']}")
-            else:
-                print(f"[{i+1}/{len(manga_ids)}] Falha ao obter dados para o ID: {manga_id}")
+                if dados_manga and dados_manga['nome']:
+                    writer.writerow(dados_manga)
+                    print(f"[{i+1}/{len(manga_ids)}] Sucesso: {dados_manga['nome']}")
+                else:
+                    print(f"[{i+1}/{len(manga_ids)}] Falha ao obter dados para o ID: {manga_id}")
             
-            # Sleep para o IP não ser banido pelo MAL
-            time.sleep(2) 
+                # Sleep para o IP não ser banido pelo MAL
+                time.sleep(2) 
 
-    print(f"\nExtração completa! Dados salvos em {csv_filename}")
\ No newline at end of file
+        print(f"\nExtração completa! Dados salvos em {csv_filename}")
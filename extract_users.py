@@ -1,13 +1,23 @@
 import requests
+import http_client
 from bs4 import BeautifulSoup
 import re
 import time
 import csv
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os 
 
-def extrair_pagina_usuarios(page_number):
-    """Extrai todos os usuários de uma única página e seus status de atividade."""
+# Tentativas de uma página que falhou (contando a primeira) antes de ela ser descartada
+MAX_TENTATIVAS_PAGINA = 3
+
+def extrair_pagina_usuarios(page_number, raise_errors=False):
+    """
+    Extrai todos os usuários de uma única página e seus status de atividade.
+    Com raise_errors=True uma falha de rede é propagada em vez de tratada como página vazia.
+    """
     
     # Base URL com filtro de localização (Brasil)
     BASE_URL = "https://myanimelist.net/users.php?cat=user&q=&loc=Brazil&agelow=0&agehigh=0&g="
@@ -18,8 +28,7 @@ def extrair_pagina_usuarios(page_number):
     print(f"-> Extraindo usuários da Página {page_number} (Offset: {show_offset})")
     
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        response = http_client.get(url, timeout=10)
         soup = BeautifulSoup(response.text, "lxml")
         
         user_data_cells = soup.select('td[align="center"].borderClass')
@@ -44,6 +53,8 @@ def extrair_pagina_usuarios(page_number):
             
     except requests.exceptions.RequestException as e:
         print(f"Erro ao acessar {url}: {e}")
+        if raise_errors:
+            raise
         return usuarios_encontrados, True
 
 def check_activity(date_string, min_year):
@@ -87,6 +98,146 @@ def salvar_usuarios_em_csv(usuarios, filename, append=False):
         for user in usuarios:
             writer.writerow([user])
 
+def _load_state(state_file):
+    state = {"next_page": 1, "paginas_com_erro": {}, "paginas_descartadas": [], "fim_da_lista": False}
+    if state_file and os.path.exists(state_file):
+        with open(state_file, mode="r", encoding="utf-8") as f:
+            state.update(json.load(f))
+    # Páginas com erro: {página: tentativas já feitas} (estados antigos guardavam só a lista)
+    if isinstance(state["paginas_com_erro"], list):
+        state["paginas_com_erro"] = {str(p): 1 for p in state["paginas_com_erro"]}
+    return state
+
+def _save_state(state_file, state):
+    if not state_file:
+        return
+    tmp = f"{state_file}.tmp"
+    with open(tmp, mode="w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, state_file)
+
+def _load_usernames(filename):
+    if not os.path.exists(filename) or os.stat(filename).st_size == 0:
+        return []
+    with open(filename, mode="r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [row[0] for row in reader if row]
+
+def discover_active_users(goal, min_year, filename, state_file=None, workers=4, rps=0.5, max_pages=None):
+    """
+    Busca usuários ativos até atingir `goal`, com várias páginas (offsets `show=`) em andamento
+    ao mesmo tempo sob o limite de `rps` requisições por segundo.
+
+    As páginas são consumidas em ordem: os usuários novos são deduplicados e anexados ao CSV
+    assim que sua página chega, e o estado (próxima página a ler) é salvo em `state_file`,
+    de modo que uma nova chamada continua de onde a anterior parou. Ao atingir a meta, as
+    páginas pendentes são canceladas. Retorna a lista completa de usuários do arquivo.
+
+    Páginas que falharam ficam no estado e são buscadas de novo antes das seguintes na próxima
+    chamada; depois de MAX_TENTATIVAS_PAGINA falhas vão para "paginas_descartadas".
+    """
+    from rate_limit import RateLimiter
+
+    state = _load_state(state_file)
+    usuarios = _load_usernames(filename)
+    vistos = set(usuarios)
+
+    erros = state["paginas_com_erro"]
+    if len(usuarios) >= goal or (state["fim_da_lista"] and not erros):
+        print(f"Nada a buscar: {len(usuarios)} usuários já salvos em {filename}.")
+        return usuarios
+
+    limiter = RateLimiter(rps)
+    first_page = state["next_page"]
+    last_page = first_page + max_pages - 1 if max_pages else None
+    retry = deque(sorted(int(p) for p in erros))
+    if state["fim_da_lista"]:
+        last_page = first_page - 1
+    print(f"Retomando da página {first_page} ({len(usuarios)}/{goal} usuários já salvos).")
+    if retry:
+        print(f"Repetindo primeiro {len(retry)} página(s) com erro: {list(retry)}")
+
+    def fetch(page_number):
+        limiter.acquire()
+        return extrair_pagina_usuarios(page_number, raise_errors=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        next_to_submit = first_page
+
+        def fill():
+            nonlocal next_to_submit
+            while len(pending) < workers and retry:
+                page_number = retry.popleft()
+                pending.append((page_number, True, pool.submit(fetch, page_number)))
+            while len(pending) < workers and (last_page is None or next_to_submit <= last_page):
+                pending.append((next_to_submit, False, pool.submit(fetch, next_to_submit)))
+                next_to_submit += 1
+
+        fill()
+        while pending:
+            page_number, is_retry, future = pending.popleft()
+            try:
+                page_data, has_more = future.result()
+                erros.pop(str(page_number), None)
+            except requests.exceptions.RequestException:
+                tentativas = erros.get(str(page_number), 0) + 1
+                if tentativas >= MAX_TENTATIVAS_PAGINA:
+                    print(f"Página {page_number} descartada após {tentativas} tentativas.")
+                    erros.pop(str(page_number), None)
+                    state["paginas_descartadas"].append(page_number)
+                else:
+                    erros[str(page_number)] = tentativas
+                page_data, has_more = [], True
+
+            novos = []
+            meta_atingida = False
+            for user in page_data:
+                if not check_activity(user["last_online"], min_year):
+                    continue
+                username = user["username"]
+                if username in vistos:
+                    continue
+                vistos.add(username)
+                novos.append(username)
+                print(f"Ativo (Total: {len(vistos)}/{goal}): {username} (Último acesso: {user['last_online']})")
+                if len(vistos) >= goal:
+                    meta_atingida = True
+                    break
+
+            if novos:
+                salvar_usuarios_em_csv(novos, filename, append=True)
+                usuarios.extend(novos)
+
+            if is_retry:
+                # Página repetida: não mexe na posição da varredura (a não ser que a meta
+                # interrompa a página, que então volta para a lista de erros)
+                if meta_atingida:
+                    erros[str(page_number)] = erros.get(str(page_number), 0)
+                _save_state(state_file, state)
+                if meta_atingida:
+                    for _, _, f in pending:
+                        f.cancel()
+                    break
+                fill()
+                continue
+
+            # Página interrompida no meio é relida na próxima execução (duplicados são descartados)
+            state["next_page"] = page_number if meta_atingida else page_number + 1
+            state["fim_da_lista"] = not has_more
+            _save_state(state_file, state)
+
+            if meta_atingida or not has_more:
+                for _, _, f in pending:
+                    f.cancel()
+                break
+            fill()
+
+    if state["fim_da_lista"] and len(usuarios) < goal:
+        print("\nFim da lista de usuários na região 'Brasil'. Não foi possível atingir a meta.")
+    return usuarios
+
 # função main para extração separada
 
 if __name__ == "__main__":
@@ -96,53 +247,29 @@ if __name__ == "__main__":
     ANO_MINIMO_ATIVIDADE = 2017 
     
     USUARIOS_OUTPUT_FILE = f"usernames_{ANO_MINIMO_ATIVIDADE}.csv"
-    current_page = 1 
-    usuarios_ativos_encontrados = set() 
+    # Guarda a próxima página a ler; apagar o arquivo recomeça a busca da página 1
+    ESTADO_FILE = f"usernames_{ANO_MINIMO_ATIVIDADE}_estado.json"
+
+    # Páginas buscadas ao mesmo tempo e orçamento de requisições por segundo
+    WORKERS = 4
+    RPS = 0.5
     
     print(f"Configuração: Meta={USUARIO_GOAL} | Atividade Mínima: {ANO_MINIMO_ATIVIDADE}")
-    
-    # Loop de Extração
-    while len(usuarios_ativos_encontrados) < USUARIO_GOAL:
-        
-        # Extrair a página atual
-        page_data, has_more = extrair_pagina_usuarios(current_page)
-        
-        # Processar usuários e checar a meta
-        novos_usuarios_ativos = []
-        for user in page_data:
-            
-            # chamada da função de atividade
-            if check_activity(user["last_online"], ANO_MINIMO_ATIVIDADE):
-                username = user["username"]
-                if username not in usuarios_ativos_encontrados:
-                    usuarios_ativos_encontrados.add(username)
-                    novos_usuarios_ativos.append(username)
-                    print(f"Ativo (Total: {len(usuarios_ativos_encontrados)}/{USUARIO_GOAL}): {username} (Último acesso: {user['last_online']})")
-                
-                # Checa a meta APÓS adicionar o usuário
-                if len(usuarios_ativos_encontrados) >= USUARIO_GOAL:
-                    break
-        
-        # C. Salvar os novos usuários ativos encontrados no CSV
-        if novos_usuarios_ativos:
-            salvar_usuarios_em_csv(novos_usuarios_ativos, USUARIOS_OUTPUT_FILE, append=True)
-            print(f" {len(novos_usuarios_ativos)} novos usuários foram salvos. ...")
-        
-        # D. Verificar condições de parada do loop WHILE
-        if len(usuarios_ativos_encontrados) >= USUARIO_GOAL:
-            print(f"\nMeta de {USUARIO_GOAL} usuários ativos atingida! ---")
-            break
-            
-        if not has_more:
-            # Se terminou a lista E não atingiu a meta, informa.
-            print("\nFim da lista de usuários na região 'Brasil'. Não foi possível atingir a meta.")
-            print(f"Tente mudar o ANO_MINIMO_ATIVIDADE (atualmente {ANO_MINIMO_ATIVIDADE}) para um ano anterior.")
-            break
-        
-        # E. Preparar para a próxima iteração e sleep para evitar ban
-        current_page += 1
-        time.sleep(3) 
+
+    usuarios_ativos_encontrados = discover_active_users(
+        USUARIO_GOAL,
+        ANO_MINIMO_ATIVIDADE,
+        USUARIOS_OUTPUT_FILE,
+        state_file=ESTADO_FILE,
+        workers=WORKERS,
+        rps=RPS
+    )
+
+    if len(usuarios_ativos_encontrados) >= USUARIO_GOAL:
+        print(f"\nMeta de {USUARIO_GOAL} usuários ativos atingida! ---")
+    else:
+        print(f"Tente mudar o ANO_MINIMO_ATIVIDADE (atualmente {ANO_MINIMO_ATIVIDADE}) para um ano anterior.")
 
     # resultado final da extração
     print(f"\nTotal final de usuários ativos encontrados: {len(usuarios_ativos_encontrados)}")
-    print(f"Lista de usuários ativos salva em {USUARIOS_OUTPUT_FILE}")
\ No newline at end of file
+    print(f"Lista de usuários ativos salva em {USUARIOS_OUTPUT_FILE}")
@@ -0,0 +1,169 @@
+import os
+
+from lxml import etree
+
+##############################################################
+# FAST PARSER — EXTRAÇÃO DIRETA COM lxml + XPATH COMPILADO   #
+##############################################################
+
+# Motor padrão das extrações: "bs4" (BeautifulSoup, original) ou "lxml" (este módulo)
+DEFAULT_ENGINE = os.environ.get("MAL_PARSER", "bs4")
+
+_HTML_PARSER = etree.HTMLParser()
+
+
+class PageParseError(ValueError):
+    """Página sem um campo obrigatório; levantada igualmente pelos dois motores (bs4 e lxml)."""
+
+# Consultas compiladas uma única vez. Os filtros por texto são apenas um pré-filtro barato
+# (string-value do XPath); a regra exata do BeautifulSoup (Tag.string) é aplicada em Python.
+_XP_TITLE = etree.XPath("(//title)[1]")
+_XP_GENRE_SPANS = etree.XPath("//span[contains(., 'Genre:') or contains(., 'Genres:')]")
+_XP_SOURCE_SPANS = etree.XPath("//span[contains(., 'Source:')]")
+_XP_TYPE_SPANS = etree.XPath("//span[contains(., 'Type:')]")
+_XP_RELATIONS = etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' relation ')]")
+_XP_SCORE = etree.XPath("(//span[@itemprop='ratingValue'])[1]")
+_XP_LINKS = etree.XPath(".//a")
+
+# Conteúdo dessas tags não entra no get_text() do BeautifulSoup
+_SKIP_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+
+
+def _parse(html):
+    return etree.fromstring(html, _HTML_PARSER)
+
+
+def _text(el):
+    """Equivalente a Tag.get_text(strip=True) do BeautifulSoup."""
+    parts = []
+
+    def walk(node):
+        if node.text and node.tag not in _SKIP_TEXT_TAGS:
+            parts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str):
+                walk(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(el)
+    return "".join(p.strip() for p in parts if p.strip())
+
+
+def _bs4_string(el):
+    """Equivalente a Tag.string: o único texto filho (descendo por filhos únicos), ou None."""
+    while True:
+        n_children = len(el) + (1 if el.text else 0)
+        if n_children != 1 or (len(el) == 1 and el[0].tail):
+            return None
+        if el.text:
+            return el.text
+        el = el[0]
+        if not isinstance(el.tag, str):
+            # comentário: no BeautifulSoup também é uma string
+            return el.text
+
+
+def _find_span(spans, predicate):
+    for span in spans:
+        t = _bs4_string(span)
+        if t and predicate(t):
+            return span
+    return None
+
+
+def _parent_div(el):
+    return next(el.iterancestors("div"), None)
+
+
+def _is_genre_label(t):
+    return 'Genre:' in t or 'Genres:' in t
+
+
+def parse_anime_page(html, anime_id):
+    """Mesmo resultado de extract_anime.parse_anime_page, sem construir a árvore do BeautifulSoup."""
+    root = _parse(html)
+
+    title = _XP_TITLE(root)
+    if not title:
+        raise PageParseError("página sem <title>")
+    nome = _text(title[0]).replace(" - MyAnimeList.net", "").split('|')[0].strip()
+
+    genero_tag = _find_span(_XP_GENRE_SPANS(root), _is_genre_label)
+    if genero_tag is None:
+        raise PageParseError("página sem o campo Genres:")
+    parent = _parent_div(genero_tag)
+    if parent is None:
+        raise PageParseError("campo Genres: fora de uma <div>")
+    generos = [_text(a) for a in _XP_LINKS(parent)]
+
+    source = None
+    source_tag = _find_span(_XP_SOURCE_SPANS(root), lambda t: 'Source:' in t)
+    if source_tag is not None:
+        parent = _parent_div(source_tag)
+        if parent is None:
+            raise PageParseError("campo Source: fora de uma <div>")
+        source = _text(parent).replace("Source:", "").strip()
+
+    return {
+        "id": anime_id,
+        "nome": nome,
+        "generos": ", ".join(generos) if generos else "None",
+        "source": source if source else "None"
+    }
+
+
+def parse_work_page(html, work_id, work_type="manga"):
+    """Mesmo resultado de extract_manga.parse_work_page, sem construir a árvore do BeautifulSoup."""
+    root = _parse(html)
+
+    nome = None
+    title = _XP_TITLE(root)
+    if title:
+        nome = _text(title[0]).replace(" - MyAnimeList.net", "").split('|')[0].strip()
+
+    if work_type == "manga":
+        for tag in _XP_RELATIONS(root):
+            tag_text = _text(tag)
+            if "Adaptation" in tag_text and (
+                "(TV)" in tag_text or
+                "(Movie)" in tag_text or
+                "(OVA)" in tag_text or
+                "(Special)" in tag_text or
+                "(ONA)" in tag_text
+            ):
+                print(f"IGNORADO: {nome} (Já possui adaptação).")
+                return None
+
+    score = None
+    score_tag = _XP_SCORE(root)
+    if score_tag:
+        score = _text(score_tag[0])
+
+    generos = []
+    genero_tag = _find_span(_XP_GENRE_SPANS(root), _is_genre_label)
+    if genero_tag is not None:
+        parent = _parent_div(genero_tag)
+        if parent is not None:
+            generos = [
+                _text(a)
+                for a in _XP_LINKS(parent)
+                if a.get('href') and ('/genre/' in a.get('href') or '/themes/' in a.get('href'))
+            ]
+
+    tipo = None
+    tipo_tag = _find_span(_XP_TYPE_SPANS(root), lambda t: 'Type:' in t)
+    if tipo_tag is not None:
+        parent = _parent_div(tipo_tag)
+        if parent is not None:
+            links = _XP_LINKS(parent)
+            if links:
+                tipo = _text(links[0])
+
+    return {
+        "id": work_id,
+        "nome": nome,
+        "score": score,
+        "generos": ", ".join(generos) if generos else "None",
+        "tipo": tipo if tipo else "None"
+    }
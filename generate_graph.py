@@ -1,16 +1,46 @@
+import numpy as np
 import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
 from sklearn.metrics.pairwise import cosine_similarity
-from networkx.algorithms.community import greedy_modularity_communities
+from sklearn.preprocessing import normalize
 
 
 ###############################################
 # GRAPH GENERATOR — CLUSTERIZAÇÃO DE PERFIS  #
 ###############################################
 
-def load_profiles(path: str) -> pd.DataFrame:
-    """Carrega o csv e prepara um DataFrame de perfis."""
+# Lado dos blocos da matriz de similaridade: cada bloco ocupa block_size² floats (2048 → 32 MB)
+SIMILARITY_BLOCK_SIZE = 2048
+
+# Tipo de grafo: "threshold" (pares com similaridade >= threshold, custo quadrático)
+# ou "knn" (cada usuário ligado aos KNN_K vizinhos mais similares, índice aproximado)
+GRAPH_MODE = "threshold"
+KNN_K = 10
+
+# Motor de comunidades (ver communities.py): "greedy", "louvain" ou "label_propagation"
+COMMUNITY_ENGINE = "greedy"
+
+# Similaridade mínima para ligar dois usuários no modo "threshold"
+DEFAULT_THRESHOLD = 0.98
+
+# Desenho do grafo: "spring" (layout original) ou "fast" (graph_render.py, escala para grafos grandes)
+DRAW_MODE = "spring"
+
+# Preparação das features para a clusterização: TF-IDF nos gêneros e peso extra nas sources
+TFIDF_GENRES = True
+SOURCE_WEIGHT = 1.5
+
+def load_profiles(path: str, binary: bool = False) -> pd.DataFrame:
+    """
+    Carrega o csv e prepara um DataFrame de perfis.
+    Com binary=True usa a matriz float32 mapeada em memória (profile_matrix.py), sem copiar,
+    convertendo o CSV automaticamente quando ele for mais novo que o artefato.
+    """
+    if binary:
+        from profile_matrix import open_profiles
+        return open_profiles(path)
+
     df = pd.read_csv(path)
     df = df.set_index("username")
     return df
@@ -21,6 +51,47 @@ def normalize_percent(df: pd.DataFrame) -> pd.DataFrame:
     return df.div(df.sum(axis=1), axis=0)
 
 
+def prepare_features(df: pd.DataFrame, tfidf: bool = TFIDF_GENRES, source_weight: float = SOURCE_WEIGHT,
+                     idf=None) -> pd.DataFrame:
+    """
+    Features usadas na clusterização: perfis normalizados em percentuais, TF-IDF nos gêneros
+    (diminui o peso dos gêneros extremamente populares) e sources multiplicadas por source_weight
+    (para elas aparecerem no resultado). Com `idf` (ver genre_idf) o TF-IDF usa esses pesos
+    congelados em vez de reajustá-los aos perfis recebidos.
+    """
+    print("Normalizando dados em percentuais...")
+    df_norm = normalize_percent(df)
+
+    if tfidf:
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        genre_cols = [c for c in df_norm.columns if c.startswith("Genre_")]
+
+        print("Aplicando TF-IDF nos gêneros...")
+        transformer = TfidfTransformer(norm='l2', use_idf=True)
+        if idf is None:
+            df_norm[genre_cols] = transformer.fit_transform(df_norm[genre_cols]).toarray()
+        else:
+            transformer.idf_ = np.asarray(idf, dtype=np.float64)
+            df_norm[genre_cols] = transformer.transform(df_norm[genre_cols].to_numpy()).toarray()
+
+    if source_weight != 1:
+        print("Ajustando peso de fontes...")
+        source_cols = [c for c in df_norm.columns if c.startswith("Source_")]
+        df_norm[source_cols] = df_norm[source_cols] * source_weight
+
+    return df_norm
+
+
+def genre_idf(df: pd.DataFrame):
+    """Pesos idf do TF-IDF dos gêneros ajustados aos perfis `df` (para congelar em prepare_features)."""
+    from sklearn.feature_extraction.text import TfidfTransformer
+
+    df_norm = normalize_percent(df)
+    genre_cols = [c for c in df_norm.columns if c.startswith("Genre_")]
+    return TfidfTransformer(norm='l2', use_idf=True).fit(df_norm[genre_cols].to_numpy()).idf_
+
+
 def compute_similarity(df_norm: pd.DataFrame) -> pd.DataFrame:
     """Gera a matriz de similaridade por cosseno."""
     sim = cosine_similarity(df_norm)
@@ -33,38 +104,110 @@ def build_graph(sim_df: pd.DataFrame, threshold: float = 0.35) -> nx.Graph:
     G = nx.Graph()
 
     users = sim_df.index.tolist()
+    sim = sim_df.to_numpy()
+
+    # Pares (i < j) em ordem de linha, a mesma do laço duplo original
+    rows, cols = np.nonzero(np.triu(sim >= threshold, k=1))
+    G.add_weighted_edges_from(
+        (users[i], users[j], sim[i, j]) for i, j in zip(rows.tolist(), cols.tolist())
+    )
+
+    return G
+
 
-    for i, u in enumerate(users):
-        for j in range(i + 1, len(users)):
-            v = users[j]
-            score = sim_df.loc[u, v]
-            if score >= threshold:
-                G.add_edge(u, v, weight=score)
+def iter_similar_pairs(X, threshold: float, block_size: int = SIMILARITY_BLOCK_SIZE):
+    """
+    Pares (i, j, similaridade) com i < j e similaridade de cosseno >= threshold, em blocos.
 
+    A matriz é normalizada (L2) uma única vez e cada bloco block_size × block_size do triângulo
+    superior é uma multiplicação de matrizes; a matriz n × n nunca existe inteira. Os pares saem
+    em ordem de linha (i, depois j), como no laço duplo de build_graph.
+    """
+    Xn = normalize(np.asarray(X, dtype=np.float64))
+    n = len(Xn)
+
+    for r0 in range(0, n, block_size):
+        r1 = min(r0 + block_size, n)
+        found = []
+        for c0 in range(r0, n, block_size):
+            c1 = min(c0 + block_size, n)
+            block = Xn[r0:r1] @ Xn[c0:c1].T
+            bi, bj = np.nonzero(block >= threshold)
+            found.append((bi + r0, bj + c0, block[bi, bj]))
+
+        rows = np.concatenate([f[0] for f in found])
+        cols = np.concatenate([f[1] for f in found])
+        weights = np.concatenate([f[2] for f in found])
+        upper = cols > rows
+        rows, cols, weights = rows[upper], cols[upper], weights[upper]
+
+        # Os blocos de colunas intercalam as linhas: reordena para a ordem (i, j)
+        order = np.lexsort((cols, rows))
+        yield rows[order], cols[order], weights[order]
+
+
+def iter_edges(df_norm: pd.DataFrame, threshold: float, block_size: int = SIMILARITY_BLOCK_SIZE):
+    """Lista de arestas (u, v, peso) gerada sob demanda, bloco a bloco."""
+    users = df_norm.index.tolist()
+    for rows, cols, weights in iter_similar_pairs(df_norm.to_numpy(), threshold, block_size):
+        for i, j, w in zip(rows.tolist(), cols.tolist(), weights.tolist()):
+            yield users[i], users[j], w
+
+
+def build_graph_blockwise(df_norm: pd.DataFrame, threshold: float = 0.35,
+                          block_size: int = SIMILARITY_BLOCK_SIZE) -> nx.Graph:
+    """
+    Equivalente a build_graph(compute_similarity(df_norm), threshold) sem a matriz densa n × n:
+    a memória de pico é limitada por block_size e as arestas são carregadas em lote no grafo.
+    """
+    G = nx.Graph()
+    G.add_weighted_edges_from(iter_edges(df_norm, threshold, block_size))
     return G
 
 
-def detect_communities(G: nx.Graph):
-    """Agrupa usuários usando modularidade gulosa."""
+def build_user_graph(df_norm: pd.DataFrame, threshold: float = 0.35, graph_mode: str = GRAPH_MODE,
+                     knn_k: int = KNN_K) -> nx.Graph:
+    """Constrói o grafo de usuários no modo escolhido ("threshold" ou "knn")."""
+    if graph_mode == "knn":
+        from knn_graph import build_knn_graph
+        return build_knn_graph(df_norm, k=knn_k)
+    if graph_mode != "threshold":
+        raise ValueError(f"Modo de grafo desconhecido: {graph_mode}")
+    return build_graph_blockwise(df_norm, threshold)
+
+
+def detect_communities(G: nx.Graph, engine: str = COMMUNITY_ENGINE, workers=None):
+    """
+    Agrupa usuários usando modularidade gulosa (greedy_modularity_communities no grafo inteiro,
+    padrão) ou outro motor de communities.py; louvain e label_propagation rodam um componente
+    conexo por vez e, em grafos grandes, em paralelo.
+    """
     if len(G.nodes) == 0:
         return []
 
-    comms = greedy_modularity_communities(G)
-
-    # Converte para lista de listas
-    return [list(c) for c in comms]
+    from communities import detect
+    # Lista de listas, maiores comunidades primeiro
+    return detect(G, engine=engine, workers=workers)
 
 
-def describe_community(df, users):
-    """Gera uma descrição da comunidade para uso na descrição do grafo e no arquivo de output."""
+def describe_community(df, users, stats=None, community=None):
+    """
+    Gera uma descrição da comunidade para uso na descrição do grafo e no arquivo de output.
+    Com `stats` (CommunityStats de community_stats.py) e o índice `community`, as médias vêm da
+    tabela já calculada em vez de copiar o DataFrame.
+    """
     source_cols = [c for c in df.columns if c.startswith("Source_")]
     genre_cols  = [c for c in df.columns if c.startswith("Genre_")]
 
-    sub = df.loc[users]
-    rest = df.drop(users)
+    if stats is not None and community is not None:
+        mean_sub = stats.mean(community)
+        mean_rest = stats.rest_mean(community)
+    else:
+        sub = df.loc[users]
+        rest = df.drop(users)
 
-    mean_sub = sub.mean()
-    mean_rest = rest.mean()
+        mean_sub = sub.mean()
+        mean_rest = rest.mean()
 
     # diferenças (quanto esse gênero é característico da comunidade)
     diff = mean_sub[genre_cols] - mean_rest[genre_cols]
@@ -81,26 +224,30 @@ def describe_community(df, users):
         "n_users": len(users)
     }
 
-def generate_community_names(df, comms, top_k=2):
+def generate_community_names(df, comms, top_k=2, stats=None):
     """
     Gera nomes determinísticos para cada comunidade e Retorna lista de comunidades já nomeadas
+    Com `stats` (CommunityStats das mesmas comunidades) as médias vêm da tabela já calculada.
     """
     source_cols = [c for c in df.columns if c.startswith("Source_")]
     genre_cols  = [c for c in df.columns if c.startswith("Genre_")]
 
     # Precompute means for efficiency
-    overall_mean = df.mean()
+    overall_mean = stats.overall_mean if stats is not None else df.mean()
 
     names = []
     taken = set()
 
-    for comm in comms:
+    for i, comm in enumerate(comms):
         if len(comm) == 0:
             names.append("Comunidade Vazia")
             continue
 
-        sub = df.loc[comm]
-        mean_sub = sub.mean()
+        if stats is not None:
+            mean_sub = stats.mean(i)
+        else:
+            sub = df.loc[comm]
+            mean_sub = sub.mean()
         diff = (mean_sub[genre_cols] - (overall_mean[genre_cols])).sort_values(ascending=False)
 
         ordered_genres = [g.replace("Genre_", "") for g in diff.index.tolist() if diff[g] > -1e9]  # preserve order
@@ -131,23 +278,13 @@ def generate_community_names(df, comms, top_k=2):
 
 from collections import defaultdict
 
-def draw_graph(G, communities, df, community_names=None, output="graph.png"):
-    """
-    Gera imagem PNG do grafo com cores por comunidade e legenda com gêneros.
-    """
-
+def community_colors(n_comms):
+    """Uma cor por comunidade: paleta TABLEAU e, passando de 10 comunidades, cores HSV extras."""
     import matplotlib.colors as mcolors
-    if len(G.nodes) == 0:
-        print("Grafo vazio — nada para desenhar.")
-        return
-
-    # Define Layout do grafo
-    pos = nx.spring_layout(G, seed=42, k=0.3, iterations=50)
 
     # Cores base (TABLEAU)
     base_colors = list(mcolors.TABLEAU_COLORS.values())
     n_base = len(base_colors)
-    n_comms = len(communities)
 
     # Gerar cores extras, caso necessário (+10 comunidades)
     extra_colors = []
@@ -163,7 +300,52 @@ def draw_graph(G, communities, df, community_names=None, output="graph.png"):
 
         extra_colors = generate_colors(n_needed)
 
-    all_colors = base_colors + extra_colors
+    return base_colors + extra_colors
+
+
+def community_legend(communities, community_names, all_colors):
+    """Legenda do grafo: nome e tamanho de cada comunidade, com a sua cor."""
+    from matplotlib.patches import Patch
+    legend_elements = []
+
+    for i, comm in enumerate(communities):
+        label = community_names[i]
+        color = all_colors[i]
+        legend_elements.append(
+            Patch(facecolor=color, edgecolor='black',
+                label=f"{label} ({len(comm)} usuários)")
+    )
+
+    plt.legend(
+        handles=legend_elements,
+        title="Comunidades (gêneros dominantes)",
+        fontsize=10,
+        title_fontsize=12,
+        loc="upper left",
+        bbox_to_anchor=(1, 1)
+    )
+
+
+def draw_graph(G, communities, df, community_names=None, output="graph.png", mode=DRAW_MODE):
+    """
+    Gera imagem PNG do grafo com cores por comunidade e legenda com gêneros.
+    Com mode="fast" usa o renderizador escalável de graph_render.py (layout por comunidade,
+    arestas amostradas e posições reaproveitadas entre execuções); "spring" é o desenho original.
+    """
+    if mode == "fast":
+        from graph_render import render_graph
+        return render_graph(G, communities, df, community_names=community_names, output=output)
+    if mode != "spring":
+        raise ValueError(f"Modo de desenho desconhecido: {mode}")
+
+    if len(G.nodes) == 0:
+        print("Grafo vazio — nada para desenhar.")
+        return
+
+    # Define Layout do grafo
+    pos = nx.spring_layout(G, seed=42, k=0.3, iterations=50)
+
+    all_colors = community_colors(len(communities))
 
 
     # Mapear nó → cor (cada comunidade recebe sua cor correspondente)
@@ -190,25 +372,7 @@ def draw_graph(G, communities, df, community_names=None, output="graph.png"):
         community_names = generate_community_names(df, communities, top_k=2)
 
     #  gerar legenda do grafo
-    from matplotlib.patches import Patch
-    legend_elements = []
-
-    for i, comm in enumerate(communities):
-        label = community_names[i]
-        color = all_colors[i]
-        legend_elements.append(
-            Patch(facecolor=color, edgecolor='black',
-                label=f"{label} ({len(comm)} usuários)")
-    )
-
-    plt.legend(
-        handles=legend_elements,
-        title="Comunidades (gêneros dominantes)",
-        fontsize=10,
-        title_fontsize=12,
-        loc="upper left",
-        bbox_to_anchor=(1, 1)
-    )
+    community_legend(communities, community_names, all_colors)
 
     plt.tight_layout()
     plt.savefig(output, dpi=300, bbox_inches="tight")
@@ -219,59 +383,58 @@ def draw_graph(G, communities, df, community_names=None, output="graph.png"):
 
 
 # função main
-def main(file_path: str, threshold: float = 0.35):
+def main(file_path: str, threshold: float = DEFAULT_THRESHOLD, binary: bool = False,
+         graph_mode: str = GRAPH_MODE, knn_k: int = KNN_K, community_engine: str = COMMUNITY_ENGINE,
+         tfidf: bool = TFIDF_GENRES, source_weight: float = SOURCE_WEIGHT, use_cache: bool = True,
+         export_dir: str = None, incremental: bool = False):
     print("Carregando perfis...")
-    df = load_profiles(file_path)
-
-    print("Normalizando dados em percentuais...")
-    df_norm = normalize_percent(df)
-
-    # aplicando TF-IDF nos gêneros para diminuir o peso dos gêneros extremamente populares
-    from sklearn.feature_extraction.text import TfidfTransformer
-
-    genre_cols = [c for c in df_norm.columns if c.startswith("Genre_")]
-
-    print("Aplicando TF-IDF nos gêneros...")
-    tfidf = TfidfTransformer(norm='l2', use_idf=True)
-    df_norm[genre_cols] = tfidf.fit_transform(df_norm[genre_cols]).toarray()
-
-    # aumentando o peso das sources para elas aparecerem no resultado
-    print("Ajustando peso de fontes...")
-    source_cols = [c for c in df_norm.columns if c.startswith("Source_")]
-    df_norm[source_cols] = df_norm[source_cols] * 1.5
-
-    # calculando similaridade de cosseno
-    print("Calculando similaridade entre usuários...")
-    sim_df = compute_similarity(df_norm)
-
-
-    # constrói o grafo
-    print(f"Construindo grafo com threshold = {threshold}...")
-    G = build_graph(sim_df, threshold)
-
-    print(f"Nó(s): {len(G.nodes)}  —  Arestas: {len(G.edges)}")
-
-    print("Detectando comunidades...")
-    comms = detect_communities(G)
+    df = load_profiles(file_path, binary=binary)
+
+    # features, grafo e comunidades vêm do cache de artefatos quando os parâmetros já foram usados
+    # ou, no modo incremental, do estado anterior atualizado só com os perfis novos (incremental_graph.py)
+    if incremental:
+        from incremental_graph import update_graph
+        df_norm, G, comms = update_graph(df, threshold, community_engine, tfidf, source_weight, binary, graph_mode)
+    else:
+        from artifacts import load_or_build
+        df_norm, G, comms = load_or_build(file_path, df, threshold, binary, graph_mode, knn_k,
+                                          community_engine, tfidf, source_weight, use_cache=use_cache)
 
     print(f"Encontradas {len(comms)} comunidades.")
 
+    # Médias, médias do resto e lift de todas as comunidades numa única agregação
+    from community_stats import CommunityStats
+    stats = CommunityStats(df, comms)
+
     # Gera nomes para output
-    community_names = generate_community_names(df, comms, top_k=2)
+    community_names = generate_community_names(df, comms, top_k=2, stats=stats)
 
     for i, c in enumerate(comms):
         # detalhe para console: ainda mostramos origem + top genres segundo describe_community
-        desc = describe_community(df, c)
+        desc = describe_community(df, c, stats, i)
         print(f"\n[{community_names[i]}] ({desc['n_users']} usuários)")
         print(f"  > Foco Principal: Origem - {desc['source']}. Gêneros - {', '.join(desc['genres'])}")
 
     # desenha o grafo usando exatamente os mesmos nomes
     draw_graph(G, comms, df, community_names=community_names, output="graph.png")
 
+    # exportação binária para o visualizador interativo (viewer/index.html)
+    if export_dir:
+        from graph_export import export_graph
+        export_graph(G, comms, df, community_names=community_names, directory=export_dir)
+
     return G, comms
 
 if __name__ == "__main__":
     FILE = "profiles.csv"
     THRESHOLD = 0.98
-    main(FILE, THRESHOLD)
+    BINARY = False  # True: perfis lidos do artefato binário mapeado em memória (profile_matrix.py)
+    MODO_GRAFO = "threshold"  # "knn" liga cada usuário aos K_VIZINHOS mais similares (knn_graph.py)
+    K_VIZINHOS = 10
+    MOTOR_COMUNIDADES = "greedy"  # ou "louvain" / "label_propagation" (communities.py)
+    USAR_CACHE = True  # reaproveita features, grafo e comunidades de execuções anteriores (artifacts.py)
+    EXPORTAR_GRAFO = None  # ex.: "graph_export" para gerar os arquivos do viewer/index.html (graph_export.py)
+    MODO_INCREMENTAL = False  # True: atualiza o estado anterior só com os perfis novos (incremental_graph.py)
+    main(FILE, THRESHOLD, BINARY, MODO_GRAFO, K_VIZINHOS, MOTOR_COMUNIDADES, use_cache=USAR_CACHE,
+         export_dir=EXPORTAR_GRAFO, incremental=MODO_INCREMENTAL)
 
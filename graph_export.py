@@ -0,0 +1,118 @@
+import json
+import os
+import time
+
+import matplotlib.colors as mcolors
+import numpy as np
+
+from generate_graph import community_colors, generate_community_names
+from graph_render import community_layout, load_positions, save_positions
+
+###############################################################
+# GRAPH EXPORT — GRAFO EM ARRAYS BINÁRIOS PARA O VISUALIZADOR #
+###############################################################
+
+EXPORT_DIR = "graph_export"
+EXPORT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"  # gravado por último: sem ele a exportação está incompleta
+POSITIONS_FILE = "positions.pos.npz"
+
+# Arquivos binários little-endian, lidos direto como TypedArray no navegador
+NODES_XY_FILE = "nodes_xy.f32"          # n × 2 float32 (x, y)
+NODES_COMMUNITY_FILE = "nodes_comm.u32"  # n uint32 (índice da comunidade no manifest)
+EDGES_FILE = "edges.u32"                 # E × 2 uint32 (índices dos nós)
+EDGE_WEIGHTS_FILE = "edges_w.f32"        # E float32 (similaridade)
+USERNAMES_FILE = "usernames.txt"         # um username por linha, na ordem dos nós
+
+
+def _write_array(directory, name, array, dtype):
+    path = os.path.join(directory, name)
+    np.ascontiguousarray(array, dtype=dtype).tofile(path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return {"file": name, "dtype": np.dtype(dtype).name, "shape": list(np.shape(array))}
+
+
+def export_graph(G, communities, df, community_names=None, directory=EXPORT_DIR, seed=42):
+    """
+    Exporta posições, comunidades, cores e arestas do grafo em arquivos binários compactos mais um
+    manifest.json, lidos pelo viewer/index.html. As posições vêm do mesmo layout por comunidade do
+    graph_render.py e são reaproveitadas entre exportações. Retorna o caminho do manifest.
+    """
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    nodes = list(G)
+    index = {u: i for i, u in enumerate(nodes)}
+
+    positions_file = os.path.join(directory, POSITIONS_FILE)
+    pos = community_layout(G, communities, seed=seed, cached=load_positions(positions_file, communities))
+    save_positions(positions_file, pos, communities)
+    xy = np.array([pos[u] for u in nodes], dtype=np.float64).reshape(-1, 2)
+
+    # Nós fora de qualquer comunidade ficam com o índice len(communities) (cinza no visualizador)
+    comm = np.full(len(nodes), len(communities), dtype=np.uint32)
+    for i, members in enumerate(communities):
+        comm[[index[u] for u in members if u in index]] = i
+
+    # Uma única passada pelas arestas
+    m = G.number_of_edges()
+    edge_rows = np.fromiter(((index[u], index[v], w) for u, v, w in G.edges(data="weight", default=1.0)),
+                            dtype=[("u", "<u4"), ("v", "<u4"), ("w", "<f4")], count=m)
+    edges = np.column_stack([edge_rows["u"], edge_rows["v"]])
+    weights = edge_rows["w"]
+
+    if community_names is None:
+        community_names = generate_community_names(df, communities, top_k=2)
+    colors = [mcolors.to_hex(c) for c in community_colors(len(communities))]
+
+    files = {
+        "xy": _write_array(directory, NODES_XY_FILE, xy, "<f4"),
+        "community": _write_array(directory, NODES_COMMUNITY_FILE, comm, "<u4"),
+        "edges": _write_array(directory, EDGES_FILE, edges, "<u4"),
+        "weights": _write_array(directory, EDGE_WEIGHTS_FILE, weights, "<f4"),
+    }
+    with open(os.path.join(directory, USERNAMES_FILE), mode="w", encoding="utf-8") as f:
+        f.write("\n".join(map(str, nodes)))
+    files["usernames"] = {"file": USERNAMES_FILE}
+
+    manifest = {
+        "version": EXPORT_VERSION,
+        "n_nodes": len(nodes),
+        "n_edges": m,
+        "bounds": [float(xy[:, 0].min()), float(xy[:, 1].min()), float(xy[:, 0].max()), float(xy[:, 1].max())]
+        if len(nodes) else [0, 0, 1, 1],
+        "files": files,
+        "communities": [
+            {"name": community_names[i], "size": len(members), "color": colors[i]}
+            for i, members in enumerate(communities)
+        ],
+    }
+    with open(manifest_path + ".tmp", mode="w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+    print(f"\n📁 Grafo exportado em {directory}/ ({len(nodes)} nós, {m} arestas, {size / 2**20:.1f} MiB) "
+          f"em {time.perf_counter() - start:.2f}s. Visualize com viewer/index.html.")
+    return manifest_path
+
+
+if __name__ == "__main__":
+    import sys
+
+    from artifacts import load_or_build
+    from generate_graph import (load_profiles, DEFAULT_THRESHOLD, GRAPH_MODE, KNN_K, COMMUNITY_ENGINE,
+                                TFIDF_GENRES, SOURCE_WEIGHT)
+
+    # Uso: python graph_export.py [profiles.csv] [diretorio_saida]
+    FILE = sys.argv[1] if len(sys.argv) > 1 else "profiles.csv"
+    SAIDA = sys.argv[2] if len(sys.argv) > 2 else EXPORT_DIR
+
+    df = load_profiles(FILE)
+    _, G, comms = load_or_build(FILE, df, DEFAULT_THRESHOLD, False, GRAPH_MODE, KNN_K, COMMUNITY_ENGINE,
+                                TFIDF_GENRES, SOURCE_WEIGHT)
+    export_graph(G, comms, df, directory=SAIDA)
@@ -0,0 +1,263 @@
+import os
+import time
+
+import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
+from matplotlib.collections import LineCollection
+import networkx as nx
+import numpy as np
+
+from generate_graph import community_colors, community_legend, generate_community_names
+
+############################################################
+# GRAPH RENDER — DESENHO ESCALÁVEL DO GRAFO DE COMUNIDADES #
+############################################################
+
+# Arestas desenhadas no máximo (amostra uniforme acima disso)
+MAX_EDGES = 50_000
+
+# Comunidades com até este número de membros recebem um spring layout local; as maiores
+# são dispostas em espiral (girassol), com os usuários de maior grau no centro
+LOCAL_SPRING_MAX = 300
+LOCAL_ITERATIONS = 50
+
+# Acima deste número de comunidades o layout dos super-nós também vira espiral (maiores no centro)
+SUPER_SPRING_MAX = 1000
+
+# Iterações para separar os discos das comunidades que ficaram sobrepostos
+SEPARATE_ITERATIONS = 100
+
+RENDER_DPI = 150
+
+GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+
+def positions_path(output):
+    """graph_comm.png → graph_comm.pos.npz"""
+    return os.path.splitext(output)[0] + ".pos.npz"
+
+
+def load_positions(path, comms=None):
+    """
+    {usuário: (x, y)} gravado por save_positions, ou {} se o arquivo não existe.
+
+    Com `comms`, as posições só são devolvidas se a partição dos usuários já conhecidos não
+    mudou (cada comunidade gravada corresponde a exatamente uma comunidade atual; usuários novos
+    podem entrar). Caso contrário (threshold, motor ou comunidades diferentes) devolve {} e o
+    layout é recalculado, para o desenho continuar agrupado por comunidade.
+    """
+    if not os.path.exists(path):
+        return {}
+    stored = np.load(path)
+    users = stored["usernames"].tolist()
+    if comms is not None:
+        if "labels" not in stored:
+            return {}
+        label = {u: i for i, members in enumerate(comms) for u in members}
+        pairs = {(old, label.get(u, -1)) for u, old in zip(users, stored["labels"].tolist()) if u in label}
+        if len(pairs) != len({p[0] for p in pairs}) or len(pairs) != len({p[1] for p in pairs}):
+            print(f"Comunidades mudaram desde {path}; recalculando o layout.")
+            return {}
+    return dict(zip(users, map(tuple, stored["xy"].tolist())))
+
+
+def save_positions(path, pos, comms=None):
+    """Grava as posições e, com `comms`, a comunidade de cada usuário (usada por load_positions)."""
+    users = list(pos)
+    arrays = {
+        "usernames": np.asarray(users, dtype=str),
+        "xy": np.asarray([pos[u] for u in users], dtype=np.float64).reshape(-1, 2),
+    }
+    if comms is not None:
+        label = {u: i for i, members in enumerate(comms) for u in members}
+        arrays["labels"] = np.asarray([label.get(u, -1) for u in users], dtype=np.int64)
+    with open(path + ".tmp", mode="wb") as f:
+        np.savez(f, **arrays)
+    os.replace(path + ".tmp", path)
+
+
+def _spiral(m, radius):
+    """m pontos espalhados num disco de raio `radius` (espiral de girassol)."""
+    i = np.arange(m)
+    r = radius * np.sqrt((i + 0.5) / max(m, 1))
+    theta = i * GOLDEN_ANGLE
+    return np.column_stack([r * np.cos(theta), r * np.sin(theta)])
+
+
+def _super_layout(n_comms, label_u, label_v, seed):
+    """Centros das comunidades: spring layout do grafo de comunidades (peso = arestas entre elas)."""
+    if n_comms == 1:
+        return np.zeros((1, 2))
+    if n_comms > SUPER_SPRING_MAX:
+        return _spiral(n_comms, 1.0)
+
+    between = label_u != label_v
+    pairs = np.sort(np.column_stack([label_u[between], label_v[between]]), axis=1)
+    pairs, counts = np.unique(pairs, axis=0, return_counts=True)
+
+    S = nx.Graph()
+    S.add_nodes_from(range(n_comms))
+    S.add_weighted_edges_from(zip(pairs[:, 0].tolist(), pairs[:, 1].tolist(), counts.tolist()))
+    pos = nx.spring_layout(S, seed=seed, weight="weight")
+    return np.array([pos[c] for c in range(n_comms)])
+
+
+def _separate(centers, radii, iterations=SEPARATE_ITERATIONS):
+    """Empurra os centros até os discos de raio `radii` deixarem de se sobrepor (O(C²) por iteração)."""
+    if len(centers) < 2 or len(centers) > SUPER_SPRING_MAX:
+        return centers
+    centers = centers.copy()
+    for _ in range(iterations):
+        delta = centers[:, None, :] - centers[None, :, :]
+        dist = np.sqrt((delta ** 2).sum(axis=2))
+        np.fill_diagonal(dist, np.inf)
+        overlap = radii[:, None] + radii[None, :] - dist
+        if (overlap <= 0).all():
+            break
+        overlap = np.clip(overlap, 0, None)
+        # Metade da sobreposição para cada lado, ao longo da linha entre os centros
+        direction = delta / np.maximum(dist, 1e-9)[:, :, None]
+        centers += 0.5 * (overlap[:, :, None] * direction).sum(axis=1)
+    return centers
+
+
+def _local_layout(G, members, radius, seed):
+    """Posições dos membros de uma comunidade em torno da origem, dentro de um disco de raio `radius`."""
+    if len(members) == 1:
+        return np.zeros((1, 2))
+    if len(members) <= LOCAL_SPRING_MAX:
+        pos = nx.spring_layout(G.subgraph(members), seed=seed, iterations=LOCAL_ITERATIONS)
+        return np.array([pos[u] for u in members]) * radius
+    by_degree = sorted(range(len(members)), key=lambda i: -G.degree(members[i]))
+    xy = np.empty((len(members), 2))
+    xy[by_degree] = _spiral(len(members), radius)
+    return xy
+
+
+def _edge_index(G, index):
+    """Extremidades das arestas de G como arrays de posições em `index`."""
+    m = G.number_of_edges()
+    u = np.fromiter((index[e[0]] for e in G.edges()), dtype=np.int64, count=m)
+    v = np.fromiter((index[e[1]] for e in G.edges()), dtype=np.int64, count=m)
+    return u, v
+
+
+def community_layout(G, comms, seed=42, cached=None, edges=None):
+    """
+    Posições {nó: (x, y)}: cada comunidade é um super-nó posicionado pelas ligações entre
+    comunidades e seus membros são dispostos localmente num disco proporcional a √tamanho.
+
+    Com `cached` (posições de uma execução anterior) os nós já conhecidos mantêm a posição e
+    só os novos são colocados: no centro dos vizinhos conhecidos ou, sem vizinhos, do resto da
+    comunidade. Sem nenhum nó conhecido o layout é recalculado.
+    """
+    comms = [list(c) for c in comms]
+    orphans = set(G) - {u for c in comms for u in c}
+    if orphans:
+        # Nós sem comunidade viram comunidades unitárias
+        comms += [[u] for u in G if u in orphans]
+
+    if cached and any(u in cached for u in G):
+        return _warm_start(G, comms, cached, seed)
+
+    nodes = list(G)
+    index = {u: i for i, u in enumerate(nodes)}
+    label = np.empty(len(nodes), dtype=np.int64)
+    for i, members in enumerate(comms):
+        label[[index[u] for u in members]] = i
+    u, v = edges if edges is not None else _edge_index(G, index)
+
+    sizes = np.array([len(c) for c in comms], dtype=np.float64)
+    radii = np.sqrt(sizes)
+    centers = _super_layout(len(comms), label[u], label[v], seed)
+
+    # Escala compacta e depois afasta só os discos que se sobrepõem
+    centers = _separate(centers * np.sqrt(sizes.sum()), radii * 1.2)
+
+    pos = {}
+    for i, members in enumerate(comms):
+        xy = _local_layout(G, members, radii[i], seed) + centers[i]
+        pos.update(zip(members, map(tuple, xy.tolist())))
+    return pos
+
+
+def _warm_start(G, comms, cached, seed):
+    rng = np.random.default_rng(seed)
+    pos = {u: cached[u] for u in G if u in cached}
+    spread = 1.0
+
+    for members in comms:
+        missing = [u for u in members if u not in pos]
+        if not missing:
+            continue
+        placed = [pos[u] for u in members if u in pos]
+        anchor = np.mean(placed, axis=0) if placed else np.mean(list(pos.values()), axis=0)
+        for u in missing:
+            nbrs = [pos[v] for v in G.adj[u] if v in pos]
+            center = np.mean(nbrs, axis=0) if nbrs else anchor
+            pos[u] = tuple((center + rng.normal(scale=spread, size=2)).tolist())
+    return pos
+
+
+def _edge_segments(xy, u, v, max_edges, seed):
+    """Segmentos (E × 2 × 2) das arestas, amostrando no máximo max_edges."""
+    if len(u) > max_edges:
+        keep = np.sort(np.random.default_rng(seed).choice(len(u), max_edges, replace=False))
+        u, v = u[keep], v[keep]
+    return np.stack([xy[u], xy[v]], axis=1)
+
+
+def render_graph(G, communities, df, community_names=None, output="graph.png", max_edges=MAX_EDGES,
+                 dpi=RENDER_DPI, positions_file=None, relayout=False, seed=42):
+    """
+    Versão escalável de generate_graph.draw_graph: layout por comunidade, nós num único scatter,
+    arestas numa única LineCollection (amostradas acima de max_edges) e posições gravadas ao lado
+    da imagem para as próximas execuções partirem delas enquanto as comunidades dos usuários já
+    desenhados não mudarem (relayout=True recalcula tudo).
+    """
+    if len(G.nodes) == 0:
+        print("Grafo vazio — nada para desenhar.")
+        return
+
+    start = time.perf_counter()
+    nodes = list(G)
+    index = {u: i for i, u in enumerate(nodes)}
+    u, v = _edge_index(G, index)
+
+    positions_file = positions_file or positions_path(output)
+    cached = {} if relayout else load_positions(positions_file, communities)
+    warm = any(n in cached for n in nodes)
+    pos = community_layout(G, communities, seed=seed, cached=cached, edges=(u, v))
+    save_positions(positions_file, pos, communities)
+    layout_time = time.perf_counter() - start
+
+    all_colors = [mcolors.to_rgba(c) for c in community_colors(len(communities))]
+    node_color = {n: all_colors[i] for i, comm in enumerate(communities) for n in comm}
+
+    xy = np.array([pos[n] for n in nodes])
+    colors = [node_color.get(n, (0.6, 0.6, 0.6, 1.0)) for n in nodes]
+    segments = _edge_segments(xy, u, v, max_edges, seed)
+
+    plt.figure(figsize=(20, 12))
+    ax = plt.gca()
+
+    # Nós pequenos em grafos grandes para não virar uma mancha
+    node_size = float(np.clip(40 * np.sqrt(1000 / len(nodes)), 1, 40))
+    ax.add_collection(LineCollection(segments, colors="black", alpha=0.3, linewidths=0.5, zorder=1))
+    ax.scatter(xy[:, 0], xy[:, 1], c=colors, s=node_size, zorder=2, linewidths=0)
+    ax.autoscale()
+
+    plt.axis("off")
+    plt.title("Grafo de Similaridade entre Usuários (Comunidades por Cor)", fontsize=18)
+
+    if community_names is None:
+        community_names = generate_community_names(df, communities, top_k=2)
+    community_legend(communities, community_names, all_colors)
+
+    plt.tight_layout()
+    plt.savefig(output, dpi=dpi, bbox_inches="tight")
+    plt.close()
+
+    print(f"\n📁 Imagem salva como: {output} — desenhada em {time.perf_counter() - start:.2f}s "
+          f"(layout {layout_time:.2f}s{', reaproveitado' if warm else ''}; "
+          f"{len(segments)} de {G.number_of_edges()} arestas)")
@@ -0,0 +1,174 @@
+import email.utils
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+##########################################################
+# CLIENTE HTTP COMPARTILHADO — POOL, RETRY E REVALIDAÇÃO #
+##########################################################
+
+# Endereço base do MAL (pode ser trocado por um servidor local para testes/benchmarks)
+MAL_BASE_URL = "https://myanimelist.net"
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Status que valem uma nova tentativa
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Com MAL_REPLAY=1 as extrações leem apenas do armazenamento bruto, sem acessar a rede
+REPLAY_ENV = "MAL_REPLAY"
+
+
+class PageNotCached(requests.exceptions.RequestException):
+    """URL pedida em modo replay que não existe no armazenamento."""
+
+
+def parse_retry_after(value):
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class HttpClient:
+    """
+    Cliente único para todas as extrações: conexões keep-alive reaproveitadas, novas tentativas
+    com backoff exponencial + jitter (respeitando 429/Retry-After) e GET condicional.
+
+    O `store` (page_store.PageStore no cliente padrão) guarda validadores e corpos por URL:
+    get(url) -> dict ou None, put(url, response), close() e `keep_all` (guardar também respostas
+    sem ETag/Last-Modified). Com `replay=True` nenhuma requisição sai para a rede: as respostas
+    vêm do `store`.
+    """
+
+    def __init__(self, pool_size=32, max_retries=4, backoff=1.0, max_backoff=60.0,
+                 store=None, timeout=10, replay=False):
+        self.replay = replay
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.store = store
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.stats = {"requisicoes": 0, "revalidados": 0, "tentativas_extra": 0}
+
+    def _backoff_delay(self, attempt):
+        # "Full jitter": espera aleatória entre 0 e o teto exponencial
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    @staticmethod
+    def _response_from_store(url, entry):
+        """Reconstrói uma resposta 200 a partir do corpo guardado (após um 304)."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = entry["body"]
+        response.encoding = entry.get("encoding")
+        response.headers = CaseInsensitiveDict()
+        if entry.get("content_type"):
+            response.headers["Content-Type"] = entry["content_type"]
+        if entry.get("etag"):
+            response.headers["ETag"] = entry["etag"]
+        if entry.get("last_modified"):
+            response.headers["Last-Modified"] = entry["last_modified"]
+        response.from_cache = True
+        return response
+
+    def get(self, url, headers=None, timeout=None, conditional=True):
+        """
+        GET com retry. Levanta requests.exceptions.RequestException quando todas as tentativas falham,
+        mantendo o mesmo contrato de requests.get(...).raise_for_status() nas funções de extração.
+        """
+        if self.replay:
+            entry = self.store.get(url) if self.store is not None else None
+            if entry is None:
+                raise PageNotCached(f"Página não armazenada (modo replay): {url}")
+            return self._response_from_store(url, entry)
+
+        request_headers = dict(headers or {})
+        entry = self.store.get(url) if (conditional and self.store is not None) else None
+        if entry:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            self.stats["requisicoes"] += 1
+            try:
+                response = self.session.get(url, headers=request_headers, timeout=timeout or self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt:
+                    raise
+                self.stats["tentativas_extra"] += 1
+                time.sleep(self._backoff_delay(attempt))
+                continue
+
+            if response.status_code == 304 and entry:
+                self.stats["revalidados"] += 1
+                return self._response_from_store(url, entry)
+
+            if response.status_code in RETRY_STATUS and not last_attempt:
+                self.stats["tentativas_extra"] += 1
+                wait = parse_retry_after(response.headers.get("Retry-After"))
+                delay = self._backoff_delay(attempt)
+                time.sleep(min(self.max_backoff, max(wait, delay)) if wait is not None else delay)
+                continue
+
+            response.raise_for_status()
+
+            if self.store is not None and conditional and (
+                self.store.keep_all
+                or response.headers.get("ETag")
+                or response.headers.get("Last-Modified")
+            ):
+                self.store.put(url, response)
+            return response
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Devolve o cliente compartilhado do processo, criando-o na primeira chamada."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from page_store import PageStore
+            _client = HttpClient(store=PageStore(), replay=os.environ.get(REPLAY_ENV) == "1")
+        return _client
+
+
+def configure(**kwargs):
+    """Substitui o cliente compartilhado (ex.: outro armazenamento, mais retries)."""
+    global _client
+    with _client_lock:
+        _client = HttpClient(**kwargs)
+        return _client
+
+
+def get(url, **kwargs):
+    """Atalho para get_client().get(url, ...)."""
+    return get_client().get(url, **kwargs)
@@ -0,0 +1,258 @@
+import os
+import time
+from collections import defaultdict
+
+import networkx as nx
+import numpy as np
+from sklearn.preprocessing import normalize
+
+import communities
+from artifacts import (artifact_params, artifact_key, save_artifact, read_arrays, write_arrays,
+                       graph_from_arrays, communities_from_arrays)
+from generate_graph import (SIMILARITY_BLOCK_SIZE, DEFAULT_THRESHOLD, COMMUNITY_ENGINE, TFIDF_GENRES, SOURCE_WEIGHT,
+                            prepare_features, genre_idf, build_graph_blockwise, detect_communities)
+
+##################################################################
+# INCREMENTAL GRAPH — GRAFO E COMUNIDADES ATUALIZADOS AOS POUCOS #
+##################################################################
+
+STATE_DIR = "graph_state"
+
+# Re-clusterização completa quando a modularidade cai mais que isso desde a última detecção
+MAX_MODULARITY_LOSS = 0.02
+
+# Fração de usuários novos desde o ajuste do idf acima da qual tudo é recalculado
+# (o TF-IDF fica congelado entre reconstruções para as features antigas não mudarem)
+MAX_NEW_FRACTION = 0.25
+
+# Diferença máxima entre as features guardadas e as recalculadas de um usuário antigo
+FEATURE_TOLERANCE = 1e-9
+
+
+def iter_new_pairs(X, n_old, threshold: float, block_size: int = SIMILARITY_BLOCK_SIZE):
+    """
+    Pares (j, i, similaridade) com j < i, i >= n_old (linha nova) e similaridade >= threshold, em
+    blocos: só as linhas novas são comparadas com as demais, custo O(novos × n).
+    """
+    Xn = normalize(np.asarray(X, dtype=np.float64))
+    n = len(Xn)
+
+    for r0 in range(n_old, n, block_size):
+        r1 = min(r0 + block_size, n)
+        found = []
+        for c0 in range(0, r1, block_size):
+            c1 = min(c0 + block_size, r1)
+            block = Xn[r0:r1] @ Xn[c0:c1].T
+            bi, bj = np.nonzero(block >= threshold)
+            found.append((bi + r0, bj + c0, block[bi, bj]))
+
+        rows = np.concatenate([f[0] for f in found])
+        cols = np.concatenate([f[1] for f in found])
+        weights = np.concatenate([f[2] for f in found])
+        lower = cols < rows
+        rows, cols, weights = rows[lower], cols[lower], weights[lower]
+
+        order = np.lexsort((cols, rows))
+        yield cols[order], rows[order], weights[order]
+
+
+def modularity_from_arrays(u, v, labels):
+    """Modularidade (sem pesos, como communities.score) a partir das arestas e do rótulo de cada posição."""
+    m = len(u)
+    if m == 0:
+        return 0.0
+    n_comms = int(labels.max()) + 1
+    degree = np.bincount(u, minlength=len(labels)) + np.bincount(v, minlength=len(labels))
+    lu, lv = labels[u], labels[v]
+    inner = np.bincount(lu[lu == lv], minlength=n_comms)
+    labeled = labels >= 0
+    total_degree = np.bincount(labels[labeled], weights=degree[labeled], minlength=n_comms)
+    return float(inner.sum() / m - ((total_degree / (2 * m)) ** 2).sum())
+
+
+def assign_new_nodes(features, comms, labels, new_nodes, new_u, new_v, new_w, m, engine=COMMUNITY_ENGINE):
+    """
+    Coloca nas comunidades os nós novos do grafo (posições em `new_nodes`, na ordem do grafo):
+    voto dos vizinhos ponderado pela similaridade (empates decididos pelo centroide mais próximo),
+    repetido até estabilizar, já que um usuário novo pode depender de outro. Componentes formados
+    só por nós novos não têm vizinho para votar e são clusterizados à parte, com a resolução que
+    teriam numa detecção completa do grafo de m arestas.
+
+    `comms` (listas de posições) e `labels` são atualizados no lugar. Todas as arestas de um nó
+    novo estão entre as arestas novas (new_u, new_v, new_w).
+    Retorna (número de nós atribuídos por voto, comunidades novas).
+    """
+    adj = defaultdict(list)
+    for a, b, w in zip(new_u.tolist(), new_v.tolist(), new_w.tolist()):
+        adj[a].append((b, w))
+        adj[b].append((a, w))
+
+    centroids = None
+    X = features.to_numpy()
+    pending = list(new_nodes)
+    voted = 0
+    progress = True
+    while pending and progress:
+        progress = False
+        remaining = []
+        for a in pending:
+            votes = defaultdict(float)
+            for b, w in adj[a]:
+                if labels[b] >= 0:
+                    votes[int(labels[b])] += w
+            if not votes:
+                remaining.append(a)
+                continue
+            best = max(votes.values())
+            tied = [c for c, w in votes.items() if w == best]
+            if len(tied) > 1:
+                if centroids is None:
+                    # Centroides (cosseno) das comunidades, só usados para desempate
+                    inside = labels >= 0
+                    sums = np.zeros((len(comms), X.shape[1]))
+                    np.add.at(sums, labels[inside], X[inside])
+                    centroids = normalize(sums)
+                x = normalize(X[a][None, :])[0]
+                tied.sort(key=lambda c: -float(centroids[c] @ x))
+            labels[a] = tied[0]
+            comms[tied[0]].append(a)
+            voted += 1
+            progress = True
+        pending = remaining
+
+    # O que sobrou são componentes inteiros sem nenhum nó antigo
+    H = nx.Graph()
+    H.add_nodes_from(pending)
+    H.add_weighted_edges_from((a, b, w) for a in pending for b, w in adj[a] if a < b)
+    created = 0
+    for component in nx.connected_components(H):
+        sub = H.subgraph(component)
+        for members in communities.detect(sub, engine=engine, resolution=sub.number_of_edges() / m):
+            labels[members] = len(comms)
+            comms.append(list(members))
+            created += 1
+    return voted, created
+
+
+def _full_build(df, threshold, community_engine, tfidf, source_weight):
+    idf = genre_idf(df) if tfidf else None
+    df_norm = prepare_features(df, tfidf, source_weight, idf=idf)
+    print(f"Construindo grafo com threshold = {threshold}...")
+    G = build_graph_blockwise(df_norm, threshold)
+    print("Detectando comunidades...")
+    comms = detect_communities(G, community_engine)
+    return df_norm, G, comms, idf
+
+
+def update_graph(df, threshold=DEFAULT_THRESHOLD, community_engine=COMMUNITY_ENGINE,
+                 tfidf=TFIDF_GENRES, source_weight=SOURCE_WEIGHT, binary=False, graph_mode="threshold",
+                 cache_dir=STATE_DIR, max_modularity_loss=MAX_MODULARITY_LOSS, max_new_fraction=MAX_NEW_FRACTION):
+    """
+    Features, grafo e comunidades dos perfis `df`, partindo do estado gravado na execução anterior:
+    só os usuários novos têm a similaridade calculada (contra todos), suas arestas são somadas às
+    do estado e eles entram nas comunidades por voto dos vizinhos. A detecção completa só roda
+    quando a modularidade cai mais que max_modularity_loss. Usuários removidos ou alterados, muitos
+    usuários novos desde o ajuste do TF-IDF ou a falta de estado levam a uma reconstrução completa.
+    """
+    if graph_mode != "threshold":
+        raise ValueError("O modo incremental só suporta o grafo por threshold.")
+
+    start = time.perf_counter()
+    params = artifact_params(threshold, binary, graph_mode, None, community_engine, tfidf, source_weight)
+    key = artifact_key("incremental", params)
+    directory = os.path.join(cache_dir, key[:16])
+
+    state = read_arrays(directory, key)
+    reason = None
+    if state is None:
+        reason = "sem estado anterior"
+    else:
+        extra = state["meta"]["extra"]
+        old_norm = state["df_norm"]
+        old_users = old_norm.index
+        new_users = df.index[~df.index.isin(old_users)]
+
+        if not old_users.isin(df.index).all():
+            reason = "usuários removidos"
+        elif (len(old_users) + len(new_users) - extra["n_fit"]) > max_new_fraction * extra["n_fit"]:
+            reason = "muitos usuários novos desde o ajuste do TF-IDF"
+        else:
+            df_all = df.loc[old_users.append(new_users)]
+            features = prepare_features(df_all, tfidf, source_weight, idf=extra["idf"])
+            drift = np.abs(features.to_numpy()[:len(old_users)] - old_norm.to_numpy())
+            if len(drift) and np.nanmax(drift) > FEATURE_TOLERANCE:
+                reason = "perfis existentes alterados"
+
+    if reason is not None:
+        print(f"Reconstrução completa ({reason})...")
+        features, G, comms, idf = _full_build(df, threshold, community_engine, tfidf, source_weight)
+        base_q = communities.score(G, comms)
+        extra = {"idf": None if idf is None else idf.tolist(), "n_fit": len(features), "base_modularity": base_q}
+        save_artifact(directory, key, params, features, G, comms, extra)
+        print(f"Estado gravado em {directory} ({len(G.nodes)} nós, {len(G.edges)} arestas, "
+              f"{len(comms)} comunidades, Q = {base_q:.4f}) em {time.perf_counter() - start:.2f}s.")
+        return features, G, comms
+
+    users = features.index.tolist()
+    if len(new_users) == 0:
+        print(f"Nenhum usuário novo; estado de {directory} reaproveitado.")
+    else:
+        # Similaridade só das linhas novas contra todas
+        found = list(iter_new_pairs(features.to_numpy(), len(old_users), threshold))
+        new_u = np.concatenate([f[0] for f in found])
+        new_v = np.concatenate([f[1] for f in found])
+        new_w = np.concatenate([f[2] for f in found])
+        similarity_time = time.perf_counter() - start
+
+        u = np.concatenate([state["u"], new_u])
+        v = np.concatenate([state["v"], new_v])
+        weight = np.concatenate([state["weight"], new_w])
+
+        # Nós que entram no grafo, na ordem em que o networkx os criaria
+        in_graph = np.zeros(len(users), dtype=bool)
+        in_graph[state["nodes"]] = True
+        new_nodes = []
+        for a in np.column_stack([new_u, new_v]).ravel().tolist():
+            if not in_graph[a]:
+                in_graph[a] = True
+                new_nodes.append(a)
+        nodes = np.concatenate([state["nodes"], np.asarray(new_nodes, dtype=np.int64)])
+
+        offsets, members = state["offsets"].tolist(), state["members"].tolist()
+        comms = [members[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+        labels = np.full(len(users), -1, dtype=np.int64)
+        for i, c in enumerate(comms):
+            labels[c] = i
+
+        voted, created = assign_new_nodes(features, comms, labels, new_nodes, new_u, new_v, new_w,
+                                          len(u), community_engine)
+        q = modularity_from_arrays(u, v, labels)
+        print(f"{len(new_users)} usuários novos: {len(new_u)} arestas novas (similaridade em "
+              f"{similarity_time:.2f}s), {voted} nós por voto, {created} comunidades novas. "
+              f"Modularidade {extra['base_modularity']:.4f} → {q:.4f}")
+
+        G = None
+        if extra["base_modularity"] - q > max_modularity_loss:
+            print("Perda de modularidade acima do limite: re-clusterizando o grafo inteiro...")
+            G = graph_from_arrays(users, nodes, u, v, weight)
+            position = {user: i for i, user in enumerate(users)}
+            comms = [[position[x] for x in c] for c in detect_communities(G, community_engine)]
+            labels = np.full(len(users), -1, dtype=np.int64)
+            for i, c in enumerate(comms):
+                labels[c] = i
+            q = modularity_from_arrays(u, v, labels)
+            extra["base_modularity"] = q
+            print(f"Nova modularidade: {q:.4f} ({len(comms)} comunidades)")
+
+        # Mantém a convenção de maiores comunidades primeiro
+        comms.sort(key=len, reverse=True)
+        offsets = np.concatenate([[0], np.cumsum([len(c) for c in comms])]).astype(np.int64)
+        members = np.asarray([x for c in comms for x in c], dtype=np.int64)
+        write_arrays(directory, key, params, features, nodes, u, v, weight, offsets, members, extra)
+        print(f"Estado atualizado em {directory} em {time.perf_counter() - start:.2f}s.")
+        if G is not None:
+            return features, G, communities_from_arrays(users, offsets, members)
+        state = {"nodes": nodes, "u": u, "v": v, "weight": weight, "offsets": offsets, "members": members}
+
+    G = graph_from_arrays(users, state["nodes"], state["u"], state["v"], state["weight"])
+    return features, G, communities_from_arrays(users, state["offsets"], state["members"])
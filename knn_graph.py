@@ -0,0 +1,200 @@
+import time
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import normalize
+
+##############################################################
+# KNN GRAPH — GRAFO DOS K VIZINHOS MAIS PRÓXIMOS (APROXIMADO) #
+##############################################################
+
+# Cada usuário é ligado aos seus K vizinhos mais similares (cosseno)
+DEFAULT_K = 10
+
+# Índice aproximado: floresta de árvores de projeção aleatória + refinamento NN-descent.
+# Mais árvores / folhas maiores / mais iterações → recall maior e construção mais lenta.
+DEFAULT_TREES = 8
+DEFAULT_LEAF_SIZE = 48
+DEFAULT_ITERATIONS = 2
+
+# Usuários usados para medir o recall contra a busca exata (0 desliga)
+DEFAULT_RECALL_SAMPLE = 500
+
+# Linhas processadas por vez nas etapas vetorizadas (limita a memória de pico)
+CHUNK_ROWS = 32768
+
+
+def _merge_topk(rows, cur_idx, cur_sim, cand_idx, cand_sim, k):
+    """Junta os vizinhos atuais com candidatos novos e mantém os k melhores (sem repetidos nem o próprio)."""
+    idx = np.concatenate([cur_idx, cand_idx], axis=1)
+    sim = np.concatenate([cur_sim, cand_sim], axis=1)
+
+    # Repetidos ficam adjacentes depois de ordenar por índice; só a primeira cópia vale
+    order = np.argsort(idx, axis=1, kind="stable")
+    idx = np.take_along_axis(idx, order, axis=1)
+    sim = np.take_along_axis(sim, order, axis=1)
+    invalid = (idx < 0) | (idx == rows[:, None])
+    invalid[:, 1:] |= idx[:, 1:] == idx[:, :-1]
+    sim = np.where(invalid, -np.inf, sim)
+
+    top = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+    idx = np.take_along_axis(idx, top, axis=1)
+    sim = np.take_along_axis(sim, top, axis=1)
+
+    order = np.argsort(-sim, axis=1, kind="stable")
+    idx = np.take_along_axis(idx, order, axis=1)
+    sim = np.take_along_axis(sim, order, axis=1)
+    idx[np.isneginf(sim)] = -1
+    return idx, sim
+
+
+def _merge_chunked(nbr_idx, nbr_sim, cand_idx, cand_sim, k):
+    for c0 in range(0, len(nbr_idx), CHUNK_ROWS):
+        c1 = min(c0 + CHUNK_ROWS, len(nbr_idx))
+        nbr_idx[c0:c1], nbr_sim[c0:c1] = _merge_topk(
+            np.arange(c0, c1), nbr_idx[c0:c1], nbr_sim[c0:c1], cand_idx[c0:c1], cand_sim[c0:c1], k
+        )
+
+
+def _rp_tree_leaves(Xn, leaf_size, rng):
+    """Folhas de uma árvore de projeção aleatória (hiperplano entre dois pontos, corte na mediana)."""
+    leaves = []
+    stack = [np.arange(len(Xn))]
+    while stack:
+        idx = stack.pop()
+        if len(idx) <= leaf_size:
+            leaves.append(idx)
+            continue
+        a, b = rng.choice(idx, 2, replace=False)
+        proj = Xn[idx] @ (Xn[a] - Xn[b])
+        side = proj > np.median(proj)
+        if side.all() or not side.any():
+            # Pontos repetidos: divide ao acaso para garantir o término
+            side = rng.permutation(len(idx)) < len(idx) // 2
+        stack.append(idx[side])
+        stack.append(idx[~side])
+    return leaves
+
+
+def _leaf_candidates(Xn, leaves, leaf_size):
+    """Para cada ponto, os demais pontos da sua folha e as similaridades, em matrizes n × leaf_size."""
+    n = len(Xn)
+    padded = np.full((len(leaves), leaf_size), -1, dtype=np.int64)
+    for i, leaf in enumerate(leaves):
+        padded[i, :len(leaf)] = leaf
+
+    cand_idx = np.full((n, leaf_size), -1, dtype=np.int64)
+    cand_sim = np.full((n, leaf_size), -np.inf)
+
+    for l0 in range(0, len(leaves), max(1, CHUNK_ROWS // leaf_size)):
+        block = padded[l0:l0 + max(1, CHUNK_ROWS // leaf_size)]
+        vecs = Xn[np.maximum(block, 0)]
+        sims = vecs @ vecs.transpose(0, 2, 1)
+        valid = block >= 0
+        sims = np.where(valid[:, None, :], sims, -np.inf)
+
+        owners = block[valid]
+        cand_idx[owners] = np.broadcast_to(block[:, None, :], sims.shape)[valid]
+        cand_sim[owners] = sims[valid]
+    return cand_idx, cand_sim
+
+
+def _neighbor_candidates(Xn, nbr_idx, rows):
+    """Vizinhos dos vizinhos (NN-descent) das linhas pedidas, com as similaridades."""
+    second = nbr_idx[np.maximum(nbr_idx[rows], 0)].reshape(len(rows), -1)
+    second[np.repeat(nbr_idx[rows] < 0, nbr_idx.shape[1], axis=1)] = -1
+    sims = np.einsum("rd,rcd->rc", Xn[rows], Xn[np.maximum(second, 0)])
+    return second, np.where(second >= 0, sims, -np.inf)
+
+
+def approximate_knn(X, k=DEFAULT_K, n_trees=DEFAULT_TREES, leaf_size=DEFAULT_LEAF_SIZE,
+                    iterations=DEFAULT_ITERATIONS, seed=42):
+    """
+    Índices e similaridades (n × k, em ordem decrescente) dos k vizinhos aproximados de cada linha.
+    Posições sem vizinho (menos de k+1 usuários) ficam com índice -1.
+    """
+    n = len(X)
+    if n == 0:
+        return np.zeros((0, k), dtype=np.int64), np.zeros((0, k))
+    Xn = normalize(np.asarray(X, dtype=np.float64))
+    k = max(1, min(k, n - 1))
+    leaf_size = max(leaf_size, k + 1)
+    rng = np.random.default_rng(seed)
+
+    nbr_idx = np.full((n, k), -1, dtype=np.int64)
+    nbr_sim = np.full((n, k), -np.inf)
+
+    for _ in range(n_trees):
+        leaves = _rp_tree_leaves(Xn, leaf_size, rng)
+        cand_idx, cand_sim = _leaf_candidates(Xn, leaves, leaf_size)
+        _merge_chunked(nbr_idx, nbr_sim, cand_idx, cand_sim, k)
+
+    for _ in range(iterations):
+        new_idx, new_sim = nbr_idx.copy(), nbr_sim.copy()
+        step = max(1, CHUNK_ROWS // k)
+        for c0 in range(0, n, step):
+            rows = np.arange(c0, min(c0 + step, n))
+            cand_idx, cand_sim = _neighbor_candidates(Xn, nbr_idx, rows)
+            new_idx[rows], new_sim[rows] = _merge_topk(rows, nbr_idx[rows], nbr_sim[rows], cand_idx, cand_sim, k)
+        nbr_idx, nbr_sim = new_idx, new_sim
+
+    return nbr_idx, nbr_sim
+
+
+def exact_knn(X, rows, k=DEFAULT_K, block_size=256):
+    """Vizinhos exatos (força bruta, em blocos) das linhas pedidas, para medir o recall."""
+    Xn = normalize(np.asarray(X, dtype=np.float64))
+    k = min(k, len(Xn) - 1)
+    result = np.empty((len(rows), k), dtype=np.int64)
+    for b0 in range(0, len(rows), block_size):
+        part = rows[b0:b0 + block_size]
+        sims = Xn[part] @ Xn.T
+        sims[np.arange(len(part)), part] = -np.inf
+        result[b0:b0 + len(part)] = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    return result
+
+
+def knn_recall(X, nbr_idx, sample=DEFAULT_RECALL_SAMPLE, seed=0):
+    """Fração média dos k vizinhos exatos encontrados pelo índice aproximado, numa amostra de usuários."""
+    n, k = nbr_idx.shape
+    if n < 2 or sample <= 0:
+        return 1.0
+    rows = np.random.default_rng(seed).choice(n, min(sample, n), replace=False)
+    exact = exact_knn(X, rows, k)
+    hits = [len(np.intersect1d(exact[i], nbr_idx[r])) for i, r in enumerate(rows)]
+    return float(np.mean(hits)) / exact.shape[1]
+
+
+def build_knn_graph(df_norm: pd.DataFrame, k=DEFAULT_K, n_trees=DEFAULT_TREES, leaf_size=DEFAULT_LEAF_SIZE,
+                    iterations=DEFAULT_ITERATIONS, min_similarity=None, recall_sample=DEFAULT_RECALL_SAMPLE,
+                    seed=42) -> nx.Graph:
+    """
+    Grafo não direcionado ligando cada usuário aos seus k vizinhos aproximados (peso = cosseno),
+    substituto do grafo por threshold em generate_graph.build_graph. Com `min_similarity` as
+    ligações mais fracas que o limite são descartadas.
+    """
+    X = df_norm.to_numpy()
+    users = df_norm.index.tolist()
+
+    start = time.perf_counter()
+    nbr_idx, nbr_sim = approximate_knn(X, k, n_trees, leaf_size, iterations, seed)
+    elapsed = time.perf_counter() - start
+
+    keep = nbr_idx >= 0
+    if min_similarity is not None:
+        keep &= nbr_sim >= min_similarity
+    rows, cols = np.nonzero(keep)
+
+    G = nx.Graph()
+    G.add_nodes_from(users)
+    G.add_weighted_edges_from(
+        (users[i], users[nbr_idx[i, c]], nbr_sim[i, c]) for i, c in zip(rows.tolist(), cols.tolist())
+    )
+
+    msg = f"Grafo kNN (k={k}) construído em {elapsed:.2f}s"
+    if recall_sample:
+        msg += f" — recall@{nbr_idx.shape[1]} em {min(recall_sample, len(users))} usuários: " \
+               f"{knn_recall(X, nbr_idx, recall_sample):.3f}"
+    print(msg)
+    return G
@@ -1,6 +1,9 @@
-import requests
 import time
 
+import http_client
+from http_client import MAL_BASE_URL
+from crawl_journal import STATUS_DONE, STATUS_EMPTY, STATUS_FAILED
+
 def normalize_source(raw_source: str) -> str:
     if not raw_source:
         return "Other"
@@ -32,29 +35,14 @@ SOURCE_WEIGHTS = {
     "Other": 0.8,
 }
 
-def create_user_profile(username, anime_cache, sources_alvo, generos_alvo, writer_cache):
-    url = f"https://myanimelist.net/animelist/{username}/load.json?status=2"
-
-    print(f"\n[USER: {username}] Coletando lista...")
-
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        anime_list = response.json()
-    except Exception as e:
-        print(f"[ERRO] Falhou para {username}: {e}")
-        return None
-
-    if not isinstance(anime_list, list) or len(anime_list) == 0:
-        print(f"[DEBUG] Lista vazia ou privada para {username}.")
-        return None
-
-    # acumuladores brutos
-    source_scores = {s: 0 for s in sources_alvo}
-    genre_scores = {g: 0 for g in generos_alvo}
-
-    soma_total_scores = 0
+def fetch_user_list(username, base_url=MAL_BASE_URL):
+    """Baixa a lista de animes completos (status=2) de um usuário. Levanta exceção em falha de rede."""
+    url = f"{base_url}/animelist/{username}/load.json?status=2"
+    response = http_client.get(url, timeout=15)
+    return response.json()
 
+def iter_scored_items(anime_list):
+    """Percorre a lista do usuário devolvendo (anime_id, score) apenas dos itens com nota >= 7."""
     for item in anime_list:
         score = item.get("score")
         anime_id = item.get("anime_id")
@@ -66,32 +54,30 @@ def create_user_profile(username, anime_cache, sources_alvo, generos_alvo, write
         if not anime_id:
             continue
 
-        anime_id = str(anime_id)
+        yield str(anime_id), score
 
-        # verificação do cache.
-        if anime_id not in anime_cache:
-            print(f"[CACHE MISS] ID {anime_id}")
-            from extract_anime import extract_anime_data
-            data = extract_anime_data(anime_id)
-            time.sleep(2)
-
-            if not data or not data.get("source"):
-                continue
-
-            anime_cache[anime_id] = {
-                "generos": data["generos"].split(", "),
-                "source": data["source"]
-            }
-
-            writer_cache.writerow([
-                data["id"],
-                data["nome"],
-                data["generos"],
-                data["source"]
-            ])
-        else:
-            data = anime_cache[anime_id]
-            # print(f"[CACHE HIT] ID {anime_id}")
+def cache_entry_from_data(data):
+    """Converte o retorno de extract_anime_data para o formato guardado no cache em memória."""
+    return {
+        "generos": data["generos"].split(", "),
+        "source": data["source"]
+    }
+
+def compute_profile(username, anime_list, anime_cache, sources_alvo, generos_alvo):
+    """
+    Calcula o vetor de perfil a partir da lista já baixada, usando apenas o cache em memória.
+    Animes ausentes do cache são ignorados.
+    """
+    # acumuladores brutos
+    source_scores = {s: 0 for s in sources_alvo}
+    genre_scores = {g: 0 for g in generos_alvo}
+
+    soma_total_scores = 0
+
+    for anime_id, score in iter_scored_items(anime_list):
+        data = anime_cache.get(anime_id)
+        if not data:
+            continue
 
         # normalização de fonte
         source_final = normalize_source(data.get("source"))
@@ -108,6 +94,11 @@ def create_user_profile(username, anime_cache, sources_alvo, generos_alvo, write
             if g in genre_scores:
                 genre_scores[g] += score
 
+    return profile_from_scores(username, genre_scores, source_scores, soma_total_scores,
+                               sources_alvo, generos_alvo)
+
+def profile_from_scores(username, genre_scores, source_scores, soma_total_scores, sources_alvo, generos_alvo):
+    """Normalização final a partir dos acumuladores brutos ({gênero: soma}, {fonte: soma}, soma total)."""
     if soma_total_scores == 0:
         print(f"[DEBUG] Nenhum anime válido para {username}.")
         return None
@@ -128,3 +119,57 @@ def create_user_profile(username, anime_cache, sources_alvo, generos_alvo, write
 
     print(f"Perfil final criado para {username}.")
     return profile
+
+def fill_cache_misses(anime_list, anime_cache, writer_cache, base_url=MAL_BASE_URL, delay=2):
+    """Baixa e grava no cache os animes com nota >= 7 da lista que ainda não estão nele."""
+    for anime_id, _ in iter_scored_items(anime_list):
+        # verificação do cache.
+        if anime_id in anime_cache:
+            continue
+
+        print(f"[CACHE MISS] ID {anime_id}")
+        from extract_anime import extract_anime_data
+        data = extract_anime_data(anime_id, base_url)
+        time.sleep(delay)
+
+        if not data or not data.get("source"):
+            continue
+
+        anime_cache[anime_id] = cache_entry_from_data(data)
+
+        writer_cache.writerow([
+            data["id"],
+            data["nome"],
+            data["generos"],
+            data["source"]
+        ])
+
+def profile_user(username, anime_cache, sources_alvo, generos_alvo, writer_cache,
+                 base_url=MAL_BASE_URL, delay=2, list_store=None):
+    """
+    Como create_user_profile, mas devolve (situação, perfil) com a situação do crawl_journal.
+    Se `list_store` (user_lists.UserListStore) for passado, a lista baixada também é guardada.
+    """
+    print(f"\n[USER: {username}] Coletando lista...")
+
+    try:
+        anime_list = fetch_user_list(username, base_url)
+    except Exception as e:
+        print(f"[ERRO] Falhou para {username}: {e}")
+        return STATUS_FAILED, None
+
+    if list_store is not None:
+        list_store.add(username, anime_list)
+
+    if not isinstance(anime_list, list) or len(anime_list) == 0:
+        print(f"[DEBUG] Lista vazia ou privada para {username}.")
+        return STATUS_EMPTY, None
+
+    fill_cache_misses(anime_list, anime_cache, writer_cache, base_url, delay)
+
+    profile = compute_profile(username, anime_list, anime_cache, sources_alvo, generos_alvo)
+    return (STATUS_DONE if profile else STATUS_EMPTY), profile
+
+def create_user_profile(username, anime_cache, sources_alvo, generos_alvo, writer_cache,
+                        base_url=MAL_BASE_URL, delay=2):
+    return profile_user(username, anime_cache, sources_alvo, generos_alvo, writer_cache, base_url, delay)[1]
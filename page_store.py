@@ -0,0 +1,116 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+###################################################
+# PAGE STORE — CACHE BRUTO DE PÁGINAS DO MAL      #
+###################################################
+
+# Diretório padrão do armazenamento bruto
+PAGE_STORE_DIR = "raw_pages"
+
+
+class PageStore:
+    """
+    Armazena o corpo bruto (HTML/JSON) de cada resposta, comprimido com gzip e endereçado pelo
+    SHA-256 do conteúdo; um índice SQLite liga cada URL ao seu hash e aos validadores HTTP.
+
+    Páginas idênticas ocupam um único objeto em disco. É o `store` do cliente HTTP padrão
+    (http_client.get_client): get/put/close, usados na revalidação e no modo replay.
+    """
+
+    # O cliente HTTP guarda toda resposta bem-sucedida, e não só as que trazem ETag/Last-Modified
+    keep_all = True
+
+    def __init__(self, root=PAGE_STORE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " content_type TEXT, encoding TEXT, fetched_at REAL)"
+        )
+        self._db.commit()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.gz")
+
+    def _write_object(self, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escrita atômica: outro processo nunca enxerga um objeto pela metade
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp, path)
+        return digest
+
+    def read_object(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def get(self, url):
+        """Devolve {etag, last_modified, content_type, encoding, body} da URL, ou None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha256, etag, last_modified, content_type, encoding FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            body = self.read_object(row[0])
+        except FileNotFoundError:
+            return None
+        return {
+            "etag": row[1],
+            "last_modified": row[2],
+            "content_type": row[3],
+            "encoding": row[4],
+            "body": body,
+        }
+
+    def put(self, url, response):
+        digest = self._write_object(response.content)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    digest,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    response.headers.get("Content-Type"),
+                    response.encoding,
+                    time.time(),
+                )
+            )
+            self._db.commit()
+
+    def urls(self, like=None):
+        """Lista as URLs guardadas (opcionalmente filtradas por um padrão SQL LIKE)."""
+        with self._lock:
+            if like:
+                rows = self._db.execute("SELECT url FROM pages WHERE url LIKE ? ORDER BY url", (like,))
+            else:
+                rows = self._db.execute("SELECT url FROM pages ORDER BY url")
+            return [r[0] for r in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from extract_anime import extract_anime_data
+from normalizer import MAL_BASE_URL, fetch_user_list, iter_scored_items, cache_entry_from_data
+from rate_limit import RateLimiter
+
+###########################################################
+# PREFETCH — COLETA EM DUAS FASES (LISTAS → ANIMES ÚNICOS) #
+###########################################################
+
+DEFAULT_WORKERS = 8
+DEFAULT_RPS = 2.0
+
+
+def _limited(limiter, func):
+    def call(*args):
+        limiter.acquire()
+        return func(*args)
+    return call
+
+
+def fetch_user_lists(usernames, limiter, workers=DEFAULT_WORKERS, base_url=MAL_BASE_URL):
+    """
+    Fase 1: baixa o load.json de todos os usuários. Retorna {username: lista}, onde a lista
+    é None quando a requisição falhou.
+    """
+    def fetch(username):
+        try:
+            return fetch_user_list(username, base_url)
+        except Exception as e:
+            print(f"[ERRO] Falhou para {username}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        lists = pool.map(_limited(limiter, fetch), usernames)
+        return dict(zip(usernames, lists))
+
+
+def scored_ids(user_lists):
+    """União dos animes com nota >= 7 de todos os usuários."""
+    ids = set()
+    for anime_list in user_lists.values():
+        if isinstance(anime_list, list):
+            ids.update(anime_id for anime_id, _ in iter_scored_items(anime_list))
+    return ids
+
+
+def collect_missing_ids(user_lists, anime_cache):
+    """
+    Animes com nota >= 7 de todos os usuários que ainda não estão no cache. Consulta só esses
+    ids (em lote, no AnimeCache do SQLite), nunca o cache inteiro.
+    """
+    ids = scored_ids(user_lists)
+    if hasattr(anime_cache, "get_many"):
+        anime_cache.get_many(ids)
+    return sorted((a for a in ids if a not in anime_cache), key=int)
+
+
+def prefetch_animes(anime_ids, anime_cache, writer_cache, limiter, workers=DEFAULT_WORKERS,
+                    base_url=MAL_BASE_URL):
+    """
+    Fase 2: baixa cada anime ausente uma única vez, com um pool limitado de workers.
+    Cache e arquivo são atualizados apenas pela thread principal.
+    """
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        fetch = _limited(limiter, lambda anime_id: extract_anime_data(anime_id, base_url))
+        for anime_id, data in zip(anime_ids, pool.map(fetch, anime_ids)):
+            if not data or not data.get("source"):
+                continue
+            anime_cache[anime_id] = cache_entry_from_data(data)
+            writer_cache.writerow([
+                data["id"],
+                data["nome"],
+                data["generos"],
+                data["source"]
+            ])
+            fetched += 1
+    return fetched
+
+
+def run_two_phase(usernames, anime_cache, writer_cache, rps=DEFAULT_RPS, workers=DEFAULT_WORKERS,
+                  base_url=MAL_BASE_URL):
+    """
+    Executa as duas fases de rede e devolve as listas baixadas; os perfis são calculados
+    depois, offline, com normalizer.compute_profile.
+    """
+    limiter = RateLimiter(rps)
+
+    start = time.perf_counter()
+    print(f"[FASE 1] Baixando listas de {len(usernames)} usuários...")
+    user_lists = fetch_user_lists(usernames, limiter, workers, base_url)
+
+    missing = collect_missing_ids(user_lists, anime_cache)
+    print(f"[FASE 2] {len(missing)} animes únicos fora do cache.")
+    fetched = prefetch_animes(missing, anime_cache, writer_cache, limiter, workers, base_url)
+
+    print(f"Coleta concluída em {time.perf_counter() - start:.1f}s "
+          f"({fetched}/{len(missing)} animes adicionados ao cache).")
+    return user_lists
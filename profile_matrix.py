@@ -0,0 +1,151 @@
+import csv
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+#################################################################
+# PROFILE MATRIX — PERFIS EM FORMATO BINÁRIO MAPEADO EM MEMÓRIA #
+#################################################################
+
+PROFILE_MATRIX_VERSION = 1
+PROFILE_MATRIX_SUFFIX = ".matrix"
+
+FEATURES_FILE = "features.npy"    # float32 contíguo, n_usuarios × n_features
+USERNAMES_FILE = "usernames.npy"  # índice de usernames (mesma ordem das linhas)
+SCHEMA_FILE = "schema.json"       # versão, colunas, hash do esquema e origem (gravado por último)
+
+CONVERT_CHUNKSIZE = 200_000
+
+
+def artifact_path(csv_path):
+    """profiles.csv → profiles.matrix/"""
+    return os.path.splitext(csv_path)[0] + PROFILE_MATRIX_SUFFIX
+
+
+def schema_hash(columns, dtype="float32"):
+    return hashlib.sha256(json.dumps([PROFILE_MATRIX_VERSION, dtype, list(columns)]).encode()).hexdigest()
+
+
+def _source_signature(csv_path):
+    st = os.stat(csv_path)
+    return {"source": os.path.abspath(csv_path), "source_mtime_ns": st.st_mtime_ns, "source_size": st.st_size}
+
+
+def read_schema(artifact):
+    path = os.path.join(artifact, SCHEMA_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, mode="r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def convert_csv(csv_path, artifact=None, chunksize=CONVERT_CHUNKSIZE):
+    """
+    Converte o profiles.csv para o formato binário, em blocos (a matriz nunca fica inteira na
+    memória). O schema.json é gravado por último: sem ele o artefato é considerado incompleto.
+    """
+    artifact = artifact or artifact_path(csv_path)
+    os.makedirs(artifact, exist_ok=True)
+    signature = _source_signature(csv_path)
+
+    with open(csv_path, mode="r", newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+        n_users = sum(1 for line in f if line.strip())
+    columns = header[1:]
+
+    # Invalida o artefato anterior antes de sobrescrever os dados
+    schema_file = os.path.join(artifact, SCHEMA_FILE)
+    if os.path.exists(schema_file):
+        os.remove(schema_file)
+
+    features_tmp = os.path.join(artifact, FEATURES_FILE + ".tmp")
+    matrix = np.lib.format.open_memmap(features_tmp, mode="w+", dtype=np.float32,
+                                       shape=(n_users, len(columns)))
+    usernames = []
+    row = 0
+    for chunk in pd.read_csv(csv_path, dtype={header[0]: str}, chunksize=chunksize):
+        values = chunk[columns].to_numpy(dtype=np.float32)
+        matrix[row:row + len(values)] = values
+        usernames.extend(chunk[header[0]].tolist())
+        row += len(values)
+    if row != n_users:
+        raise ValueError(f"{csv_path}: {row} linhas lidas, {n_users} esperadas.")
+    matrix.flush()
+    del matrix
+    os.replace(features_tmp, os.path.join(artifact, FEATURES_FILE))
+
+    usernames_tmp = os.path.join(artifact, USERNAMES_FILE + ".tmp")
+    with open(usernames_tmp, mode="wb") as f:
+        np.save(f, np.asarray(usernames, dtype=str))
+    os.replace(usernames_tmp, os.path.join(artifact, USERNAMES_FILE))
+
+    schema = {
+        "version": PROFILE_MATRIX_VERSION,
+        "dtype": "float32",
+        "index": header[0],
+        "columns": columns,
+        "n_users": row,
+        "hash": schema_hash(columns),
+        **signature,
+    }
+    with open(schema_file + ".tmp", mode="w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    os.replace(schema_file + ".tmp", schema_file)
+
+    print(f"Perfis convertidos para {artifact}: {row} usuários × {len(columns)} features.")
+    return artifact
+
+
+def is_stale(csv_path, artifact=None):
+    """True se o artefato não existe, está incompleto, é de outra versão ou o CSV mudou depois dele."""
+    schema = read_schema(artifact or artifact_path(csv_path))
+    if schema is None or schema.get("version") != PROFILE_MATRIX_VERSION:
+        return True
+    if schema.get("hash") != schema_hash(schema["columns"], schema["dtype"]):
+        return True
+    if not os.path.exists(csv_path):
+        return False
+    current = _source_signature(csv_path)
+    return (current["source_mtime_ns"], current["source_size"]) != \
+        (schema.get("source_mtime_ns"), schema.get("source_size"))
+
+
+def open_matrix(artifact):
+    """(usernames, colunas, matriz float32 mapeada em memória, somente leitura)."""
+    schema = read_schema(artifact)
+    if schema is None:
+        raise FileNotFoundError(f"Artefato de perfis incompleto ou inexistente: {artifact}")
+    if schema.get("version") != PROFILE_MATRIX_VERSION or \
+            schema.get("hash") != schema_hash(schema["columns"], schema["dtype"]):
+        raise ValueError(f"Esquema do artefato {artifact} incompatível com esta versão.")
+
+    matrix = np.load(os.path.join(artifact, FEATURES_FILE), mmap_mode="r")
+    usernames = np.load(os.path.join(artifact, USERNAMES_FILE), mmap_mode="r")
+    if matrix.shape != (schema["n_users"], len(schema["columns"])) or len(usernames) != schema["n_users"]:
+        raise ValueError(f"Artefato {artifact} corrompido: dimensões diferentes do schema.")
+    return usernames, schema["columns"], matrix
+
+
+def open_profiles(csv_path, artifact=None, auto_convert=True):
+    """
+    DataFrame de perfis (mesmo formato de generate_graph.load_profiles) apoiado diretamente na
+    matriz mapeada em memória, sem cópia. O artefato é (re)gerado quando o CSV é mais novo.
+    """
+    artifact = artifact or artifact_path(csv_path)
+    if auto_convert and os.path.exists(csv_path) and is_stale(csv_path, artifact):
+        convert_csv(csv_path, artifact)
+
+    usernames, columns, matrix = open_matrix(artifact)
+    index = pd.Index(usernames.astype(object), name=read_schema(artifact)["index"])
+    return pd.DataFrame(matrix, index=index, columns=columns, copy=False)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python profile_matrix.py [profiles.csv]
+    CSV = sys.argv[1] if len(sys.argv) > 1 else "profiles.csv"
+    convert_csv(CSV)
@@ -0,0 +1,214 @@
+import csv
+import json
+import sqlite3
+import time
+
+from normalizer import (
+    MAL_BASE_URL, fetch_user_list, fill_cache_misses, iter_scored_items,
+    normalize_source, profile_from_scores
+)
+from crawl_journal import STATUS_DONE, STATUS_EMPTY, STATUS_FAILED
+
+#################################################################
+# PROFILE STATE — ACUMULADORES BRUTOS E ATUALIZAÇÃO INCREMENTAL #
+#################################################################
+
+PROFILE_STATE_FILE = "profile_state.db"
+STATE_VERSION = 2
+
+
+class ProfileStateStore:
+    """
+    Estado persistido de cada usuário (SQLite, uma linha JSON por username):
+
+    - `genre_scores` / `source_scores` / `soma_total_scores`: acumuladores brutos do perfil;
+    - `entries`: impressão digital da última lista vista, {anime_id: [nota, contribuição]}, onde
+      `contribuição` é o [source normalizado, gêneros] que o anime somou aos acumuladores, ou None
+      se ele não estava no cache;
+    - `versao`: formato do estado (STATE_VERSION); estados de outra versão são refeitos do zero.
+    """
+
+    def __init__(self, path=PROFILE_STATE_FILE):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, state TEXT, updated REAL)")
+        self._db.commit()
+
+    def get(self, username):
+        row = self._db.execute("SELECT state FROM users WHERE username = ?", (username,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, username, state):
+        with self._db:
+            self._db.execute(
+                "INSERT INTO users (username, state, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET state = excluded.state, updated = excluded.updated",
+                (username, json.dumps(state, ensure_ascii=False), time.time())
+            )
+
+    def usernames(self):
+        return [r[0] for r in self._db.execute("SELECT username FROM users ORDER BY rowid")]
+
+    def iter_states(self):
+        for username, state in self._db.execute("SELECT username, state FROM users ORDER BY rowid"):
+            yield username, json.loads(state)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def empty_state(sources_alvo, generos_alvo):
+    return {
+        "genre_scores": {g: 0 for g in generos_alvo},
+        "source_scores": {s: 0 for s in sources_alvo},
+        "soma_total_scores": 0,
+        "entries": {},
+        "versao": STATE_VERSION,
+    }
+
+
+def contribution(data):
+    """[source normalizado, gêneros] que uma entrada do cache soma ao perfil (None fora do cache)."""
+    if not data:
+        return None
+    return [normalize_source(data.get("source")), list(data.get("generos", []))]
+
+
+def list_fingerprint(anime_list, anime_cache):
+    """{anime_id: [nota, contribuição]} dos itens com nota >= 7 (ids repetidos na lista somam as notas)."""
+    entries = {}
+    for anime_id, score in iter_scored_items(anime_list):
+        if anime_id in entries:
+            entries[anime_id][0] += score
+        else:
+            entries[anime_id] = [score, contribution(anime_cache.get(anime_id))]
+    return entries
+
+
+def _accumulate(state, contrib, score):
+    """Soma (ou subtrai, com score negativo) a contribuição de um anime aos acumuladores."""
+    source_final, generos = contrib
+    state["soma_total_scores"] += score
+
+    if source_final in state["source_scores"]:
+        state["source_scores"][source_final] += score
+
+    for g in generos:
+        if g in state["genre_scores"]:
+            state["genre_scores"][g] += score
+
+
+def apply_list(state, anime_list, anime_cache, sources_alvo, generos_alvo):
+    """
+    Atualiza o estado para a nova lista aplicando apenas as entradas adicionadas, removidas,
+    com nota alterada ou cuja entrada no cache mudou. Retorna (estado, número de entradas alteradas).
+
+    Cada entrada desconta exatamente a contribuição guardada na visita anterior, e não a do cache
+    atual, para que mudanças no cache (upsert no SQLite, reparse.py) não desviem os acumuladores.
+    O estado é refeito do zero quando os alvos ou a versão do formato mudaram.
+    """
+    if state is None or state.get("versao") != STATE_VERSION \
+            or set(state["genre_scores"]) != set(generos_alvo) \
+            or set(state["source_scores"]) != set(sources_alvo):
+        state = empty_state(sources_alvo, generos_alvo)
+
+    old = state["entries"]
+    new = list_fingerprint(anime_list, anime_cache)
+
+    changed = [anime_id for anime_id in old.keys() | new.keys() if old.get(anime_id) != new.get(anime_id)]
+
+    for anime_id in changed:
+        before, after = old.get(anime_id), new.get(anime_id)
+        if before and before[1]:
+            _accumulate(state, before[1], -before[0])
+        if after and after[1]:
+            _accumulate(state, after[1], after[0])
+
+    state["entries"] = new
+    return state, len(changed)
+
+
+def profile_from_state(username, state, sources_alvo, generos_alvo):
+    return profile_from_scores(username, state["genre_scores"], state["source_scores"],
+                               state["soma_total_scores"], sources_alvo, generos_alvo)
+
+
+def refresh_user(username, state_store, anime_cache, sources_alvo, generos_alvo, writer_cache,
+                 base_url=MAL_BASE_URL, delay=2, list_store=None):
+    """
+    Versão incremental de normalizer.profile_user: baixa a lista, aplica ao estado salvo só o que
+    mudou desde a última visita, persiste o estado e devolve (situação, perfil).
+    """
+    print(f"\n[USER: {username}] Coletando lista...")
+
+    try:
+        anime_list = fetch_user_list(username, base_url)
+    except Exception as e:
+        print(f"[ERRO] Falhou para {username}: {e}")
+        return STATUS_FAILED, None
+
+    if list_store is not None:
+        list_store.add(username, anime_list)
+
+    if not isinstance(anime_list, list) or len(anime_list) == 0:
+        print(f"[DEBUG] Lista vazia ou privada para {username}.")
+        # Mantém o usuário nas próximas visitas, mas sem perfil no export_profiles
+        if state_store.get(username) is not None:
+            state_store.put(username, empty_state(sources_alvo, generos_alvo))
+        return STATUS_EMPTY, None
+
+    fill_cache_misses(anime_list, anime_cache, writer_cache, base_url, delay)
+
+    state, changed = apply_list(state_store.get(username), anime_list, anime_cache, sources_alvo, generos_alvo)
+    state_store.put(username, state)
+    print(f"[ESTADO] {changed} entradas alteradas para {username}.")
+
+    profile = profile_from_state(username, state, sources_alvo, generos_alvo)
+    return (STATUS_DONE if profile else STATUS_EMPTY), profile
+
+
+def export_profiles(state_store, path, fieldnames, sources_alvo, generos_alvo):
+    """Reescreve o profiles.csv inteiro a partir dos estados salvos. Retorna o número de perfis."""
+    total = 0
+    with open(path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for username, state in state_store.iter_states():
+            profile = profile_from_state(username, state, sources_alvo, generos_alvo)
+            if profile:
+                writer.writerow(profile)
+                total += 1
+    return total
+
+
+if __name__ == "__main__":
+    from tqdm import tqdm
+    from extract_anime import load_anime_cache, initialize_cache_file
+    from profiler import (
+        SOURCES_ALVO, GENEROS_ALVO, PROFILE_FIELDNAMES, ANIME_CACHE_FILE, PROFILES_OUTPUT_FILE
+    )
+
+    # Atualização diária: revisita todos os usuários do estado e reescreve o profiles.csv
+    initialize_cache_file()
+    anime_cache = load_anime_cache(ANIME_CACHE_FILE)
+
+    with ProfileStateStore(PROFILE_STATE_FILE) as state_store, \
+            open(ANIME_CACHE_FILE, mode="a", newline="", encoding="utf-8") as cache_f:
+        writer_cache = csv.writer(cache_f)
+        for username in tqdm(state_store.usernames(), desc="Atualizando Perfis"):
+            time.sleep(1)
+            refresh_user(username, state_store, anime_cache, SOURCES_ALVO, GENEROS_ALVO, writer_cache)
+            cache_f.flush()
+
+        total = export_profiles(state_store, PROFILES_OUTPUT_FILE, PROFILE_FIELDNAMES, SOURCES_ALVO, GENEROS_ALVO)
+    print(f"{total} perfis gravados em {PROFILES_OUTPUT_FILE}.")
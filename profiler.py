@@ -4,9 +4,13 @@ from tqdm import tqdm # Importamos tqdm para ter uma barra de progresso visual
 import os
 
 # Importando as funções dos seus respectivos módulos
-from extract_users import extrair_pagina_usuarios
+from extract_users import discover_active_users
 from extract_anime import load_anime_cache, initialize_cache_file
-from normalizer import create_user_profile
+from cache_store import open_anime_cache, CACHE_DB_FILE
+from normalizer import profile_user
+from profile_state import ProfileStateStore, refresh_user
+from user_lists import UserListStore
+from crawl_journal import CrawlJournal, repair_csv_tail, STATUS_DONE, STATUS_EMPTY, STATUS_FAILED
 
 # --- CONFIGURAÇÕES GLOBAIS ---
 
@@ -25,6 +29,12 @@ GENEROS_ALVO = [
 USUARIOS_INPUT_FILE = "usernames.csv"
 ANIME_CACHE_FILE = "animes_cache.csv"
 PROFILES_OUTPUT_FILE = "profiles.csv"
+JOURNAL_FILE = "profiles_journal.jsonl"
+PROFILE_STATE_FILE = "profile_state.db"
+USER_LISTS_FILE = "user_lists.npz"
+
+# Backend do cache de animes: "csv" (animes_cache.csv em memória) ou "sqlite" (cache.db indexado)
+CACHE_BACKEND = "csv"
 
 # Estrutura do arquivo profiles.csv
 PROFILE_FIELDNAMES = ["username"] + \
@@ -33,22 +43,42 @@ PROFILE_FIELDNAMES = ["username"] + \
 
 # Limites para a execução (teste)
 USUARIOS_LIMITE_PAGINAS = 5
+USUARIOS_ANO_MINIMO = 2017
 PROFILES_LIMITE = 1000
 
-def run_pipeline():
+# Modo de coleta: "serial" (um usuário por vez), "async" (várias requisições simultâneas)
+# ou "two_phase" (todas as listas, depois cada anime ausente uma única vez, depois os perfis)
+CRAWL_MODE = "serial"
+ASYNC_RPS = 2.0          # orçamento global de requisições por segundo no modo async
+ASYNC_CONCURRENCY = 8    # requisições simultâneas no modo async
+PREFETCH_RPS = 2.0       # orçamento de requisições por segundo no modo two_phase
+PREFETCH_WORKERS = 8     # tamanho do pool de downloads no modo two_phase
+
+# Retomada: com RESUME = True uma nova execução continua a anterior (ver crawl_journal.py)
+RESUME = True
+MAX_TENTATIVAS = 3       # tentativas por usuário antes de desistir de uma falha de rede
+
+# Modo serial: guarda os acumuladores brutos de cada usuário (ver profile_state.py) para que
+# as atualizações seguintes apliquem apenas o que mudou nas listas
+SALVAR_ESTADO = True
+
+# Guarda as listas baixadas em user_lists.npz para reperfilar offline (ver reprofile.py)
+SALVAR_LISTAS = True
+
+def run_pipeline(mode=CRAWL_MODE, resume=RESUME):
     print("--- EXTRAÇÃO DE USUÁRIOS ATIVOS ---")
     
     # 1.1 Extrair usuários (ou carregar de arquivo, se existir)
     active_users = []
     try:
         if not os.path.exists(USUARIOS_INPUT_FILE):
-             # Se o arquivo não existe, executa o scraper de usuários
-            time.sleep(50)
-            active_users = extrair_pagina_usuarios(limit_pages=USUARIOS_LIMITE_PAGINAS)
-            with open(USUARIOS_INPUT_FILE, mode="w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["username"])
-                writer.writerows([[u] for u in active_users])
+             # Se o arquivo não existe, executa o scraper de usuários (já grava o CSV)
+            active_users = discover_active_users(
+                PROFILES_LIMITE,
+                USUARIOS_ANO_MINIMO,
+                USUARIOS_INPUT_FILE,
+                max_pages=USUARIOS_LIMITE_PAGINAS
+            )
         else:
             # Se o arquivo existe, carrega
             with open(USUARIOS_INPUT_FILE, mode="r", newline="", encoding="utf-8") as f:
@@ -67,42 +97,155 @@ def run_pipeline():
         print("Nenhum usuário para processar. Encerrando.")
         return
 
+    # 1.2 Journal de retomada: pula usuários concluídos e repete apenas as falhas
+    journal = CrawlJournal(JOURNAL_FILE, max_attempts=MAX_TENTATIVAS)
+    if resume and os.path.exists(PROFILES_OUTPUT_FILE):
+        repair_csv_tail(PROFILES_OUTPUT_FILE)
+        journal.load()
+        journal.reconcile(PROFILES_OUTPUT_FILE)
+        users_to_process = journal.pending(users_to_process)
+        print(f"Retomando execução anterior: {journal.summary()}")
+        profile_mode = "a"
+    else:
+        journal.reset()
+        profile_mode = "w"
+
+    if not users_to_process:
+        print("Todos os usuários já foram processados. Encerrando.")
+        return
+
     print(f"Total de usuários a serem processados: {len(users_to_process)}")
     print("\n--- INICIALIZAÇÃO E CARREGAMENTO DE CACHE ---")
 
-    # 2.1 Inicializa o arquivo de cache de animes
-    initialize_cache_file()
-    
-    # 2.2 Carrega o cache de animes em memória
-    anime_cache = load_anime_cache(ANIME_CACHE_FILE)
+    if CACHE_BACKEND == "sqlite":
+        # 2.1/2.2 Abre o cache indexado (sem carregar nada); na primeira vez importa o CSV
+        anime_cache, cache_store = open_anime_cache(CACHE_DB_FILE, import_from=ANIME_CACHE_FILE)
+        cache_output = cache_store
+    else:
+        # 2.1 Inicializa o arquivo de cache de animes
+        initialize_cache_file()
+        
+        # 2.2 Carrega o cache de animes em memória
+        anime_cache = load_anime_cache(ANIME_CACHE_FILE)
+        cache_output = open(ANIME_CACHE_FILE, mode="a", newline="", encoding="utf-8")
     
     print("\n Geração do perfis e incrementação do cache")
 
     # Abre o arquivo de perfis
-    with open(PROFILES_OUTPUT_FILE, mode="w", newline="", encoding="utf-8") as profile_csv:
+    with open(PROFILES_OUTPUT_FILE, mode=profile_mode, newline="", encoding="utf-8") as profile_csv:
         writer_profile = csv.DictWriter(profile_csv, fieldnames=PROFILE_FIELDNAMES)
-        writer_profile.writeheader()
+        if profile_csv.tell() == 0:
+            writer_profile.writeheader()
         
         # O processamento do cache é feito dentro do loop de perfis
-        with open(ANIME_CACHE_FILE, mode="a", newline="", encoding="utf-8") as cache_append_f:
-            writer_cache = csv.writer(cache_append_f)
-
-            # Itera sobre os usuários
-            for username in tqdm(users_to_process, desc="Processando Perfis"):
-                time.sleep(1)
-                user_vector = create_user_profile(
-                    username, 
-                    anime_cache, 
-                    SOURCES_ALVO, 
-                    GENEROS_ALVO,
-                    writer_cache # Passa o escritor para persistir novos dados no cache
-                )
+        with cache_output as cache_append_f:
+            # O store SQLite já se comporta como um csv.writer (writerow/flush)
+            writer_cache = cache_append_f if CACHE_BACKEND == "sqlite" else csv.writer(cache_append_f)
 
+            def emit(username, user_vector, status):
+                """Persiste o resultado de um usuário: perfil e cache em disco antes do journal."""
                 if user_vector:
                     writer_profile.writerow(user_vector)
-                    # print(f"  -> Perfil salvo para {username}.")
-                # else:
-                    # print(f"  -> Falha/Sem dados relevantes para {username}.")
+                profile_csv.flush()
+                cache_append_f.flush()
+                journal.record(username, status)
+
+            list_store = UserListStore(USER_LISTS_FILE) if SALVAR_LISTAS else None
+
+            try:
+                if mode == "async":
+                    from async_crawler import crawl_profiles
+
+                    progress = tqdm(total=len(users_to_process), desc="Processando Perfis")
+
+                    def on_result(username, user_vector, status):
+                        emit(username, user_vector, status)
+                        progress.update(1)
+
+                    stats = crawl_profiles(
+                        users_to_process,
+                        anime_cache,
+                        SOURCES_ALVO,
+                        GENEROS_ALVO,
+                        writer_cache,
+                        on_result,
+                        rps=ASYNC_RPS,
+                        concurrency=ASYNC_CONCURRENCY,
+                        list_store=list_store
+                    )
+                    progress.close()
+                    print(f"Requisições: {stats['requisicoes']} em {stats['segundos']:.1f}s "
+                          f"({stats['req_por_segundo']:.2f} req/s)")
+
+                elif mode == "two_phase":
+                    from prefetch import run_two_phase, scored_ids
+
+                    # Fases 1 e 2: listas de todos os usuários e, depois, cada anime ausente uma única vez
+                    user_lists = run_two_phase(
+                        users_to_process,
+                        anime_cache,
+                        writer_cache,
+                        rps=PREFETCH_RPS,
+                        workers=PREFETCH_WORKERS
+                    )
+                    if list_store is not None:
+                        for username, anime_list in user_lists.items():
+                            list_store.add(username, anime_list)
+
+                    # Fase 3: todos os perfis de uma vez, em multiplicações esparsas sobre o cache compacto
+                    # (só com os animes que aparecem nas listas baixadas)
+                    from anime_store import AnimeMetadataStore
+                    from batch_profiler import build_profiles
+                    compact = AnimeMetadataStore.from_cache(anime_cache, scored_ids(user_lists))
+                    perfis = build_profiles(
+                        {u: l for u, l in user_lists.items() if isinstance(l, list) and l},
+                        compact,
+                        GENEROS_ALVO,
+                        SOURCES_ALVO
+                    )
+                    perfis = {row["username"]: row for row in perfis.to_dict("records")}
+
+                    for username in tqdm(users_to_process, desc="Processando Perfis"):
+                        anime_list = user_lists.get(username)
+                        if anime_list is None:
+                            emit(username, None, STATUS_FAILED)
+                            continue
+                        user_vector = perfis.get(username)
+                        emit(username, user_vector, STATUS_DONE if user_vector else STATUS_EMPTY)
+
+                else:
+                    state_store = ProfileStateStore(PROFILE_STATE_FILE) if SALVAR_ESTADO else None
+
+                    # Itera sobre os usuários
+                    for username in tqdm(users_to_process, desc="Processando Perfis"):
+                        time.sleep(1)
+                        if state_store is not None:
+                            status, user_vector = refresh_user(
+                                username,
+                                state_store,
+                                anime_cache,
+                                SOURCES_ALVO,
+                                GENEROS_ALVO,
+                                writer_cache,
+                                list_store=list_store
+                            )
+                        else:
+                            status, user_vector = profile_user(
+                                username, 
+                                anime_cache, 
+                                SOURCES_ALVO, 
+                                GENEROS_ALVO,
+                                writer_cache, # Passa o escritor para persistir novos dados no cache
+                                list_store=list_store
+                            )
+                        emit(username, user_vector, status)
+
+                    if state_store is not None:
+                        state_store.close()
+            finally:
+                journal.close()
+                if list_store is not None:
+                    list_store.close()
 
     print(f"\nPipeline concluído!")
     print(f"Cache de Animes atualizado: {len(anime_cache)} itens.")
@@ -113,4 +256,5 @@ if __name__ == "__main__":
         run_pipeline()
     except KeyboardInterrupt:
 
-        print("\nProcesso interrompido pelo usuário. Dados parciais salvos.")
+        print("\nProcesso interrompido pelo usuário. Dados parciais salvos; "
+              "a próxima execução continua de onde parou.")
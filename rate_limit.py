@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Orçamento global de requisições por segundo, compartilhado entre threads e tarefas asyncio.
+
+    Cada chamada reserva o próximo "slot" livre (espaçados de 1/rps segundos) e espera até ele,
+    de modo que o ritmo total respeite o limite independentemente de quantas requisições
+    estejam em andamento ao mesmo tempo. `burst` permite consumir alguns slots acumulados de uma vez.
+    """
+
+    def __init__(self, rps: float, burst: int = 1):
+        if rps <= 0:
+            raise ValueError("rps deve ser positivo")
+        self.interval = 1.0 / rps
+        self.burst = max(1, int(burst))
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserva um slot e devolve quantos segundos faltam até ele."""
+        with self._lock:
+            now = time.monotonic()
+            # Slots não usados acumulam no máximo `burst` requisições imediatas
+            earliest = now - (self.burst - 1) * self.interval
+            slot = max(self._next_slot, earliest)
+            self._next_slot = slot + self.interval
+            return max(0.0, slot - now)
+
+    def acquire(self):
+        """Versão bloqueante (threads)."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Versão assíncrona (event loop)."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
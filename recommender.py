@@ -1,12 +1,15 @@
 import pandas as pd
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 from typing import List, Dict, Any
 import os
 import sys
 
 try:
-    from generate_graph import load_profiles, normalize_percent, compute_similarity, build_graph, detect_communities, describe_community
+    from generate_graph import (load_profiles, normalize_percent, describe_community,
+                                DEFAULT_THRESHOLD, GRAPH_MODE, KNN_K, COMMUNITY_ENGINE, TFIDF_GENRES, SOURCE_WEIGHT)
+    from artifacts import load_or_build, artifact_key, file_hash, ARTIFACTS_DIR
 except ImportError:
     print("ERRO: Não foi possível importar as funções do 'generate_graph.py'.")
     print("Certifique-se de que o arquivo existe e as funções estão definidas.")
@@ -58,10 +61,22 @@ ALL_FEATURES = (
     [f"Genre_{g}" for g in GENEROS_ALVO]
 )
 
+# Vetores de mangás já calculados, um .npz por conteúdo do arquivo de mangás
+MANGA_VECTORS_DIR = os.path.join(ARTIFACTS_DIR, "mangas")
+
+# Comunidades pontuadas por multiplicação (limita a matriz comunidades × mangás em memória)
+SCORE_BLOCK_SIZE = 256
+
 def load_manga_data(path: str) -> pd.DataFrame:
-    """Carrega o CSV de mangás."""
+    """Carrega o CSV de mangás (ou a tabela de mangás de um cache.db)."""
     try:
-        df = pd.read_csv(path)
+        if path.endswith(".db"):
+            # Tabela de mangás do cache_store (mesmas colunas do mangas_cache.csv)
+            from cache_store import read_table_rows, MANGA_TABLE
+            df = pd.DataFrame(read_table_rows(path, MANGA_TABLE))
+            df = df.replace({"None": np.nan, "": np.nan})
+        else:
+            df = pd.read_csv(path)
         df['id'] = df['id'].astype(str) 
         df['score'] = pd.to_numeric(df['score'], errors='coerce').fillna(1.0) # Trata NaN, desnecessário quando não há mídia adulta na base de dados.
         # Garante que a coluna 'generos' e 'tipo' não são None
@@ -77,45 +92,96 @@ def create_manga_vectors(manga_df: pd.DataFrame, all_features: List[str]) -> pd.
     Converte os dados de mangás (gêneros e tipo) em um vetor de features.
     Usa o 'score' do mangá como peso.
     Aplica Normalização L1 para consistência com os perfis L1-normalizados.
+    A matriz é montada de uma vez: tipo e lista de gêneros são processados uma vez por valor
+    distinto e viram um multi-hot (gênero repetido conta uma vez).
     """
-    
-    # Cria o DataFrame vetorizado inicial, com IDs como índice
-    manga_vectors = pd.DataFrame(index=manga_df['id'], columns=all_features).fillna(0.0)
-    
-    for _, row in manga_df.iterrows():
-            manga_id = row['id']
-            score_weight = row['score'] / 10.0
-
-            standard_source_key = standardize_manga_source(str(row['tipo']))
-            
-            # Cria a coluna Feature, substituindo o espaço por underscore
-            source = standard_source_key.replace(' ', '_')
-            source_col = f"Source_{source}"
-
-            # Verifica se a coluna padronizada existe antes de usar
-            if source_col in manga_vectors.columns:
-                manga_vectors.loc[manga_id, source_col] = score_weight
-            
-            # Processa o campo 'generos'
-            genres = [g.strip().replace(' ', '_') for g in str(row['generos']).split(',') if g.strip()]
-            for genre in genres:
-                genre_col = f"Genre_{genre}"
-                if genre_col in manga_vectors.columns:
-                    manga_vectors.loc[manga_id, genre_col] = score_weight
-
-    # Normalização L1
-    manga_vectors_norm = manga_vectors.div(manga_vectors.sum(axis=1), axis=0).fillna(0.0)
+    column = {feature: j for j, feature in enumerate(all_features)}
+    hot = np.zeros((len(manga_df), len(all_features)), dtype=bool)
+
+    # Source: standardize_manga_source só nos tipos distintos
+    codes, tipos = pd.factorize(manga_df['tipo'].astype(str).to_numpy())
+    source_cols = np.array(
+        [column.get(f"Source_{standardize_manga_source(t).replace(' ', '_')}", -1) for t in tipos] + [-1]
+    )[codes]
+    has_source = np.flatnonzero(source_cols >= 0)
+    hot[has_source, source_cols[has_source]] = True
+
+    # Gêneros: cada combinação distinta de 'generos' é separada uma vez em um multi-hot
+    codes, combos = pd.factorize(manga_df['generos'].astype(str).to_numpy())
+    combo_hot = np.zeros((len(combos) + 1, len(all_features)), dtype=bool)
+    for k, combo in enumerate(combos):
+        for g in combo.split(','):
+            j = column.get(f"Genre_{g.strip().replace(' ', '_')}") if g.strip() else None
+            if j is not None:
+                combo_hot[k, j] = True
+    hot |= combo_hot[codes]
+
+    weights = manga_df['score'].to_numpy(dtype=np.float64) / 10.0
+    values = np.where(hot, weights[:, None], 0.0)
+
+    ids = manga_df['id'].to_numpy()
+    if pd.Index(ids).has_duplicates:
+        # Ids repetidos compartilham a mesma linha e vale o último peso gravado em cada feature,
+        # como na atribuição por .loc
+        group = pd.factorize(ids)[0]
+        r, c = np.nonzero(hot)
+        keys = group[r] * len(all_features) + c
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        merged = np.zeros((group.max() + 1, len(all_features)))
+        merged[group[r[last]], c[last]] = weights[r[last]]
+        values = merged[group]
+
+    # Normalização L1 (soma acumulada coluna a coluna, na mesma ordem da versão linha a linha)
+    total = np.zeros(len(manga_df))
+    for j in range(values.shape[1]):
+        total += values[:, j]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = values / total[:, None]
+
+    manga_vectors_norm = pd.DataFrame(values, index=manga_df['id'], columns=all_features).fillna(0.0)
 
     print(f" Vetorização de {len(manga_vectors_norm)} mangás concluída.")
-    return manga_vectors_norm.astype(float)
+    return manga_vectors_norm
 
-def calculate_community_vector(df_norm_profiles: pd.DataFrame, community_users: List[str]) -> pd.Series:
+def load_or_create_manga_vectors(mangas_path: str, manga_df: pd.DataFrame, all_features: List[str],
+                                 cache_dir: str = MANGA_VECTORS_DIR, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Vetores de mangás (create_manga_vectors) reaproveitados do cache quando o arquivo de mangás
+    e as features não mudaram desde a última execução.
+    """
+    key = artifact_key(file_hash(mangas_path), {"manga_features": list(all_features)})
+    path = os.path.join(cache_dir, key[:16] + ".npz")
+
+    if use_cache and os.path.exists(path):
+        with np.load(path) as data:
+            if str(data["key"]) == key:
+                index = pd.Index(data["ids"].tolist(), name='id')
+                manga_vectors = pd.DataFrame(data["values"], index=index, columns=all_features)
+                print(f" Vetores de {len(manga_vectors)} mangás reaproveitados de {path}.")
+                return manga_vectors
+
+    manga_vectors = create_manga_vectors(manga_df, all_features)
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path + ".tmp", mode="wb") as f:
+            np.savez(f, key=key, ids=np.asarray(manga_vectors.index.tolist(), dtype=str),
+                     values=manga_vectors.to_numpy())
+        os.replace(path + ".tmp", path)
+    return manga_vectors
+
+def calculate_community_vector(df_norm_profiles: pd.DataFrame, community_users: List[str],
+                               stats=None, community: int = None) -> pd.Series:
     """
     Calcula o vetor de preferência médio para uma comunidade de usuários.
     Usa o DF de perfis L1-normalizado (df_norm).
+    Com `stats` (CommunityStats calculado sobre o df_norm) e o índice `community`, usa a média já calculada.
     """
     if not community_users:
         return pd.Series(0, index=df_norm_profiles.columns)
+
+    if stats is not None and community is not None:
+        return stats.mean(community)
         
     # Retorna a média das linhas dos usuários na comunidade
     community_vector = df_norm_profiles.loc[community_users].mean(axis=0)
@@ -144,30 +210,77 @@ def recommend_manga_for_community(community_vector: pd.Series, manga_vectors: pd
     # Retorna os mangás mais similares ordenados
     return sim_series.sort_values(ascending=False)
 
+def top_k_mangas(community_vectors: pd.DataFrame, manga_vectors: pd.DataFrame, k: int,
+                 block_size: int = SCORE_BLOCK_SIZE):
+    """
+    Similaridade de cosseno de todas as comunidades (linhas de community_vectors) com todos os
+    mangás, em multiplicações de blocos de comunidades × catálogo, e os k mangás mais similares de
+    cada comunidade (argpartition; só os candidatos são ordenados, empates na ordem do catálogo).
+    Retorna (posições em manga_vectors, similaridades), ambos comunidades × k.
+    """
+    mangas = normalize(manga_vectors[community_vectors.columns].to_numpy(dtype=np.float64))
+    vectors = normalize(community_vectors.to_numpy(dtype=np.float64))
+    k = min(k, len(mangas))
+
+    top = np.zeros((len(vectors), k), dtype=np.int64)
+    top_scores = np.zeros((len(vectors), k))
+    if k == 0:
+        return top, top_scores
+
+    for b0 in range(0, len(vectors), block_size):
+        scores = vectors[b0:b0 + block_size] @ mangas.T
+        kth = np.partition(scores, len(mangas) - k, axis=1)[:, len(mangas) - k]
+        for r, row in enumerate(scores):
+            candidates = np.flatnonzero(row >= kth[r])
+            best = candidates[np.argsort(-row[candidates], kind="stable")[:k]]
+            top[b0 + r] = best
+            top_scores[b0 + r] = row[best]
+    return top, top_scores
+
 def main_recommender(
     profiles_path: str = 'profiles.csv', 
     mangas_path: str = 'mangas_dados_essenciais.csv',
-    threshold: float = 0.98,
-    num_recommendations: int = 5
+    threshold: float = DEFAULT_THRESHOLD,
+    num_recommendations: int = 5,
+    binary: bool = False,
+    graph_mode: str = GRAPH_MODE,
+    knn_k: int = KNN_K,
+    community_engine: str = COMMUNITY_ENGINE,
+    tfidf: bool = TFIDF_GENRES,
+    source_weight: float = SOURCE_WEIGHT,
+    use_cache: bool = True,
+    draw: bool = True,
+    export_dir: str = None,
+    incremental: bool = False
 ):
     """
     Orquestra o processo de clusterização e recomendação.
+    Com binary=True os perfis vêm da matriz float32 mapeada em memória (ver profile_matrix.py).
+    Com graph_mode="knn" o grafo liga cada usuário aos knn_k vizinhos mais similares (ver knn_graph.py)
+    em vez de usar o threshold. community_engine escolhe o motor de comunidades (ver communities.py).
+    A clusterização usa as mesmas features do generate_graph.main (tfidf, source_weight) e é
+    reaproveitada do cache de artefatos (artifacts.py) quando use_cache=True, assim como os vetores
+    de mangás. Com export_dir o grafo também é exportado para o visualizador interativo
+    (graph_export.py, viewer/index.html).
+    Com incremental=True o grafo e as comunidades da execução anterior são atualizados só com os
+    perfis novos (incremental_graph.py).
     """
     
     # Clusterização de Perfis
     print("\n--- Clusterização de Perfis ---")
     
     # Carrega o DF original (necessário para describe_community)
-    df_raw = load_profiles(profiles_path)
+    df_raw = load_profiles(profiles_path, binary=binary)
     # Normaliza L1 (necessário para calculate_community_vector)
     df_norm = normalize_percent(df_raw) 
     
-    print("Calculando similaridade e construindo grafo...")
-    sim_df = compute_similarity(df_norm)
-    G = build_graph(sim_df, threshold)
-    
-    print("Detectando comunidades...")
-    comms = detect_communities(G) # Usa detect_communities do graph_creator.py
+    # Grafo e comunidades: do cache quando os mesmos perfis e parâmetros já foram processados
+    if incremental:
+        from incremental_graph import update_graph
+        _, G, comms = update_graph(df_raw, threshold, community_engine, tfidf, source_weight, binary, graph_mode)
+    else:
+        _, G, comms = load_or_build(profiles_path, df_raw, threshold, binary, graph_mode, knn_k,
+                                    community_engine, tfidf, source_weight, use_cache=use_cache)
     
     if not comms:
         print("Não foi detectada nenhuma comunidade. Tente reduzir o THRESHOLD.")
@@ -178,11 +291,22 @@ def main_recommender(
     # Importa a função geradora de nomes
     from generate_graph import draw_graph, generate_community_names
 
+    # Estatísticas de todas as comunidades numa única agregação: perfis originais (nomes e
+    # descrições) e normalizados (vetores de preferência)
+    from community_stats import CommunityStats
+    stats_raw = CommunityStats(df_raw, comms)
+    stats_norm = CommunityStats(df_norm, comms)
+
     # gera nomes
-    community_names = generate_community_names(df_raw, comms, top_k=2)
+    community_names = generate_community_names(df_raw, comms, top_k=2, stats=stats_raw)
 
     # desenha grafo com os nomes
-    draw_graph(G, comms, df_raw, community_names=community_names, output="graph_comm.png")
+    if draw:
+        draw_graph(G, comms, df_raw, community_names=community_names, output="graph_comm.png")
+
+    if export_dir:
+        from graph_export import export_graph
+        export_graph(G, comms, df_raw, community_names=community_names, directory=export_dir)
 
     # Carrega o csv de mangás para adaptação
     print("\n--- Preparação dos Mangás para Recomendação ---")
@@ -190,7 +314,7 @@ def main_recommender(
     if manga_data_raw.empty:
         return
         
-    manga_vectors = create_manga_vectors(manga_data_raw, ALL_FEATURES)
+    manga_vectors = load_or_create_manga_vectors(mangas_path, manga_data_raw, ALL_FEATURES, use_cache=use_cache)
     
     # --- Recomendação por Comunidade e Escrita no arquivo de saída ---
     print("\n--- Recomendação por Comunidade ---")
@@ -203,17 +327,25 @@ def main_recommender(
 
     print("\n--- Recomendação por Comunidade ---")
 
+    # Vetores de preferência de todas as comunidades e os top-N de cada uma de uma vez
+    community_vectors = pd.DataFrame(
+        [calculate_community_vector(df_norm, c, stats_norm, i) for i, c in enumerate(comms)],
+        columns=df_norm.columns,
+    )
+    top, top_scores = top_k_mangas(community_vectors, manga_vectors, num_recommendations)
+
+    # Metadados dos mangás indexados pelo id (primeira ocorrência de cada id)
+    manga_info_by_id = manga_data_raw.drop_duplicates('id').set_index('id')
+    manga_ids = manga_vectors.index
+
     # Abre o arquivo em modo append para registrar as recomendações
     with open(output_path, "a", encoding="utf-8") as f_out:
         for i, community_users in enumerate(comms):
             if not community_users:
                 continue
 
-            # Calcula o Vetor de Preferência da Comunidade
-            community_vector = calculate_community_vector(df_norm, community_users)
-
             # Caracteriza a Comunidade
-            details = describe_community(df_raw, community_users)
+            details = describe_community(df_raw, community_users, stats_raw, i)
 
             # --- Impressão normal ---
             print(f"\n[COMUNIDADE {i+1}] ({details['n_users']} usuários)")
@@ -225,15 +357,11 @@ def main_recommender(
             f_out.write(f"  Foco Principal: Origem - {details['source']}. "
                         f"Gêneros - {', '.join(details['genres'])}\n")
 
-            # Recomenda mangás
-            sim_results = recommend_manga_for_community(community_vector, manga_vectors)
-            top_n = sim_results.head(num_recommendations)
-
             print(f"  --- Top {num_recommendations} Mangás Não Adaptados Recomendados ---")
             f_out.write(f"  --- Top {num_recommendations} Mangás Não Adaptados Recomendados ---\n")
 
-            for manga_id, score in top_n.items():
-                manga_info = manga_data_raw[manga_data_raw['id'] == manga_id].iloc[0]
+            for position, score in zip(top[i], top_scores[i]):
+                manga_info = manga_info_by_id.loc[manga_ids[position]]
 
                 # Impressão na tela
                 print(f"  [{score:.4f}] {manga_info['nome']}")
@@ -257,8 +385,30 @@ if __name__ == "__main__":
     # Valores do threshold e número de recomendações geradas.
     THRESHOLD = 0.98 
     NUM_RECS = 5
+
+    # True: lê os perfis do artefato binário (profiles.matrix/), gerado a partir do CSV quando preciso
+    PROFILES_BINARY = False
+
+    # "threshold" (padrão) ou "knn": cada usuário ligado aos K_VIZINHOS mais similares
+    GRAPH_MODE = "threshold"
+    K_VIZINHOS = 10
+
+    # Motor de comunidades: "greedy" (padrão), "louvain" ou "label_propagation"
+    MOTOR_COMUNIDADES = "greedy"
+
+    # True: reaproveita grafo e comunidades de execuções anteriores com os mesmos parâmetros (artifacts.py)
+    USAR_CACHE = True
+    # False: pula o desenho do grafo (graph_comm.png) e vai direto às recomendações
+    DESENHAR_GRAFO = True
+    # Diretório para exportar o grafo ao visualizador interativo (viewer/index.html); None desliga
+    EXPORTAR_GRAFO = None
+    # True: atualiza grafo e comunidades da execução anterior só com os perfis novos (incremental_graph.py)
+    MODO_INCREMENTAL = False
     
     if os.path.exists(FILE_PROFILES) and os.path.exists(FILE_MANGAS):
-        main_recommender(FILE_PROFILES, FILE_MANGAS, THRESHOLD, NUM_RECS)
+        main_recommender(FILE_PROFILES, FILE_MANGAS, THRESHOLD, NUM_RECS, binary=PROFILES_BINARY,
+                         graph_mode=GRAPH_MODE, knn_k=K_VIZINHOS, community_engine=MOTOR_COMUNIDADES,
+                         use_cache=USAR_CACHE, draw=DESENHAR_GRAFO, export_dir=EXPORTAR_GRAFO,
+                         incremental=MODO_INCREMENTAL)
     else:
         print(f"\nErro: Arquivos de dados ('{FILE_PROFILES}' ou '{FILE_MANGAS}') não encontrados. Verifique os caminhos.")
\ No newline at end of file
@@ -0,0 +1,84 @@
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import http_client
+from page_store import PageStore, PAGE_STORE_DIR
+
+################################################################
+# REPARSE — RECONSTRÓI OS CACHES A PARTIR DAS PÁGINAS GUARDADAS #
+################################################################
+
+ANIME_URL_RE = re.compile(r"/anime/(\d+)$")
+MANGA_URL_RE = re.compile(r"/manga/(\d+)$")
+
+
+def _init_replay_worker(store_dir):
+    # Cada processo do pool abre seu próprio índice e usa um cliente em modo replay (nunca acessa a rede)
+    os.environ[http_client.REPLAY_ENV] = "1"
+    http_client.configure(store=PageStore(store_dir), replay=True)
+
+
+def _parse_anime(base_url, anime_id):
+    from extract_anime import extract_anime_data
+    return extract_anime_data(anime_id, base_url)
+
+
+def _parse_manga(base_url, manga_id):
+    from extract_manga import extract_work
+    return extract_work(manga_id, work_type="manga", base_url=base_url)
+
+
+def _ids_from_store(store, pattern, like):
+    """Separa cada URL guardada em (endereço base, id), para remontar exatamente a mesma URL."""
+    bases, ids = [], []
+    for url in store.urls(like=like):
+        match = pattern.search(url)
+        if match:
+            bases.append(url[:match.start()])
+            ids.append(match.group(1))
+    return bases, ids
+
+
+def reparse(kind, output_file, store_dir=PAGE_STORE_DIR, workers=None):
+    """
+    Refaz o parsing de todas as páginas de `kind` ("anime" ou "manga") guardadas no PageStore
+    e escreve um CSV no mesmo formato de animes_cache.csv / mangas_cache.csv.
+    """
+    store = PageStore(store_dir)
+    if kind == "anime":
+        bases, ids = _ids_from_store(store, ANIME_URL_RE, "%/anime/%")
+        func, fieldnames = _parse_anime, ["id", "nome", "generos", "source"]
+    else:
+        bases, ids = _ids_from_store(store, MANGA_URL_RE, "%/manga/%")
+        func, fieldnames = _parse_manga, ["id", "nome", "score", "generos", "tipo"]
+    store.close()
+
+    print(f"Reprocessando {len(ids)} páginas de {kind} a partir de {store_dir}...")
+    start = time.perf_counter()
+    written = 0
+
+    with open(output_file, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_replay_worker,
+                                 initargs=(store_dir,)) as pool:
+            for data in pool.map(func, bases, ids, chunksize=64):
+                if data and data.get("nome"):
+                    writer.writerow(data)
+                    written += 1
+
+    elapsed = time.perf_counter() - start
+    print(f"{written} linhas escritas em {output_file} ({elapsed:.1f}s, {len(ids) / max(elapsed, 1e-9):.0f} páginas/s)")
+    return written
+
+
+if __name__ == "__main__":
+    # Uso: python reparse.py [anime|manga] [arquivo_saida]
+    KIND = sys.argv[1] if len(sys.argv) > 1 else "anime"
+    OUTPUT = sys.argv[2] if len(sys.argv) > 2 else f"{KIND}s_cache_reparsed.csv"
+    reparse(KIND, OUTPUT)
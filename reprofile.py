@@ -0,0 +1,66 @@
+import sys
+import time
+
+import numpy as np
+
+from anime_store import AnimeMetadataStore
+from batch_profiler import MIN_SCORE, profile_matrix, profiles_frame
+from normalizer import SOURCE_WEIGHTS
+from user_lists import UserListStore, USER_LISTS_FILE
+
+##################################################################
+# REPROFILE — REGERA O PROFILES.CSV OFFLINE COM OUTROS PARÂMETROS #
+##################################################################
+
+
+def load_anime_store(cache_path):
+    """AnimeMetadataStore a partir do animes_cache.csv ou do cache.db (backend SQLite)."""
+    if cache_path.endswith(".db"):
+        from cache_store import open_anime_cache
+        anime_cache, store = open_anime_cache(cache_path)
+        try:
+            return AnimeMetadataStore.from_cache(anime_cache)
+        finally:
+            store.close()
+    return AnimeMetadataStore.from_csv(cache_path)
+
+
+def reprofile(output_file, generos_alvo, sources_alvo, source_weights=None, min_score=MIN_SCORE,
+              statuses=None, lists_file=USER_LISTS_FILE, cache_file="animes_cache.csv"):
+    """
+    Recalcula todos os perfis a partir das listas guardadas (user_lists.npz) e do cache de animes,
+    sem nenhum acesso à rede. `statuses` restringe os itens a alguns status do MAL (ex.: {2}).
+    Retorna o DataFrame gravado.
+    """
+    start = time.perf_counter()
+    usernames, offsets, anime_id, score, status = UserListStore(lists_file).columns()
+    store = load_anime_store(cache_file)
+
+    user_index = np.repeat(np.arange(len(usernames)), np.diff(offsets))
+    scores = score.astype(np.int64)
+    if statuses is not None:
+        # Itens fora dos status pedidos recebem nota 0 e são descartados pelo filtro de nota
+        scores = np.where(np.isin(status, list(statuses)), scores, 0)
+
+    values, totals = profile_matrix(user_index, anime_id, scores, len(usernames), store,
+                                    generos_alvo, sources_alvo, source_weights, min_score)
+    df = profiles_frame(usernames.tolist(), values, totals, generos_alvo, sources_alvo)
+    df.to_csv(output_file, index=False)
+
+    print(f"{len(df)} perfis ({len(usernames)} listas) gravados em {output_file} "
+          f"em {time.perf_counter() - start:.2f}s.")
+    return df
+
+
+if __name__ == "__main__":
+    from profiler import SOURCES_ALVO, GENEROS_ALVO, ANIME_CACHE_FILE
+
+    # Uso: python reprofile.py [arquivo_saida]
+    # Altere os parâmetros abaixo para experimentar outros conjuntos de gêneros, pesos e corte de nota
+    OUTPUT = sys.argv[1] if len(sys.argv) > 1 else "profiles_reprofiled.csv"
+    GENEROS = GENEROS_ALVO
+    SOURCES = SOURCES_ALVO
+    PESOS = SOURCE_WEIGHTS
+    NOTA_MINIMA = MIN_SCORE
+
+    reprofile(OUTPUT, GENEROS, SOURCES, PESOS, NOTA_MINIMA, cache_file=ANIME_CACHE_FILE)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Os módulos do projeto ficam na raiz (sem pacote) e os geradores de dados em benchmarks/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from anime_store import AnimeMetadataStore
+from batch_profiler import build_profiles
+from normalizer import compute_profile
+from profiler import SOURCES_ALVO, GENEROS_ALVO
+
+GENEROS = GENEROS_ALVO + ["Mystery", "Horror", "Ecchi"]
+SOURCES = ["Manga", "Light novel", "Original", "Web manga", "Novel", "Game", "Unknown"]
+N_ANIMES = 300
+
+
+@pytest.fixture(scope="module")
+def cache():
+    rng = random.Random(11)
+    return {
+        str(i): {"generos": rng.sample(GENEROS, rng.randint(1, 4)), "source": rng.choice(SOURCES)}
+        for i in range(1, N_ANIMES + 1)
+    }
+
+
+@pytest.fixture(scope="module")
+def user_lists():
+    rng = random.Random(12)
+    lists = {
+        f"u{u}": [{"anime_id": rng.randint(1, N_ANIMES + 30), "score": rng.randint(0, 10)}
+                  for _ in range(rng.randint(1, 60))]
+        for u in range(200)
+    }
+    # Casos de borda: lista vazia, só animes fora do cache, só notas abaixo do mínimo
+    lists["vazio"] = []
+    lists["desconhecidos"] = [{"anime_id": N_ANIMES + 1, "score": 9}]
+    lists["notas_baixas"] = [{"anime_id": 1, "score": 3}, {"anime_id": 2, "score": 0}]
+    return lists
+
+
+def test_build_profiles_matches_compute_profile(cache, user_lists, capsys):
+    batch = build_profiles(user_lists, AnimeMetadataStore.from_cache(cache), GENEROS_ALVO, SOURCES_ALVO)
+    expected = {u: compute_profile(u, l, cache, SOURCES_ALVO, GENEROS_ALVO) for u, l in user_lists.items()}
+    expected = {u: p for u, p in expected.items() if p}
+
+    assert list(batch["username"]) == list(expected)
+    for row in batch.to_dict("records"):
+        profile = expected[row["username"]]
+        assert row.keys() == profile.keys()
+        for column, value in profile.items():
+            if column != "username":
+                assert row[column] == pytest.approx(value, abs=1e-12), (row["username"], column)
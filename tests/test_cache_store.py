@@ -0,0 +1,42 @@
+import random
+
+import pandas as pd
+
+from anime_store import AnimeMetadataStore
+from batch_profiler import build_profiles
+from cache_store import open_anime_cache
+from prefetch import collect_missing_ids, scored_ids
+from profiler import SOURCES_ALVO, GENEROS_ALVO
+
+N_ANIMES = 5000
+
+
+def test_two_phase_reads_only_the_listed_ids(tmp_path):
+    rng = random.Random(9)
+    rows = {str(i): [str(i), f"Anime {i}", ", ".join(rng.sample(GENEROS_ALVO, 2)), rng.choice(["Manga", "Original"])]
+            for i in range(1, N_ANIMES + 1)}
+    anime_cache, store = open_anime_cache(str(tmp_path / "cache.db"))
+    store.upsert_many(rows.values())
+
+    user_lists = {
+        f"u{u}": [{"anime_id": rng.randint(1, N_ANIMES + 20), "score": rng.randint(0, 10)} for _ in range(30)]
+        for u in range(20)
+    }
+    ids = scored_ids(user_lists)
+
+    # Conta as linhas lidas do SQLite: só os ids das listas podem sair do banco
+    read = []
+    store._db.set_trace_callback(lambda sql: sql.startswith("SELECT *") and read.append(sql))
+    missing = collect_missing_ids(user_lists, anime_cache)
+    compact = AnimeMetadataStore.from_cache(anime_cache, ids)
+    store._db.set_trace_callback(None)
+
+    assert missing == sorted((a for a in ids if a not in rows), key=int)
+    assert sorted(compact.ids.tolist()) == sorted(int(a) for a in ids if a in rows)
+    assert not any("WHERE" not in sql for sql in read)
+
+    full = AnimeMetadataStore.from_cache(anime_cache)
+    assert len(full) == N_ANIMES
+    pd.testing.assert_frame_equal(build_profiles(user_lists, compact, GENEROS_ALVO, SOURCES_ALVO),
+                                  build_profiles(user_lists, full, GENEROS_ALVO, SOURCES_ALVO))
+    store.close()
@@ -0,0 +1,45 @@
+import contextlib
+import io
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import http_client
+from bench_crawler import make_stub_handler, run_async, run_prefetch, run_serial
+
+USERS = [f"user{i}" for i in range(15)]
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    # Sem revalidação em disco: cada modo deve baixar tudo do stub
+    previous = http_client._client
+    http_client.configure(store=None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_stub_handler(0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    http_client._client = previous
+
+
+@pytest.fixture(scope="module")
+def serial(base_url):
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, profiles, cache = run_serial(USERS, base_url)
+    assert profiles and cache
+    return profiles, cache
+
+
+def test_async_matches_serial(base_url, serial):
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, profiles, cache = run_async(USERS, base_url, rps=1000)
+    profiles = sorted(profiles, key=lambda p: USERS.index(p["username"]))
+    assert (profiles, cache) == serial
+
+
+def test_two_phase_matches_serial(base_url, serial):
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, profiles, cache = run_prefetch(USERS, base_url, rps=1000)
+    assert (profiles, cache) == serial
@@ -0,0 +1,99 @@
+import pytest
+
+import fast_parser
+from extract_anime import parse_anime_page
+from extract_manga import parse_work_page
+
+
+def page(title, *blocks):
+    body = "\n".join(blocks)
+    return (f"<html><head><title>\n  {title}\n</title><script>var x = 'Genres:';</script></head>"
+            f"<body><div id='content'>{body}</div></body></html>")
+
+
+def info(label, content):
+    return f'<div class="spaceit_pad"><span class="dark_text">{label}</span> {content}</div>'
+
+
+GENRES = ('<a href="/anime/genre/1/Action" title="Action">Action</a>, '
+          '<span itemprop="genre" style="display: none">Action</span>'
+          '<a href="/anime/genre/4/Comedy" title="Comedy">Comedy</a>')
+MANGA_GENRES = ('<a href="/manga/genre/8/Drama">Drama</a>, <a href="/manga/genre/36/Slice_of_Life">Slice of Life</a>, '
+                '<a href="/people/1/Someone">Autor</a>')
+THEMES = '<a href="/manga/themes/62/Isekai">Isekai</a>'
+
+ANIME_PAGES = {
+    "completa": page("Cowboy Bebop - MyAnimeList.net",
+                     info("Source:", "Original"), info("Genres:", GENRES)),
+    "genero_singular": page("Mushishi | Mushi-Shi - MyAnimeList.net",
+                            info("Genre:", '<a href="/anime/genre/37/Supernatural">Supernatural</a>'),
+                            info("Source:", "  Manga  ")),
+    "sem_source": page("Sem Fonte - MyAnimeList.net", info("Genres:", GENRES)),
+    "sem_generos_links": page("Vazio - MyAnimeList.net", info("Genres:", "None found"), info("Source:", "Light novel")),
+    "entidades": page("Kaguya&#45;sama &amp; Amigos - MyAnimeList.net",
+                      info("Genres:", '<a href="/anime/genre/22">Rom<b>ance</b></a><!-- c -->'),
+                      info("Source:", "Web <i>manga</i>")),
+    "sem_span_generos": page("Quebrada - MyAnimeList.net", info("Source:", "Manga")),
+    "sem_titulo": "<html><body>" + info("Genres:", GENRES) + "</body></html>",
+}
+
+MANGA_PAGES = {
+    "completa": page("Solo Leveling - MyAnimeList.net",
+                     '<span itemprop="ratingValue" class="score-label">8.60</span>',
+                     info("Type:", '<a href="/topmanga.php?type=manhwa">Manhwa</a>'),
+                     info("Genres:", MANGA_GENRES + ", " + THEMES), info("Themes:", THEMES)),
+    "adaptada": page("Berserk - MyAnimeList.net",
+                     '<div class="related-entries"><div class="entry"><div class="relation">Adaptation '
+                     '(TV)</div><a href="/anime/33">Berserk (TV)</a></div></div>',
+                     info("Genres:", MANGA_GENRES)),
+    "relacao_sem_adaptacao": page("Vagabond - MyAnimeList.net",
+                                  '<div class="relation entry">Side Story<a>Vagabond (One-shot)</a></div>',
+                                  '<span itemprop="ratingValue">9.27</span>',
+                                  info("Type:", '<a href="/topmanga.php?type=manga">Manga</a>')),
+    "genero_singular": page("Única - MyAnimeList.net",
+                            info("Genre:", '<a href="/manga/genre/2">Adventure</a>'),
+                            info("Type:", "Sem link")),
+    "sem_nada": page("Nada - MyAnimeList.net"),
+    "sem_titulo": "<html><body>" + info("Genres:", MANGA_GENRES) + "</body></html>",
+}
+
+
+def run(func, *args):
+    """Resultado da função ou o PageParseError levantado (os dois motores devem concordar na mensagem)."""
+    try:
+        return func(*args)
+    except fast_parser.PageParseError as e:
+        return ("PageParseError", str(e))
+
+
+@pytest.mark.parametrize("name", ANIME_PAGES)
+def test_anime_page_matches_bs4(name):
+    html = ANIME_PAGES[name]
+    assert run(fast_parser.parse_anime_page, html, "1") == run(parse_anime_page, html, "1")
+
+
+@pytest.mark.parametrize("name", MANGA_PAGES)
+def test_work_page_matches_bs4(name, capsys):
+    html = MANGA_PAGES[name]
+    for work_type in ("manga", "manhwa"):
+        assert run(fast_parser.parse_work_page, html, "2", work_type) == run(parse_work_page, html, "2", work_type)
+
+
+def test_fixtures_cover_the_parsed_fields(capsys):
+    # Garante que as páginas acima exercitam os campos (e não só o caminho de erro)
+    anime = parse_anime_page(ANIME_PAGES["completa"], "1")
+    assert anime == {"id": "1", "nome": "Cowboy Bebop", "generos": "Action, Comedy", "source": "Original"}
+    manga = parse_work_page(MANGA_PAGES["completa"], "2")
+    assert manga == {"id": "2", "nome": "Solo Leveling", "score": "8.60",
+                     "generos": "Drama, Slice of Life, Isekai", "tipo": "Manhwa"}
+    assert parse_work_page(MANGA_PAGES["adaptada"], "3") is None
+
+
+@pytest.mark.parametrize("name, message", [
+    ("sem_titulo", "página sem <title>"),
+    ("sem_span_generos", "página sem o campo Genres:"),
+])
+def test_incomplete_anime_page_raises_parse_error(name, message):
+    for parse in (parse_anime_page, fast_parser.parse_anime_page):
+        with pytest.raises(fast_parser.PageParseError, match=message):
+            parse(ANIME_PAGES[name], "1")
@@ -0,0 +1,85 @@
+import contextlib
+import io
+
+import pytest
+
+import profile_state
+from crawl_journal import STATUS_EMPTY
+from normalizer import compute_profile
+from profile_state import ProfileStateStore, apply_list, profile_from_state, refresh_user
+from profiler import GENEROS_ALVO, SOURCES_ALVO
+
+
+def item(anime_id, score):
+    return {"anime_id": anime_id, "score": score, "status": 2}
+
+
+def delta_and_scratch(state, anime_list, cache):
+    with contextlib.redirect_stdout(io.StringIO()):
+        state, _ = apply_list(state, anime_list, cache, SOURCES_ALVO, GENEROS_ALVO)
+        delta = profile_from_state("u", state, SOURCES_ALVO, GENEROS_ALVO)
+        scratch = compute_profile("u", anime_list, cache, SOURCES_ALVO, GENEROS_ALVO)
+    return state, delta, scratch
+
+
+def test_deltas_match_compute_profile():
+    cache = {
+        "1": {"generos": ["Action"], "source": "Manga"},
+        "2": {"generos": ["Comedy", "Romance"], "source": "Light novel"},
+        "3": {"generos": ["Drama"], "source": "Original"},
+    }
+    steps = [
+        ("inicial", [item(1, 8), item(2, 9)], {}),
+        ("adiciona", [item(1, 8), item(2, 9), item(3, 7)], {}),
+        ("renota", [item(1, 10), item(2, 9), item(3, 7)], {}),
+        ("nota_baixa", [item(1, 10), item(2, 5), item(3, 7)], {}),
+        ("cache_mudou", [item(1, 10), item(2, 5), item(3, 7)], {"1": {"generos": ["Drama"], "source": "Web manga"}}),
+        ("remove_mudado", [item(2, 9), item(3, 7)], {}),
+        ("repetido", [item(2, 9), item(3, 7), item(3, 8)], {}),
+        ("fora_do_cache", [item(2, 9), item(3, 7), item(4, 9)], {"2": None}),
+        ("volta_ao_cache", [item(2, 9), item(3, 7), item(4, 9)], {"4": {"generos": ["Sports"], "source": "Novel"}}),
+    ]
+    state = None
+    for name, anime_list, cache_update in steps:
+        for anime_id, data in cache_update.items():
+            if data is None:
+                cache.pop(anime_id)
+            else:
+                cache[anime_id] = data
+        state, delta, scratch = delta_and_scratch(state, anime_list, cache)
+        assert delta == pytest.approx(scratch), name
+
+
+def test_changed_cache_entry_is_subtracted_as_added():
+    # Cenário do review: Action adicionado, cache muda para Drama, usuário remove o anime
+    cache = {"1": {"generos": ["Action"], "source": "Manga"}, "2": {"generos": ["Drama"], "source": "Manga"}}
+    state, _, _ = delta_and_scratch(None, [item(1, 8), item(2, 8)], cache)
+    cache["1"] = {"generos": ["Drama"], "source": "Manga"}
+    state, delta, scratch = delta_and_scratch(state, [item(2, 8)], cache)
+    assert state["genre_scores"]["Action"] == 0 and state["genre_scores"]["Drama"] == 8
+    assert delta == pytest.approx(scratch)
+
+
+def test_old_state_format_is_rebuilt():
+    cache = {"1": {"generos": ["Action"], "source": "Manga"}}
+    legacy = {"genre_scores": {g: 0 for g in GENEROS_ALVO}, "source_scores": {s: 0 for s in SOURCES_ALVO},
+              "soma_total_scores": 0, "entries": {"1": [8, True]}}
+    state, delta, scratch = delta_and_scratch(legacy, [item(1, 8)], cache)
+    assert state["versao"] == profile_state.STATE_VERSION
+    assert delta == pytest.approx(scratch)
+
+
+def test_empty_list_clears_saved_profile(tmp_path, monkeypatch):
+    cache = {"1": {"generos": ["Action"], "source": "Manga"}}
+    lists = {"u": [item(1, 8)]}
+    monkeypatch.setattr(profile_state, "fetch_user_list", lambda username, base_url: lists[username])
+
+    with ProfileStateStore(str(tmp_path / "state.db")) as store, contextlib.redirect_stdout(io.StringIO()):
+        refresh_user("u", store, cache, SOURCES_ALVO, GENEROS_ALVO, None, delay=0)
+        assert profile_from_state("u", store.get("u"), SOURCES_ALVO, GENEROS_ALVO)
+
+        lists["u"] = []
+        status, profile = refresh_user("u", store, cache, SOURCES_ALVO, GENEROS_ALVO, None, delay=0)
+        assert (status, profile) == (STATUS_EMPTY, None)
+        assert store.usernames() == ["u"]
+        assert profile_from_state("u", store.get("u"), SOURCES_ALVO, GENEROS_ALVO) is None
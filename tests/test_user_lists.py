@@ -0,0 +1,44 @@
+import os
+import random
+
+from user_lists import UserListStore
+
+
+def random_list(rng):
+    return [{"anime_id": rng.randint(1, 5000), "score": rng.randint(0, 10), "status": rng.randint(1, 6)}
+            for _ in range(rng.randint(0, 30))]
+
+
+def test_lists_are_journaled_and_compacted_once(tmp_path):
+    path = str(tmp_path / "lists.npz")
+    rng = random.Random(3)
+    expected = {}
+
+    store = UserListStore(path, save_every=10)
+    for i in range(95):
+        expected[f"u{i}"] = random_list(rng)
+        store.add(f"u{i}", expected[f"u{i}"])
+    # Durante a coleta só o journal cresce; o .npz não é reescrito
+    assert not os.path.exists(path)
+    assert os.path.exists(store.journal_path)
+
+    # Execução interrompida: o que já foi para o journal volta na abertura
+    recovered = UserListStore(path)
+    assert len(recovered) == 90
+    assert all(recovered.get(u) == expected[u] for u in list(expected)[:90])
+
+    store.close()
+    assert os.path.exists(path) and not os.path.exists(store.journal_path)
+
+    # Nova execução: uma lista atualizada substitui a anterior
+    expected["u3"] = random_list(rng)
+    with UserListStore(path, save_every=10) as store:
+        store.add("u3", expected["u3"])
+        store.add("novo", [])
+        expected["novo"] = []
+
+    store = UserListStore(path)
+    assert len(store) == len(expected)
+    assert all(store.get(u) == l for u, l in expected.items())
+    usernames, offsets, _, _, _ = store.columns()
+    assert usernames.tolist()[-2:] == ["u3", "novo"] and offsets[-1] == sum(len(l) for l in expected.values())
@@ -0,0 +1,141 @@
+import sys
+import time
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+import communities
+from generate_graph import (DEFAULT_THRESHOLD, SIMILARITY_BLOCK_SIZE, iter_similar_pairs, load_profiles,
+                            prepare_features)
+
+############################################################################
+# THRESHOLD SWEEP — VÁRIOS THRESHOLDS COM UM ÚNICO CÁLCULO DE SIMILARIDADE #
+############################################################################
+
+DEFAULT_THRESHOLDS = [0.99, 0.985, 0.98, 0.975, 0.97, 0.96, 0.95, 0.9]
+
+
+class UnionFind:
+    """Conjuntos disjuntos com compressão de caminho e união por tamanho."""
+
+    def __init__(self, n):
+        self.parent = np.arange(n)
+        self.size = np.ones(n, dtype=np.int64)
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        """Une os conjuntos de a e b; True se eram conjuntos diferentes."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+
+def collect_edges(df_norm, min_threshold, block_size=SIMILARITY_BLOCK_SIZE):
+    """Todas as arestas com similaridade >= min_threshold (i, j, peso), em ordem de linha."""
+    parts = list(iter_similar_pairs(df_norm.to_numpy(), min_threshold, block_size))
+    if not parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    return (np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]),
+            np.concatenate([p[2] for p in parts]))
+
+
+def match_checkpoints(thresholds, checkpoints):
+    """Threshold mais próximo de cada checkpoint (evita comparar floats por igualdade exata)."""
+    return {min(thresholds, key=lambda t: abs(t - c)) for c in checkpoints}
+
+
+def sweep(df_norm: pd.DataFrame, thresholds=DEFAULT_THRESHOLDS, checkpoints=(),
+          engine=communities.DEFAULT_ENGINE, block_size=SIMILARITY_BLOCK_SIZE):
+    """
+    Tabela com nós, arestas e componentes do grafo de cada threshold e, nos `checkpoints`
+    (padrão: nenhum), também comunidades e modularidade. Cada checkpoint custa uma detecção de
+    comunidades completa, que domina o tempo da varredura; os checkpoints são associados ao
+    threshold mais próximo da lista.
+
+    A similaridade é calculada uma única vez no menor threshold. As arestas são ordenadas por
+    peso e adicionadas em ordem decrescente a um union-find, então contar nós e componentes de
+    todos os thresholds custa uma passada. Nos checkpoints o grafo é montado com as arestas na
+    mesma ordem de build_graph_blockwise, de modo que as comunidades são as de uma execução normal.
+    """
+    thresholds = sorted(set(thresholds), reverse=True)
+    checkpoints = match_checkpoints(thresholds, checkpoints)
+    users = df_norm.index.tolist()
+
+    start = time.perf_counter()
+    rows, cols, weights = collect_edges(df_norm, thresholds[-1], block_size)
+    order = np.argsort(-weights, kind="stable")
+    print(f"Similaridade calculada uma vez: {len(weights)} arestas >= {thresholds[-1]} "
+          f"em {time.perf_counter() - start:.2f}s")
+
+    uf = UnionFind(len(users))
+    seen = np.zeros(len(users), dtype=bool)
+    n_nodes = n_components = 0
+    pos = 0
+
+    table = []
+    for t in thresholds:
+        # Arestas com peso >= t que ainda não foram adicionadas
+        while pos < len(order) and weights[order[pos]] >= t:
+            e = order[pos]
+            i, j = int(rows[e]), int(cols[e])
+            for node in (i, j):
+                if not seen[node]:
+                    seen[node] = True
+                    n_nodes += 1
+                    n_components += 1
+            if uf.union(i, j):
+                n_components -= 1
+            pos += 1
+
+        row = {"threshold": t, "nos": n_nodes, "arestas": pos, "componentes": n_components,
+               "comunidades": np.nan, "modularidade": np.nan, "segundos": np.nan}
+
+        if t in checkpoints:
+            t0 = time.perf_counter()
+            mask = weights >= t
+            G = nx.Graph()
+            G.add_weighted_edges_from(
+                (users[i], users[j], w)
+                for i, j, w in zip(rows[mask].tolist(), cols[mask].tolist(), weights[mask].tolist())
+            )
+            comms = communities.detect(G, engine=engine)
+            row["comunidades"] = len(comms)
+            row["modularidade"] = communities.score(G, comms)
+            row["segundos"] = time.perf_counter() - t0
+
+        table.append(row)
+
+    return pd.DataFrame(table)
+
+
+if __name__ == "__main__":
+    # Uso: python threshold_sweep.py [profiles.csv] [arquivo_saida.csv]
+    FILE = sys.argv[1] if len(sys.argv) > 1 else "profiles.csv"
+    OUTPUT = sys.argv[2] if len(sys.argv) > 2 else "threshold_sweep.csv"
+    THRESHOLDS = DEFAULT_THRESHOLDS
+    # Cada checkpoint acrescenta uma detecção de comunidades; por padrão só o threshold de produção
+    CHECKPOINTS = [DEFAULT_THRESHOLD]
+    MOTOR_COMUNIDADES = "greedy"
+
+    # Mesmas features do generate_graph.py e do recommender.py (TF-IDF nos gêneros, peso nas sources)
+    df_norm = prepare_features(load_profiles(FILE))
+
+    result = sweep(df_norm, THRESHOLDS, CHECKPOINTS, MOTOR_COMUNIDADES)
+    print(result.to_string(index=False))
+    result.to_csv(OUTPUT, index=False)
+    print(f"\nTabela salva em {OUTPUT}.")
@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+################################################################
+# USER LISTS — LISTAS BAIXADAS EM FORMATO COLUNAR (OFFLINE)    #
+################################################################
+
+USER_LISTS_FILE = "user_lists.npz"
+
+
+class UserListStore:
+    """
+    Listas de animes baixadas (load.json) guardadas em colunas num único .npz:
+
+    - `usernames`: um por usuário, na ordem de inserção;
+    - `offsets`: int64, n_usuarios + 1; os itens do usuário i ficam em [offsets[i], offsets[i+1]);
+    - `anime_id` (int32), `score` (int8) e `status` (int8): um elemento por item de lista.
+
+    Uma nova lista do mesmo usuário substitui a anterior. As listas novas vão para um journal
+    append-only (`<path>.journal`, uma linha JSON por lista, gravado a cada `save_every` listas),
+    então cada lista é escrita uma única vez durante a coleta; o .npz só é reescrito (de forma
+    atômica) no `close`, que incorpora o journal e o apaga. Um journal deixado por uma execução
+    interrompida é lido na abertura.
+    """
+
+    def __init__(self, path=USER_LISTS_FILE, save_every=50):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.save_every = save_every
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._unsaved = []
+
+        self._usernames = np.zeros(0, dtype=str)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._anime_id = np.zeros(0, dtype=np.int32)
+        self._score = np.zeros(0, dtype=np.int8)
+        self._status = np.zeros(0, dtype=np.int8)
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                self._usernames = data["usernames"]
+                self._offsets = data["offsets"]
+                self._anime_id = data["anime_id"]
+                self._score = data["score"]
+                self._status = data["status"]
+        self._index = {u: i for i, u in enumerate(self._usernames.tolist())}
+        self._load_journal()
+
+    def _load_journal(self):
+        """Listas gravadas no journal e ainda não incorporadas ao .npz (linhas truncadas são ignoradas)."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, mode="r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._pending[entry["username"]] = (np.asarray(entry["anime_id"], dtype=np.int32),
+                                                    np.asarray(entry["score"], dtype=np.int8),
+                                                    np.asarray(entry["status"], dtype=np.int8))
+
+    @staticmethod
+    def _to_columns(anime_list):
+        ids, scores, statuses = [], [], []
+        for item in anime_list:
+            anime_id = item.get("anime_id")
+            if not anime_id:
+                continue
+            ids.append(int(anime_id))
+            scores.append(item.get("score") or 0)
+            statuses.append(item.get("status") or 0)
+        return (np.asarray(ids, dtype=np.int32),
+                np.asarray(scores, dtype=np.int8),
+                np.asarray(statuses, dtype=np.int8))
+
+    def add(self, username, anime_list):
+        """Guarda a lista de um usuário (listas vazias também, para registrar que ele foi visto)."""
+        if not isinstance(anime_list, list):
+            return
+        columns = self._to_columns(anime_list)
+        with self._lock:
+            self._pending[username] = columns
+            self._unsaved.append(username)
+            full = len(self._unsaved) >= self.save_every
+        if full:
+            self.save()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index.keys() | self._pending.keys())
+
+    def __contains__(self, username):
+        with self._lock:
+            return username in self._pending or username in self._index
+
+    def get(self, username):
+        """Lista do usuário no formato do load.json (apenas anime_id, score e status), ou None."""
+        with self._lock:
+            columns = self._pending.get(username)
+            if columns is None and username in self._index:
+                i = self._index[username]
+                start, end = self._offsets[i], self._offsets[i + 1]
+                columns = (self._anime_id[start:end], self._score[start:end], self._status[start:end])
+        if columns is None:
+            return None
+        return [{"anime_id": int(a), "score": int(s), "status": int(st)} for a, s, st in zip(*columns)]
+
+    def _merge(self):
+        """Junta o arquivo carregado com as listas novas (chamado com o lock adquirido)."""
+        if not self._pending:
+            return
+        keep = np.array([u not in self._pending for u in self._usernames.tolist()], dtype=bool)
+        lengths = np.diff(self._offsets)
+
+        # Trechos mantidos do arquivo: máscara por item a partir da máscara por usuário
+        item_keep = np.repeat(keep, lengths)
+        new_users = list(self._pending)
+        new_cols = list(self._pending.values())
+
+        usernames = np.concatenate([self._usernames[keep].astype(str), np.asarray(new_users, dtype=str)]) \
+            if new_users else self._usernames[keep]
+        all_lengths = np.concatenate([lengths[keep], [len(c[0]) for c in new_cols]]).astype(np.int64)
+        offsets = np.zeros(len(all_lengths) + 1, dtype=np.int64)
+        np.cumsum(all_lengths, out=offsets[1:])
+
+        self._usernames = usernames
+        self._offsets = offsets
+        self._anime_id = np.concatenate([self._anime_id[item_keep]] + [c[0] for c in new_cols])
+        self._score = np.concatenate([self._score[item_keep]] + [c[1] for c in new_cols])
+        self._status = np.concatenate([self._status[item_keep]] + [c[2] for c in new_cols])
+        self._index = {u: i for i, u in enumerate(self._usernames.tolist())}
+        self._pending = {}
+
+    def columns(self):
+        """(usernames, offsets, anime_id, score, status) com todas as listas, inclusive as não salvas."""
+        with self._lock:
+            self._merge()
+            return self._usernames, self._offsets, self._anime_id, self._score, self._status
+
+    def save(self):
+        """Acrescenta ao journal as listas recebidas desde o último save (custo proporcional a elas)."""
+        with self._lock:
+            if not self._unsaved:
+                return
+            with open(self.journal_path, mode="a", encoding="utf-8") as f:
+                for username in self._unsaved:
+                    columns = self._pending.get(username)
+                    if columns is None:
+                        # Já incorporada por columns(): lê de volta dos arrays
+                        i = self._index[username]
+                        start, end = self._offsets[i], self._offsets[i + 1]
+                        columns = (self._anime_id[start:end], self._score[start:end], self._status[start:end])
+                    f.write(json.dumps({"username": username, "anime_id": columns[0].tolist(),
+                                        "score": columns[1].tolist(), "status": columns[2].tolist()}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._unsaved = []
+
+    def compact(self):
+        """Reescreve o .npz com todas as listas (uma única vez) e apaga o journal."""
+        with self._lock:
+            self._merge()
+            tmp = self.path + ".tmp"
+            with open(tmp, mode="wb") as f:
+                np.savez(f, usernames=self._usernames, offsets=self._offsets,
+                         anime_id=self._anime_id, score=self._score, status=self._status)
+            os.replace(tmp, self.path)
+            self._unsaved = []
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+    def close(self):
+        self.compact()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()